@@ -0,0 +1,28 @@
+"""Add next attempt at to grading job
+
+Revision ID: 2b8f6d4e9a17
+Revises: e7a1c3d9b524
+Create Date: 2026-10-18 19:02:41.518306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b8f6d4e9a17'
+down_revision: Union[str, None] = 'e7a1c3d9b524'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'grading_job', sa.Column('next_attempt_at', sa.DateTime(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('grading_job', 'next_attempt_at')
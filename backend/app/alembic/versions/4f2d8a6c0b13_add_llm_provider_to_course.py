@@ -0,0 +1,27 @@
+"""Add llm provider to course
+
+Revision ID: 4f2d8a6c0b13
+Revises: 9c3e7b5a1f48
+Create Date: 2026-10-18 16:21:07.684395
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f2d8a6c0b13'
+down_revision: Union[str, None] = '9c3e7b5a1f48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # None: the course is graded with the default provider
+    op.add_column('course', sa.Column('llm_provider', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('course', 'llm_provider')
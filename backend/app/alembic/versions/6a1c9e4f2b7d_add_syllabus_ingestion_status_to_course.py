@@ -0,0 +1,45 @@
+"""Add syllabus ingestion status to course
+
+Revision ID: 6a1c9e4f2b7d
+Revises: d5eedee31f05
+Create Date: 2026-10-18 11:32:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a1c9e4f2b7d'
+down_revision: Union[str, None] = 'd5eedee31f05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing courses were ingested inline, when they were created
+    op.add_column(
+        'course',
+        sa.Column(
+            'syllabus_status', sa.String(), nullable=False, server_default='ready'
+        ),
+    )
+    op.add_column(
+        'course',
+        sa.Column(
+            'syllabus_attempts', sa.Integer(), nullable=False, server_default='0'
+        ),
+    )
+    op.add_column('course', sa.Column('syllabus_error', sa.Text(), nullable=True))
+    op.create_index(
+        op.f('ix_course_syllabus_status'), 'course', ['syllabus_status']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_course_syllabus_status'), table_name='course')
+    op.drop_column('course', 'syllabus_error')
+    op.drop_column('course', 'syllabus_attempts')
+    op.drop_column('course', 'syllabus_status')
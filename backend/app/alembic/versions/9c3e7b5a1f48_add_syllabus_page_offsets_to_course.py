@@ -0,0 +1,28 @@
+"""Add syllabus page offsets to course
+
+Revision ID: 9c3e7b5a1f48
+Revises: 6a1c9e4f2b7d
+Create Date: 2026-10-18 15:04:12.530671
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3e7b5a1f48'
+down_revision: Union[str, None] = '6a1c9e4f2b7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'course', sa.Column('syllabus_page_offsets', sa.JSON(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('course', 'syllabus_page_offsets')
@@ -0,0 +1,69 @@
+"""Add composite indexes on hot lookups
+
+Revision ID: d5eedee31f05
+Revises: b89cd8a521d1
+Create Date: 2026-10-18 10:45:12.402711
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5eedee31f05'
+down_revision: Union[str, None] = 'b89cd8a521d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Submissions made before responses were upserted may contain several
+    # responses to the same question: keep the first one of each triple
+    duplicates = """
+        SELECT id FROM student_response
+        WHERE assignment_id IS NOT NULL
+          AND student_id IS NOT NULL
+          AND question_id IS NOT NULL
+          AND id NOT IN (
+            SELECT MIN(id) FROM student_response
+            GROUP BY assignment_id, student_id, question_id
+          )
+    """
+    op.execute(f"DELETE FROM feedback WHERE student_response_id IN ({duplicates})")
+    op.execute(f"DELETE FROM student_response WHERE id IN ({duplicates})")
+
+    # A unique index rather than a constraint: SQLite cannot add constraints
+    # to an existing table, and ON CONFLICT accepts either
+    op.create_index(
+        'ix_student_response_assignment_student_question',
+        'student_response',
+        ['assignment_id', 'student_id', 'question_id'],
+        unique=True,
+    )
+    op.create_index(
+        'ix_enrollment_student_course',
+        'enrollment',
+        ['student_id', 'course_id'],
+    )
+    op.create_index(
+        'ix_enrollment_student_course_code',
+        'enrollment',
+        ['student_id', 'course_code'],
+    )
+    op.create_index(
+        'ix_feedback_assignment_student_response',
+        'feedback',
+        ['assignment_id', 'student_response_id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_feedback_assignment_student_response', table_name='feedback')
+    op.drop_index('ix_enrollment_student_course_code', table_name='enrollment')
+    op.drop_index('ix_enrollment_student_course', table_name='enrollment')
+    op.drop_index(
+        'ix_student_response_assignment_student_question',
+        table_name='student_response',
+    )
@@ -0,0 +1,28 @@
+"""Add syllabus started at to course
+
+Revision ID: e7a1c3d9b524
+Revises: 4f2d8a6c0b13
+Create Date: 2026-10-18 17:48:53.207164
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a1c3d9b524'
+down_revision: Union[str, None] = '4f2d8a6c0b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'course', sa.Column('syllabus_started_at', sa.DateTime(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('course', 'syllabus_started_at')
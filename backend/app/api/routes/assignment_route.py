@@ -2,7 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List, Dict, Optional, Union
 from db.init_db import get_db
+from db.executor import db_executor
 from crud.assignment_crud import (
+    assignment_selector,
     create_assignment,
     get_all_assignments,
     get_assignment,
@@ -15,6 +17,15 @@ from core.security import check_user_active
 from services.generate_questions import (
     compose_evaluation,
 )
+from crud.grading_job_crud import (
+    create_grading_batch,
+    get_grading_batch,
+    get_grading_batch_progress,
+)
+from schemas.grading_job import GradingBatchRead
+from schemas.question import AssignmentQuestionsCreate, Question
+from crud.question_crud import create_questions
+from services.grading_worker import grading_pool
 
 router = APIRouter()
 
@@ -37,7 +48,9 @@ async def create_new_assignment(
     - AssignmentRead: The created assignment data.
     """
 
-    return await create_assignment(user=user, db=db, assignment=assignment)
+    return await db_executor.run(
+        create_assignment, user=user, db=db, assignment=assignment
+    )
 
 
 @router.get("/courses/{course_id}/assignments", response_model=List[AssignmentRead])
@@ -57,7 +70,9 @@ async def fetch_all_assignments(
     Returns:
     - List[AssignmentRead]: A list of assignments for the specified course.
     """
-    return await get_all_assignments(user=user, db=db, course_id=course_id)
+    return await db_executor.run(
+        get_all_assignments, user=user, db=db, course_id=course_id
+    )
 
 
 @router.get("/assignments/{assignment_id}", response_model=AssignmentRead)
@@ -78,7 +93,7 @@ async def fetch_assignment(
     - AssignmentRead: The assignment data.
     """
 
-    return await get_assignment(assignment_id, user, db)
+    return await db_executor.run(get_assignment, assignment_id, user, db)
 
 
 @router.delete("/assignments/{assignment_id}", status_code=200)
@@ -96,7 +111,7 @@ async def delete_existing_assignment(
     Returns:
     - dict: A message indicating successful deletion.
     """
-    await delete_assignment(assignment_id, user, db)
+    await db_executor.run(delete_assignment, assignment_id, user, db)
     return {"message": "Assignment successfully deleted"}
 
 
@@ -119,7 +134,7 @@ async def update_existing_assignment(
     Returns:
     - AssignmentRead: The updated assignment data.
     """
-    return await update_assignment(assignment_id, assignment, user, db)
+    return await db_executor.run(update_assignment, assignment_id, assignment, user, db)
 
 
 @router.get(
@@ -144,8 +159,12 @@ async def fetch_student_assignments(
     Returns:
     - List[AssignmentRead]: A list of assignments for the specified student and course.
     """
-    return await get_student_assignments(
-        user=user, db=db, student_id=student_id, course_id=course_id
+    return await db_executor.run(
+        get_student_assignments,
+        user=user,
+        db=db,
+        student_id=student_id,
+        course_id=course_id,
     )
 
 
@@ -155,8 +174,21 @@ async def generate_evaluation(
     course_id: int,
     question_number: int,
     # chapters: Optional[str],
+    save: bool = False,
     db: Session = Depends(get_db),
 ):
+    """
+    Generate the questions of an assignment from the course content.
+
+    Parameters:
+    - assignment_id: int - The ID of the assignment.
+    - course_id: int - The ID of the course.
+    - question_number: int - The number of questions to generate.
+    - save: bool - Store the generated questions and answer keys right away.
+
+    Returns:
+    - dict: The generated questions, or the stored questions if `save` is set.
+    """
     try:
         result = await compose_evaluation(
             db=db,
@@ -165,8 +197,73 @@ async def generate_evaluation(
             question_number=question_number,
             # chapters=chapters,
         )
+        if save:
+            # One transaction for all the questions and their answer keys
+            questions = await db_executor.run(
+                create_questions, db, AssignmentQuestionsCreate.model_validate(result)
+            )
+            return {
+                "assignment_id": assignment_id,
+                "questions": [Question.model_validate(q) for q in questions],
+            }
         return result  # return the result as a dictionary
     except HTTPException as exc:
         raise exc
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@router.post(
+    "/assignments/{assignment_id}/grade-all",
+    response_model=GradingBatchRead,
+    status_code=202,
+)
+async def grade_all_student_responses(
+    assignment_id: int,
+    user=Depends(check_user_active),
+    db: Session = Depends(get_db),
+):
+    """
+    Queue the grading of every ungraded student response of an assignment.
+
+    Parameters:
+    - assignment_id: int - The ID of the assignment.
+    - user: Depends(check_user_active) - The active user making the request.
+    - db: Session - The database session.
+
+    Returns:
+    - GradingBatchRead: The batch progress, to poll with the GET route below.
+    """
+    await db_executor.run(assignment_selector, assignment_id, user, db)
+
+    batch = await db_executor.run(create_grading_batch, db, assignment_id)
+    grading_pool.notify()
+    return await db_executor.run(get_grading_batch_progress, db, batch)
+
+
+@router.get(
+    "/assignments/{assignment_id}/grade-all/{batch_id}",
+    response_model=GradingBatchRead,
+)
+async def fetch_grading_batch_progress(
+    assignment_id: int,
+    batch_id: int,
+    user=Depends(check_user_active),
+    db: Session = Depends(get_db),
+):
+    """
+    Get the progress of a whole-assignment grading batch.
+
+    Parameters:
+    - assignment_id: int - The ID of the assignment.
+    - batch_id: int - The ID of the grading batch.
+    - user: Depends(check_user_active) - The active user making the request.
+    - db: Session - The database session.
+
+    Returns:
+    - GradingBatchRead: Job counts per status and elapsed time.
+    """
+    batch = await db_executor.run(get_grading_batch, db, batch_id)
+    if not batch or batch.assignment_id != assignment_id:
+        raise HTTPException(status_code=404, detail="Grading batch not found")
+    return await db_executor.run(get_grading_batch_progress, db, batch)
@@ -44,6 +44,8 @@ from crud.course_crud import (
 )
 from schemas.course import CourseCreate, CourseRead, CourseUpdate, Chapter
 from core.security import check_user_active
+from db.executor import db_executor
+from services.syllabus_ingestion import syllabus_pool
 
 
 router = APIRouter()
@@ -64,9 +66,12 @@ async def create_new_course(
     - db: Session - The database session.
 
     Returns:
-    - CourseRead: The created course data.
+    - CourseRead: The created course data, with its syllabus "pending": its
+      chapters are extracted in the background (see `syllabus_status`).
     """
-    return await create_course(user=user, db=db, course=course)
+    db_course = await db_executor.run(create_course, user=user, db=db, course=course)
+    syllabus_pool.notify()
+    return db_course
 
 
 @router.get("/courses", response_model=List[CourseRead])
@@ -84,7 +89,7 @@ async def fetch_all_courses(
     Returns:
     - List[CourseRead]: A list of all courses.
     """
-    return await get_all_courses(user=user, db=db)
+    return await db_executor.run(get_all_courses, user=user, db=db)
 
 
 @router.get("/courses/{course_id}", status_code=200)
@@ -104,7 +109,7 @@ async def fetch_course(
     Returns:
     - CourseRead: The course data.
     """
-    return await get_course(course_id, user, db)
+    return await db_executor.run(get_course, course_id, user, db)
 
 
 @router.delete("/courses/{course_id}", status_code=200)
@@ -122,7 +127,7 @@ async def delete_existing_course(
     Returns:
     - dict: A message indicating successful deletion.
     """
-    await delete_course(course_id, user, db)
+    await db_executor.run(delete_course, course_id, user, db)
     return {"message": "Cours supprimé avec succès"}
 
 
@@ -146,7 +151,7 @@ async def update_existing_course(
     Returns:
     - dict: A message indicating successful update.
     """
-    await update_course(course_id, course, user, db)
+    await db_executor.run(update_course, course_id, course, user, db)
     return {"message": "Mise à jour réussie"}
 
 
@@ -171,7 +176,7 @@ def get_course_teacher_and_students(
 
 @router.get("/courses/{course_id}/chapters", response_model=List[Chapter])
 async def get_course_chapters(course_id: int, db: Session = Depends(get_db)):
-    course_data = await get_chapters_by_course_id(course_id, db)
+    course_data = await db_executor.run(get_chapters_by_course_id, course_id, db)
 
     if not course_data:
         raise HTTPException(status_code=404, detail="Course or chapters not found")
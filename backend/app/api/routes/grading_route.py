@@ -1,28 +1,44 @@
+from typing import Dict, List, Optional
 from fastapi import APIRouter, HTTPException, Depends
-from schemas.grading import AssessmentData
+from schemas.grading import AssessmentData, GradingOutput
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from db.init_db import get_db
+from db.init_db import get_async_db, get_db
 from core.security import check_user_active
 from crud.student_grading_result_crud import (
-    get_all_assignments_and_students,
+    get_all_assignments_and_students_async,
     update_student_grade_crud,
 )
 
-# from services.grading_openai import get_grading_from_llm
-
-# from services.grading_azopenai import get_grading_from_llm
-# from services.gradding_tgllama import get_grading_from_llm
-from services.gradding_ghllama import get_grading_from_llm
+from services import (
+    grading_openai,
+    grading_azopenai,
+    gradding_tgllama,
+    gradding_ghllama,
+)
+from services.llm_providers import LLMProvider
+from services.llm_registry import llm_registry
+from services.grading_cache import grading_cache
 
 from crud.grading_crud import (
-    validate_student_assignment,
-    get_student_grading_feedback,
+    validate_student_assignment_async,
+    get_student_grading_feedback_async,
 )
+from crud.grading_job_crud import get_grading_job_for_user
+from schemas.grading_job import GradingJobRead
 
 
 router = APIRouter()
 
 
+# Grading implementation of each provider (sampling parameters and parsing)
+grading_backends = {
+    "openai": grading_openai,
+    "azure_openai": grading_azopenai,
+    "together": gradding_tgllama,
+    "github": gradding_ghllama,
+}
+
 grading_output = {
     "advice": "Commentaire global ici. En t'adressant à l'étudiant, explique ce qu'il doit améliorer et pourquoi.",
     "grading": {
@@ -42,73 +58,158 @@ grading_output = {
 }
 
 
+def build_grading_prompts(data: AssessmentData) -> List[str]:
+    """
+    Builds the grading prompts of a copy.
+
+    Returns:
+        List[str]: role prompt, grading elements, instruction prompt and output
+        structure, in the order expected by `grading_messages`.
+    """
+    role_prompt = f"""
+        >>>>>>> ROLE_PROMPT >>>>>>>
+        Tu es un enseignant précis, qui se concentre sur l'évaluation minutieuse des copies et la communication claire des erreurs et des points d'amélioration.
+    """
+
+    grading_elements = f""" 
+        >>>>>>> SUPORTS D'ÉVALUATION >>>>>>>>
+
+        Voici les éléments dont tu disposes:
+            >>>>>>> CORRIGÉ DE L'ENSEIGNANT >>>>>>>
+            {data.teacher_corrected_assessment}
+
+            >>>>>>> CRITÈRES DE CORRECTION >>>>>>>
+            {data.grading_criteria}
+
+            >>>>>>> RÉPONSES DE L'ÉTUDIANT >>>>>>>
+            {data.student_responses}
+    """
+    instruction_prompt = f"""
+        >>>>>>> INSTRUCTION_PROMPT >>>>>>>
+        Ton rôle est de corriger chaque réponse en fonction des critères suivants :
+        1. Analyse chaque réponse en fonction de la compréhension conceptuelle, exactitude des faits, et clarté de l'explication.
+        2. Attribue une note précise pour chaque réponse.
+        3. Fournis des commentaires explicatifs détaillés sur chaque erreur, en insistant sur ce qui doit être corrigé et pourquoi.
+        4. Inclue un retour global au debut qui indique clairement les domaines où l'étudiant doit s'améliorer.
+        5. Utilise un ton pédagogique.
+        6. Le retour doit être dans la langue des questions.
+        7. **Le résultat doit être un JSON strict, sans texte explicatif supplémentaire.**
+        8. **Retourne uniquement un JSON conforme au format ci-dessous, sinon la réponse sera rejetée.**
+    """
+
+    output_strucutre = f"""
+        >>>>>>> OUTPUT STRUCTURE >>>>>>>
+        La structure doit être respectée, quel que soit le nombre de questions à évaluer, 
+        et le résultat doit être en format JSON strict.
+        Le JSON doit être structuré exactement comme ceci:
+        {grading_output}
+    """
+
+    return [role_prompt, grading_elements, instruction_prompt, output_strucutre]
+
+
+def grading_messages(prompts: List[str]) -> List[Dict[str, str]]:
+    # Chat messages of the prompts built by `build_grading_prompts`
+    role_prompt, grading_elements, instruction_prompt, output_structure = prompts
+    return [
+        {"role": "system", "content": role_prompt},
+        {"role": "user", "content": grading_elements},
+        {"role": "user", "content": output_structure},
+        {"role": "user", "content": instruction_prompt},
+    ]
+
+
+def grading_params(llm_provider: LLMProvider) -> dict:
+    # Sampling parameters of the grading calls of a provider
+    return grading_backends[llm_provider.name].sampling_params
+
+
+def grading_cache_key(llm_provider: LLMProvider, prompts: List[str]) -> str:
+    # Identical prompts graded by the same model are served from the cache
+    return grading_cache.make_key(
+        provider=llm_provider.name,
+        model=llm_provider.model,
+        prompt=prompts,
+        params=grading_params(llm_provider),
+    )
+
+
 @router.post("/get_grading/")
-async def get_grading_endpoint(data: AssessmentData):
+async def get_grading_endpoint(
+    data: AssessmentData, provider: Optional[str] = None
+):
+    # Resolve the provider first: an unknown provider is a client error
+    try:
+        llm_provider = llm_registry.get(provider)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     try:
-        role_prompt = f"""
-            >>>>>>> ROLE_PROMPT >>>>>>>
-            Tu es un enseignant précis, qui se concentre sur l'évaluation minutieuse des copies et la communication claire des erreurs et des points d'amélioration.
-        """
-
-        grading_elements = f""" 
-            >>>>>>> SUPORTS D'ÉVALUATION >>>>>>>>
-
-            Voici les éléments dont tu disposes:
-                >>>>>>> CORRIGÉ DE L'ENSEIGNANT >>>>>>>
-                {data.teacher_corrected_assessment}
-
-                >>>>>>> CRITÈRES DE CORRECTION >>>>>>>
-                {data.grading_criteria}
-
-                >>>>>>> RÉPONSES DE L'ÉTUDIANT >>>>>>>
-                {data.student_responses}
-        """
-        instruction_prompt = f"""
-            >>>>>>> INSTRUCTION_PROMPT >>>>>>>
-            Ton rôle est de corriger chaque réponse en fonction des critères suivants :
-            1. Analyse chaque réponse en fonction de la compréhension conceptuelle, exactitude des faits, et clarté de l'explication.
-            2. Attribue une note précise pour chaque réponse.
-            3. Fournis des commentaires explicatifs détaillés sur chaque erreur, en insistant sur ce qui doit être corrigé et pourquoi.
-            4. Inclue un retour global au debut qui indique clairement les domaines où l'étudiant doit s'améliorer.
-            5. Utilise un ton pédagogique.
-            6. Le retour doit être dans la langue des questions.
-            7. **Le résultat doit être un JSON strict, sans texte explicatif supplémentaire.**
-            8. **Retourne uniquement un JSON conforme au format ci-dessous, sinon la réponse sera rejetée.**
-        """
-
-        output_strucutre = f"""
-            >>>>>>> OUTPUT STRUCTURE >>>>>>>
-            La structure doit être respectée, quel que soit le nombre de questions à évaluer, 
-            et le résultat doit être en format JSON strict.
-            Le JSON doit être structuré exactement comme ceci:
-            {grading_output}
-        """
-        grading = await get_grading_from_llm(
-            role_prompt, grading_elements, instruction_prompt, output_strucutre
+        prompts = build_grading_prompts(data)
+
+        cached_grading = await grading_cache.get(
+            grading_cache_key(llm_provider, prompts)
+        )
+        if cached_grading is not None:
+            return cached_grading
+
+        try:
+            grading, answered_by = await llm_provider.answer_json(
+                grading_messages(prompts), GradingOutput, grading_params
+            )
+        except Exception as e:
+            # Reported like the grading backends do, the callers check "error"
+            return {"error": str(e)}
+
+        # After a failover, the grading is the fallback's: cached under its key
+        await grading_cache.set(
+            grading_cache_key(answered_by, prompts),
+            answered_by.name,
+            answered_by.model,
+            grading,
         )
         return grading
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/grading_cache/stats")
+def get_grading_cache_stats(user=Depends(check_user_active)):
+    return grading_cache.stats()
+
+
 @router.get("/grading_feedback/{student_id}/{assignment_id}")
-def get_grading_feedback(
-    student_id: int, assignment_id: int, db: Session = Depends(get_db)
+async def get_grading_feedback(
+    student_id: int, assignment_id: int, db: AsyncSession = Depends(get_async_db)
 ):
-    grading_feedback = get_student_grading_feedback(db, student_id, assignment_id)
+    grading_feedback = await get_student_grading_feedback_async(
+        db, student_id, assignment_id
+    )
     if not grading_feedback:
         raise HTTPException(status_code=404, detail="Grading feedback not found")
     return grading_feedback
 
 
+@router.get("/grading_jobs/{job_id}", response_model=GradingJobRead)
+def get_grading_job_status(
+    job_id: int, db: Session = Depends(get_db), user=Depends(check_user_active)
+):
+    # Another user's job is reported as missing
+    job = get_grading_job_for_user(db, job_id, user)
+    if not job:
+        raise HTTPException(status_code=404, detail="Grading job not found")
+    return job
+
+
 @router.put("/validate_assignment/{student_id}/{assignment_id}")
-def validate_assignment(
+async def validate_assignment(
     student_id: int,
     assignment_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    validated_response = validate_student_assignment(db, student_id, assignment_id)
+    validated_response = await validate_student_assignment_async(
+        db, student_id, assignment_id
+    )
 
     if not validated_response:
         raise HTTPException(status_code=404, detail="Assignment validation failed")
@@ -117,10 +218,12 @@ def validate_assignment(
 
 
 @router.get("/courses/{course_id}/all-assignments")
-def get_all_course_assignments_and_students(
-    course_id: int, db: Session = Depends(get_db), user=Depends(check_user_active)
+async def get_all_course_assignments_and_students(
+    course_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(check_user_active),
 ):
-    data = get_all_assignments_and_students(db, course_id)
+    data = await get_all_assignments_and_students_async(db, course_id)
 
     if not data:
         raise HTTPException(status_code=404, detail="No assignments or students found")
@@ -1,20 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 from crud.student_response_crud import (
-    create_student_responses,
+    create_student_responses_async,
     get_student_responses_by_assignment_student_and_question,
+    has_student_responses_async,
+)
+from crud.grading_job_crud import (
+    create_grading_job_async,
+    is_grading_job_running_async,
 )
-from crud.grading_crud import process_and_store_llm_output
 from schemas.student_response import (
     StudentResponse,
     AssignmentResponsesCreate,
+    StudentSubmissionRead,
 )
-from schemas.grading import AssessmentData
-from db.init_db import get_db
+from db.init_db import get_async_db, get_db
+from db.executor import db_executor
 from core.security import check_user_active
-from services.grading_data import assemble_grading_data
-from api.routes.grading_route import get_grading_endpoint
+from services.grading_worker import grading_pool
+from services.grading_stream import stream_grading
 
 router = APIRouter()
 
@@ -22,50 +29,64 @@ router = APIRouter()
 from fastapi import HTTPException
 
 
-@router.post("/student_responses/", response_model=List[StudentResponse])
+@router.post(
+    "/student_responses/", response_model=StudentSubmissionRead, status_code=202
+)
 async def create_student_responses_endpoint(
     assignment_responses: AssignmentResponsesCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(check_user_active),
 ):
     try:
         # Save the student responses to the database
-        saved_responses = create_student_responses(
+        saved_responses = await create_student_responses_async(
             db=db, assignment_responses=assignment_responses
         )
 
-        # Trigger the grading process after saving the responses
-        grading_data = await assemble_grading_data(
+        # Queue the grading, the workers store the results once the LLM answers
+        job = await create_grading_job_async(
             db, assignment_id=assignment_responses.assignment_id, student_id=user.id
         )
-        # print(grading_data)
+        grading_pool.notify()
 
-        # # Load the course syllabus context
-        # course_syllabus = db.query(Course).filter(Course.id == course_id).first()
+        return {"job_id": job.id, "status": job.status, "responses": saved_responses}
 
-        # Prepare the data for the grading endpoint
-        assessment_data = AssessmentData(
-            teacher_corrected_assessment=grading_data["teacher_corrected_assessment"],
-            grading_criteria=grading_data["grading_criteria"],
-            student_responses=grading_data["student_responses"],
-            # course_syllabus=
-        )
-        # Get the grading from the LLM
-        grading = await get_grading_endpoint(assessment_data)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Process and save the grading results in the database
-        # print("Hello everyone :", grading)
-        process_and_store_llm_output(
-            db=db,
-            llm_output=grading,
-            assignment_id=assignment_responses.assignment_id,
-            student_id=user.id,
-        )
 
-        return saved_responses
+@router.get("/student_responses/{assignment_id}/grading/stream")
+async def stream_student_grading_endpoint(
+    assignment_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(check_user_active),
+):
+    """
+    Grades the responses of the current student and streams the feedback.
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    Parameters:
+    - assignment_id: ID of the graded assignment.
+
+    Returns:
+    - A `text/event-stream` of "start", "delta", then "grading" or "error"
+      events. The grading is stored before the "grading" event is sent.
+    - 409 if a worker is already grading the copy: its result is read from
+      the grading job.
+    """
+    if not await has_student_responses_async(db, assignment_id, user.id):
+        raise HTTPException(
+            status_code=404, detail="No responses found for this assignment"
+        )
+    if await is_grading_job_running_async(db, assignment_id, user.id):
+        raise HTTPException(status_code=409, detail="This copy is already being graded")
+
+    return StreamingResponse(
+        stream_grading(assignment_id, user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get(
@@ -79,8 +100,12 @@ async def get_student_responses_by_assignment_student_and_question_endpoint(
     db: Session = Depends(get_db),
     user=Depends(check_user_active),
 ):
-    student_responses = get_student_responses_by_assignment_student_and_question(
-        db, assignment_id=assignment_id, student_id=student_id, question_id=question_id
+    student_responses = await db_executor.run(
+        get_student_responses_by_assignment_student_and_question,
+        db,
+        assignment_id=assignment_id,
+        student_id=student_id,
+        question_id=question_id,
     )
     if not student_responses:
         raise HTTPException(
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from schemas.student import StudentCreate
 from models.user_models import Student
 from db.init_db import get_db
+from db.executor import db_executor
 from crud.student_crud import register_student
 from crud.auth_crud import get_user_by_email
 
@@ -12,10 +13,12 @@ router = APIRouter()
 
 @router.post("/register", response_model=StudentCreate)
 async def create_student(student: StudentCreate, db: Session = Depends(get_db)):
-    db_student = await get_user_by_email(db, email=student.email, user_type=Student)
+    db_student = await db_executor.run(
+        get_user_by_email, db, email=student.email, user_type=Student
+    )
     if db_student:
         raise HTTPException(status_code=400, detail="Adresse e-mail déjà utilisée")
 
-    registered_student = await register_student(student, db)
+    registered_student = await db_executor.run(register_student, student, db)
 
     return registered_student
\ No newline at end of file
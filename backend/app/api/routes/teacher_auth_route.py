@@ -1,12 +1,13 @@
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from models.user_models import Teacher
 from schemas.teacher import TeacherRead
 from schemas.token import Token
-from core.security import create_token, check_user_active
+from core.security import create_token, check_user_record_active, get_token_claims
 from crud.auth_crud import authenticate_user
-from core.auth_utils import token_refresher
+from core.auth_utils import token_refresher, token_revoker
 from db.init_db import get_db
 
 router = APIRouter()
@@ -30,6 +31,19 @@ async def refresh_token_endpoint(refresh_token: str, db: Session = Depends(get_d
     return await token_refresher(refresh_token, db)
 
 
+@router.post("/logout")
+async def logout(
+    refresh_token: Optional[str] = None,
+    payload: dict = Depends(get_token_claims),
+    db: Session = Depends(get_db),
+):
+    """
+    Revokes the access token of the request and, if given, the refresh token.
+    """
+    await token_revoker(payload, refresh_token, db)
+    return {"message": "Déconnexion réussie"}
+
+
 @router.get("/me", response_model=TeacherRead)
-async def read_users_me(current_user: Teacher = Depends(check_user_active)):
+async def read_users_me(current_user: Teacher = Depends(check_user_record_active)):
     return current_user
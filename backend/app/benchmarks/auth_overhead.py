@@ -0,0 +1,134 @@
+"""
+Per-request cost of authentication on a hello-world route.
+
+Serves the app in-process on a temporary SQLite database and calls, one
+request at a time, the same route body behind:
+  - no authentication (baseline),
+  - the previous `check_user_active` chain: a student and a teacher scheme,
+    each resolving the bearer token to a user (JWT decode + query), with and
+    without the principal cache,
+  - the current `check_user_active`: one decode, principal from the claims.
+
+Usage (from backend/app):
+    python -m benchmarks.auth_overhead --requests 2000
+"""
+
+import os
+import tempfile
+
+# The database and the settings are read when the app is imported
+_directory = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_directory.name, 'bench.db')}"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import argparse
+import asyncio
+import time
+from typing import Union
+import httpx
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+import main
+from core.principal_cache import principal_cache
+from core.security import (
+    check_user_active,
+    create_token,
+    get_user_from_token,
+    student_oauth2_scheme,
+    teacher_oauth2_scheme,
+)
+from db.init_db import get_async_db
+from db.session import Base, SessionLocal, engine
+from models import Student, Teacher
+
+bench_router = APIRouter()
+
+
+# Previous implementation of check_user_active
+async def legacy_current_teacher(
+    token: str = Depends(teacher_oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await get_user_from_token(token, db)
+
+
+async def legacy_current_student(
+    token: str = Depends(student_oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await get_user_from_token(token, db)
+
+
+def legacy_current_user(
+    student: Union[Student, None] = Depends(legacy_current_student),
+    teacher: Union[Teacher, None] = Depends(legacy_current_teacher),
+):
+    if student:
+        return student
+    if teacher:
+        return teacher
+    raise HTTPException(status_code=401, detail="Could not validate credentials")
+
+
+async def legacy_check_user_active(user=Depends(legacy_current_user)):
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user.")
+    return user
+
+
+@bench_router.get("/bench/anonymous")
+async def anonymous():
+    return {"hello": "world"}
+
+
+@bench_router.get("/bench/legacy")
+async def legacy(user=Depends(legacy_check_user_active)):
+    return {"hello": user.id}
+
+
+@bench_router.get("/bench/claims")
+async def claims(user=Depends(check_user_active)):
+    return {"hello": user.id}
+
+
+async def run(label: str, client: httpx.AsyncClient, path: str, requests: int):
+    for _ in range(requests // 10):
+        (await client.get(path)).raise_for_status()
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        (await client.get(path)).raise_for_status()
+    per_request = (time.perf_counter() - start) / requests * 1000
+    print(f"{label:<24} {per_request:7.3f} ms/request")
+    return per_request
+
+
+async def main_async(requests: int):
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    student = Student(name="Student", email="student@example.com", hashed_password="-")
+    db.add(student)
+    db.commit()
+    token = create_token(student).access_token
+    db.close()
+    main.app.include_router(bench_router, prefix="/api")
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=main.app),
+        base_url="http://bench",
+        headers={"Authorization": f"Bearer {token}"},
+    ) as client:
+        baseline = await run("no auth", client, "/api/bench/anonymous", requests)
+        principal_cache.enabled = False
+        await run("previous, no cache", client, "/api/bench/legacy", requests)
+        principal_cache.enabled = True
+        await run("previous, cache", client, "/api/bench/legacy", requests)
+        claims_ms = await run("claims", client, "/api/bench/claims", requests)
+    print(f"authentication overhead with claims: {claims_ms - baseline:.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.requests))
@@ -0,0 +1,191 @@
+"""
+Latency of POST /api/courses: inline syllabus ingestion vs background workers.
+
+Serves the app in-process on a temporary SQLite database, generated syllabus
+PDFs of `--pages` pages from a local HTTP server, and chapters from the stub
+LLM server answering after `--llm-delay` seconds. Each size is created first
+through the previous implementation (download, extraction and chapters in the
+request), then through the current route, for which the time until the
+syllabus is "ready" is reported as well.
+
+Usage (from backend/app):
+    python -m benchmarks.course_creation --pages 10 100 300 --llm-delay 2
+"""
+
+import os
+import tempfile
+
+# The database and the settings are read when the app is imported
+_directory = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_directory.name, 'bench.db')}"
+os.environ["SYLLABUS_POLL_INTERVAL"] = "0.1"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+import httpx
+import requests
+from fastapi import APIRouter, Depends
+from PyPDF2 import PdfReader
+from sqlalchemy.orm import Session
+import main
+from core.security import check_user_active, create_token
+from crud.course_crud import generate_unique_course_code, store_course
+from db.executor import db_executor
+from db.init_db import get_db
+from db.session import Base, SessionLocal, engine
+from models import Course, Teacher
+from schemas.course import CourseCreate
+from services.course_chapters import extract_chapters_from_syllabus
+from services.llm_providers import OpenAIProvider
+from services.llm_registry import llm_registry
+from services.pdf_extraction import pdf_extractor
+from services.syllabus_ingestion import syllabus_pool
+from benchmarks.pdf_fixture import make_syllabus_pdf
+from benchmarks.stub_llm_server import start_stub_server
+
+CHAPTERS_CONTENT = json.dumps(
+    {
+        "chapters": [
+            {"number": 1, "title": "Introduction", "content": "Notions de base."},
+            {"number": 2, "title": "Exercices", "content": "Applications."},
+        ]
+    }
+)
+
+legacy_router = APIRouter()
+
+
+@legacy_router.post("/legacy/courses")
+async def legacy_create_course(
+    course: CourseCreate, user=Depends(check_user_active), db: Session = Depends(get_db)
+):
+    # Previous implementation: the whole ingestion inside the request
+    course_code = await db_executor.run(generate_unique_course_code, db)
+    response = requests.get(course.syllabus_url)
+    response.raise_for_status()
+    reader = PdfReader(BytesIO(response.content))
+    text = ""
+    for page in reader.pages:
+        text += page.extract_text()
+    syllabus_content = text.strip()
+    course_chapters = await extract_chapters_from_syllabus(syllabus_content)
+    db_course = Course(
+        name=course.name,
+        teacher_id=course.teacher_id,
+        code=course_code,
+        created_at=datetime.now(),
+        updated_at=datetime.now(),
+        syllabus_url=course.syllabus_url,
+        syllabus_content=syllabus_content,
+        course_chapters=course_chapters,
+        syllabus_status="ready",
+    )
+    return await db_executor.run(store_course, db, db_course)
+
+
+def start_pdf_server(sizes):
+    pdfs = {f"/syllabus-{pages}.pdf": make_syllabus_pdf(pages) for pages in sizes}
+
+    class PdfHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = pdfs.get(self.path)
+            if body is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/pdf")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PdfHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+async def wait_until_ready(client: httpx.AsyncClient, course_id: int) -> str:
+    while True:
+        course = (await client.get(f"/api/courses/{course_id}")).json()
+        if course["syllabus_status"] in ("ready", "failed"):
+            return course["syllabus_status"]
+        await asyncio.sleep(0.05)
+
+
+async def main_async(args):
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    teacher = Teacher(name="Teacher", email="teacher@example.com", hashed_password="-")
+    db.add(teacher)
+    db.commit()
+    token = create_token(teacher).access_token
+    teacher_id = teacher.id
+    db.close()
+
+    llm_server, llm_url = start_stub_server(
+        delay=args.llm_delay, content=CHAPTERS_CONTENT
+    )
+    llm_registry.register(
+        OpenAIProvider(api_key="stub", model="stub", base_url=llm_url)
+    )
+    pdf_server, pdf_url = start_pdf_server(args.pages)
+    main.app.include_router(legacy_router, prefix="/api")
+    syllabus_pool.start()
+
+    print(f"LLM answering in {args.llm_delay}s")
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=main.app),
+            base_url="http://bench",
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=None,
+        ) as client:
+            for pages in args.pages:
+                course = {
+                    "name": f"Cours {pages}",
+                    "section": None,
+                    "subject": None,
+                    "teacher_id": teacher_id,
+                    "syllabus_url": f"{pdf_url}/syllabus-{pages}.pdf",
+                }
+
+                start = time.perf_counter()
+                response = await client.post("/api/legacy/courses", json=course)
+                response.raise_for_status()
+                inline = time.perf_counter() - start
+
+                start = time.perf_counter()
+                response = await client.post("/api/courses", json=course)
+                response.raise_for_status()
+                created = time.perf_counter() - start
+                status = await wait_until_ready(client, response.json()["id"])
+                ready = time.perf_counter() - start
+
+                print(
+                    f"{pages:>4} pages  inline {inline * 1000:8.1f} ms   "
+                    f"background: created {created * 1000:6.1f} ms, "
+                    f"{status} after {ready * 1000:8.1f} ms"
+                )
+    finally:
+        await syllabus_pool.stop()
+        pdf_extractor.shutdown()
+        await llm_registry.close()
+        llm_server.shutdown()
+        pdf_server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 300])
+    parser.add_argument("--llm-delay", type=float, default=2)
+    asyncio.run(main_async(parser.parse_args()))
@@ -0,0 +1,195 @@
+"""
+Course gradebook: one query per assignment vs the assignment_student_score
+summary table.
+
+Builds a temporary SQLite database with a course of `--assignments`
+assignments answered by `--students` students, then times the previous
+implementation of `get_all_assignments_and_students` against the current one
+and counts the SQL statements each of them runs.
+
+Usage (from backend/app):
+    python -m benchmarks.gradebook_query --assignments 50 --students 500
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from sqlalchemy import create_engine, event, func, insert
+from sqlalchemy.orm import sessionmaker
+from db.session import Base
+from models import Assignment, Course, Enrollment, Question, Student, StudentResponse
+from crud.student_grading_result_crud import get_all_assignments_and_students
+from crud.assignment_score_crud import rebuild_assignment_scores
+
+
+def legacy_get_all_assignments_and_students(db, course_id: int):
+    # Previous implementation: one grouped join query per assignment (N+1)
+    assignments_data = (
+        db.query(
+            Assignment.id, Assignment.title, Assignment.due_date, Assignment.points
+        )
+        .filter(Assignment.course_id == course_id)
+        .all()
+    )
+
+    result = []
+    for assignment in assignments_data:
+        student_data = (
+            db.query(
+                Student.id,
+                Student.name,
+                Student.postname,
+                Student.email,
+                func.sum(StudentResponse.grade).label("total_grade"),
+            )
+            .join(Enrollment, Enrollment.student_id == Student.id)
+            .join(StudentResponse, StudentResponse.student_id == Student.id)
+            .filter(
+                Enrollment.course_id == course_id,
+                StudentResponse.assignment_id == assignment.id,
+            )
+            .group_by(Student.id)
+            .all()
+        )
+        result.append(
+            {
+                "assignment": {
+                    "id": assignment.id,
+                    "title": assignment.title,
+                    "due_date": assignment.due_date,
+                    "points": assignment.points,
+                },
+                "students": [
+                    {
+                        "id": student.id,
+                        "name": student.name,
+                        "postname": student.postname,
+                        "email": student.email,
+                        "total_grade": student.total_grade,
+                    }
+                    for student in student_data
+                ],
+            }
+        )
+    return result
+
+
+def populate(db, assignments: int, students: int, questions: int):
+    db.add(Course(id=1, name="Bench", code="BENCH"))
+    db.execute(
+        insert(Student),
+        [
+            {
+                "id": s,
+                "name": f"Student {s}",
+                "email": f"student{s}@example.com",
+                "hashed_password": "x",
+            }
+            for s in range(1, students + 1)
+        ],
+    )
+    db.execute(
+        insert(Enrollment),
+        [{"student_id": s, "course_id": 1} for s in range(1, students + 1)],
+    )
+    db.execute(
+        insert(Assignment),
+        [
+            {"id": a, "title": f"Assignment {a}", "points": 20, "course_id": 1}
+            for a in range(1, assignments + 1)
+        ],
+    )
+    question_ids = {}
+    question_rows = []
+    for a in range(1, assignments + 1):
+        for q in range(questions):
+            question_id = len(question_rows) + 1
+            question_ids.setdefault(a, []).append(question_id)
+            question_rows.append(
+                {
+                    "id": question_id,
+                    "question_text": "?",
+                    "max_points": 5,
+                    "assignment_id": a,
+                }
+            )
+    db.execute(insert(Question), question_rows)
+    db.execute(
+        insert(StudentResponse),
+        [
+            {
+                "assignment_id": a,
+                "student_id": s,
+                "question_id": question_id,
+                "response_text": "x",
+                "grade": random.randint(0, 5),
+            }
+            for a in range(1, assignments + 1)
+            for s in range(1, students + 1)
+            for question_id in question_ids[a]
+        ],
+    )
+    db.commit()
+    rebuild_assignment_scores(db)
+
+
+def run(label: str, gradebook, session_factory, engine, runs: int):
+    statements = []
+
+    def count_statement(*args):
+        statements.append(1)
+
+    timings = []
+    for _ in range(runs):
+        db = session_factory()
+        statements.clear()
+        event.listen(engine, "before_cursor_execute", count_statement)
+        start = time.perf_counter()
+        gradebook(db, 1)
+        timings.append(time.perf_counter() - start)
+        event.remove(engine, "before_cursor_execute", count_statement)
+        db.close()
+
+    timings.sort()
+    median = timings[len(timings) // 2] * 1000
+    print(
+        f"{label:<8} {len(statements):>4} queries  median {median:8.2f} ms"
+        f"  best {timings[0] * 1000:8.2f} ms"
+    )
+
+
+def main(assignments: int, students: int, questions: int, runs: int):
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        session_factory = sessionmaker(bind=engine, autoflush=False)
+
+        db = session_factory()
+        populate(db, assignments, students, questions)
+        db.close()
+        print(
+            f"{assignments} assignments x {students} students x "
+            f"{questions} questions"
+        )
+
+        run(
+            "legacy",
+            legacy_get_all_assignments_and_students,
+            session_factory,
+            engine,
+            runs,
+        )
+        run("summary", get_all_assignments_and_students, session_factory, engine, runs)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--assignments", type=int, default=50)
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--questions", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    main(args.assignments, args.students, args.questions, args.runs)
@@ -0,0 +1,206 @@
+"""
+Self-check of the JSON extractor on the answers LLMs actually send.
+
+Runs `extract_json` and `StreamingJSONExtractor` on answers wrapped in prose
+and code fences, with curly quotes, apostrophes written as straight quotes,
+escapes and truncations. Every answer is also fed in one-character chunks and
+split in two at every position, so that a quote or an escape falling on a
+chunk boundary is covered. Exits with status 1 if any case fails.
+
+Usage (from backend/app):
+    python -m benchmarks.json_extractor_check --verbose
+"""
+
+import argparse
+import sys
+from schemas.grading import GradingOutput
+from services.json_extractor import (
+    StreamingJSONExtractor,
+    extract_json,
+    validate_llm_json,
+)
+
+GRADING = (
+    '{"advice": "Bon travail", "grading": {'
+    '"1": {"note": 2, "commentaires": "Correct"}, '
+    '"2": {"note": 0.5, "commentaires": "Incomplet"}}}'
+)
+GRADING_VALUE = {
+    "advice": "Bon travail",
+    "grading": {
+        "1": {"note": 2, "commentaires": "Correct"},
+        "2": {"note": 0.5, "commentaires": "Incomplet"},
+    },
+}
+
+# (name, answer, expected value)
+CASES = [
+    ("plain object", '{"a": 1, "b": [true, null]}', {"a": 1, "b": [True, None]}),
+    ("top-level array", "Voici la liste : [1, 2, 3] fin.", [1, 2, 3]),
+    (
+        "prose and code fence",
+        'Voici la correction :\n```json\n{"a": "ok"}\n```\nBonne journée !',
+        {"a": "ok"},
+    ),
+    ("text after the json", '{"a": 1} puis {"b": 2}', {"a": 1}),
+    ("brackets in strings", '{"a": "x { y } ] z"}', {"a": "x { y } ] z"}),
+    ("escaped quotes", '{"a": "il dit \\"oui\\""}', {"a": 'il dit "oui"'}),
+    ("escaped backslash", '{"a": "C:\\\\cours\\\\"}', {"a": "C:\\cours\\"}),
+    ("unicode escape", '{"a": "\\u00e9t\\u00e9"}', {"a": "été"}),
+    (
+        "raw line break in string",
+        '{"a": "ligne 1\nligne 2"}',
+        {"a": "ligne 1\nligne 2"},
+    ),
+    (
+        "curly quotes",
+        "{“advice”: “Bien”, “note”: 3}",
+        {"advice": "Bien", "note": 3},
+    ),
+    (
+        "straight quote in curly string",
+        '{“a”: “il dit "oui"”}',
+        {"a": 'il dit "oui"'},
+    ),
+    (
+        "apostrophe as straight quote",
+        '{"advice": "L"étudiant a compris l"essentiel"}',
+        {"advice": "L'étudiant a compris l'essentiel"},
+    ),
+    (
+        "quote after a letter ending a string",
+        '{"a": "abc", "b": 1}',
+        {"a": "abc", "b": 1},
+    ),
+    ("truncated string", '{"advice": "Bon trav', {"advice": "Bon trav"}),
+    ("truncated after a comma", '{"a": 1, "b": [1, 2,', {"a": 1, "b": [1, 2]}),
+    (
+        "truncated key",
+        '{"advice": "Bon", "grading": {"1": {"note": 2}, "2": {"note": 1, "comm',
+        {"advice": "Bon", "grading": {"1": {"note": 2}, "2": {"note": 1}}},
+    ),
+    ("truncated number", '{"a": [1, 2', {"a": [1, 2]}),
+    ("grading", GRADING, GRADING_VALUE),
+]
+
+# Answers without any usable JSON
+INVALID = [
+    ("no json", "Je ne peux pas corriger cette copie."),
+    ("empty answer", ""),
+]
+
+
+def splits(answer: str):
+    yield "one chunk", [answer]
+    yield "one-character chunks", list(answer)
+    for position in range(1, len(answer)):
+        yield f"split at {position}", [answer[:position], answer[position:]]
+
+
+def stream(chunks, max_depth: int = 2):
+    extractor = StreamingJSONExtractor(max_depth=max_depth)
+    completed = []
+    for chunk in chunks:
+        completed += extractor.feed(chunk)
+    return extractor.result(), completed
+
+
+def check_cases(verbose: bool) -> int:
+    failures = 0
+    for name, answer, expected in CASES:
+        errors = []
+        try:
+            value = extract_json(answer)
+            if value != expected:
+                errors.append(f"extract_json: {value!r}")
+        except ValueError as e:
+            errors.append(f"extract_json: {e}")
+
+        for split, chunks in splits(answer):
+            try:
+                value, _ = stream(chunks)
+            except ValueError as e:
+                errors.append(f"{split}: {e}")
+                break
+            if value != expected:
+                errors.append(f"{split}: {value!r}")
+                break
+
+        failures += bool(errors)
+        if errors or verbose:
+            print(f"{'FAIL' if errors else 'ok  '} {name}")
+            for error in errors:
+                print(f"       {error}")
+
+    for name, answer in INVALID:
+        try:
+            value = extract_json(answer)
+        except ValueError:
+            if verbose:
+                print(f"ok   {name}")
+            continue
+        failures += 1
+        print(f"FAIL {name}\n       no error, returned {value!r}")
+    return failures
+
+
+def check_members(verbose: bool) -> int:
+    # The members are reported once, as soon as they are complete
+    expected = [
+        (("advice",), GRADING_VALUE["advice"]),
+        (("grading", "1"), GRADING_VALUE["grading"]["1"]),
+        (("grading", "2"), GRADING_VALUE["grading"]["2"]),
+        (("grading",), GRADING_VALUE["grading"]),
+    ]
+    failures = 0
+    for split, chunks in splits(GRADING):
+        _, completed = stream(chunks)
+        if completed != expected:
+            failures += 1
+            print(f"FAIL streamed members, {split}\n       {completed!r}")
+            break
+    else:
+        if verbose:
+            print("ok   streamed members")
+
+    # A member is reported when the chunk that completes it is fed
+    extractor = StreamingJSONExtractor()
+    partial = GRADING.index('"grading"')
+    if extractor.feed(GRADING[:partial]) != expected[:1]:
+        failures += 1
+        print("FAIL advice reported before the grading")
+    elif verbose:
+        print("ok   advice reported before the grading")
+    return failures
+
+
+def check_validation(verbose: bool) -> int:
+    failures = 0
+    try:
+        validate_llm_json(GRADING_VALUE, GradingOutput)
+    except ValueError as e:
+        failures += 1
+        print(f"FAIL valid grading rejected\n       {e}")
+    try:
+        validate_llm_json({"advice": "Bien"}, GradingOutput)
+        failures += 1
+        print("FAIL grading without questions accepted")
+    except ValueError:
+        pass
+    if not failures and verbose:
+        print("ok   grading validation")
+    return failures
+
+
+def main(verbose: bool) -> int:
+    failures = (
+        check_cases(verbose) + check_members(verbose) + check_validation(verbose)
+    )
+    print(f"{len(CASES) + len(INVALID)} answers checked, {failures} failure(s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--verbose", action="store_true")
+    sys.exit(main(parser.parse_args().verbose))
@@ -0,0 +1,59 @@
+"""
+Concurrent grading throughput: blocking SDK calls vs native async clients.
+
+Usage (from backend/app):
+    python -m benchmarks.llm_throughput --requests 50 --delay 0.5
+"""
+
+import argparse
+import asyncio
+import time
+from openai import OpenAI
+from services.llm_providers import OpenAIProvider
+from benchmarks.stub_llm_server import start_stub_server
+
+MESSAGES = [
+    {"role": "system", "content": "Tu es un enseignant."},
+    {"role": "user", "content": "Corrige la copie."},
+]
+
+
+async def blocking_grading(client: OpenAI):
+    # Previous implementation: sync SDK call inside an async function
+    response = client.chat.completions.create(model="stub", messages=MESSAGES)
+    return response.choices[0].message.content
+
+
+async def async_grading(provider: OpenAIProvider):
+    return await provider.chat(messages=MESSAGES)
+
+
+async def run(label: str, coroutines):
+    start = time.perf_counter()
+    await asyncio.gather(*coroutines)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<10} {len(coroutines):>5} gradings in {elapsed:7.2f}s "
+        f"-> {len(coroutines) / elapsed:7.2f} gradings/s"
+    )
+
+
+async def main(requests: int, delay: float):
+    server, base_url = start_stub_server(delay=delay)
+    try:
+        client = OpenAI(api_key="stub", base_url=base_url)
+        await run("blocking", [blocking_grading(client) for _ in range(requests)])
+
+        provider = OpenAIProvider(api_key="stub", model="stub", base_url=base_url)
+        await run("async", [async_grading(provider) for _ in range(requests)])
+        await provider.close()
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.5)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.delay))
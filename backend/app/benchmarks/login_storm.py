@@ -0,0 +1,153 @@
+"""
+Login storm: bcrypt verification on the event loop vs in the hashing processes.
+
+Serves the app in-process on a temporary SQLite database holding `--students`
+students, then logs them all in, `--clients` at a time, as at the start of an
+exam, first through the previous login route (bcrypt run by the route
+itself), then through the current one. Keep `--clients` below the size of the
+database pool: the previous route blocks the event loop that would give the
+connections back. While the logins run, a probe requests /api/home
+every 10 ms: its latency shows whether the event loop is still serving other
+requests. The cost factor is read from BCRYPT_ROUNDS (default 12).
+
+Usage (from backend/app):
+    python -m benchmarks.login_storm --students 200 --clients 10
+    BCRYPT_ROUNDS=10 PASSWORD_HASH_WORKERS=4 python -m benchmarks.login_storm
+"""
+
+import os
+import tempfile
+
+# The database and the settings are read when the app is imported
+_directory = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_directory.name, 'bench.db')}"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import argparse
+import asyncio
+import time
+from typing import Iterator
+import httpx
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+import main
+from core.config import settings
+from core.passwords import get_crypt_context, password_hasher
+from core.security import create_token
+from db.init_db import get_db
+from db.session import Base, SessionLocal, engine
+from models import Student
+
+PASSWORD = "exam-2024"
+
+legacy_router = APIRouter()
+
+
+@legacy_router.post("/legacy/student/token")
+async def legacy_login(
+    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+):
+    # Previous implementation: query and bcrypt inside the async route
+    user = db.query(Student).filter(Student.email == form_data.username).first()
+    context = get_crypt_context(settings.BCRYPT_ROUNDS)
+    if not user or not context.verify(form_data.password, user.hashed_password):
+        raise HTTPException(status_code=401, detail="Identifiants ou rôle invalides")
+    return create_token(user)
+
+
+def populate(students: int):
+    hashed_password = get_crypt_context(settings.BCRYPT_ROUNDS).hash(PASSWORD)
+    db = SessionLocal()
+    db.execute(
+        insert(Student),
+        [
+            {
+                "id": s,
+                "name": f"Student {s}",
+                "email": f"student{s}@example.com",
+                "hashed_password": hashed_password,
+            }
+            for s in range(1, students + 1)
+        ],
+    )
+    db.commit()
+    db.close()
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event, latencies: list):
+    while not stop.is_set():
+        # Measured from the planned send time: a blocked loop delays the send
+        due = time.perf_counter() + 0.01
+        await asyncio.sleep(0.01)
+        await client.get("/api/home")
+        latencies.append(time.perf_counter() - due)
+
+
+async def login(client: httpx.AsyncClient, path: str, students: Iterator[int]):
+    for student in students:
+        response = await client.post(
+            path,
+            data={"username": f"student{student}@example.com", "password": PASSWORD},
+        )
+        response.raise_for_status()
+
+
+async def run(label: str, client, path: str, students: int, clients: int):
+    stop = asyncio.Event()
+    latencies = []
+    probe_task = asyncio.create_task(probe(client, stop, latencies))
+
+    start = time.perf_counter()
+    # The clients share the iterator: every student logs in once
+    queue = iter(range(1, students + 1))
+    await asyncio.gather(*(login(client, path, queue) for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe_task
+
+    latencies.sort()
+    p99 = latencies[int(0.99 * (len(latencies) - 1))] * 1000
+    print(
+        f"{label:<8} {students:>5} logins in {elapsed:7.2f}s "
+        f"-> {students / elapsed:7.2f} logins/s   /api/home p99 {p99:8.2f} ms"
+        f"  max {latencies[-1] * 1000:8.2f} ms"
+    )
+
+
+async def main_async(students: int, clients: int):
+    Base.metadata.create_all(engine)
+    populate(students)
+    main.app.include_router(legacy_router, prefix="/api")
+
+    # Start the hashing processes before timing the logins
+    await asyncio.gather(
+        *(password_hasher.hash(PASSWORD) for _ in range(password_hasher.workers))
+    )
+    print(
+        f"bcrypt cost {settings.BCRYPT_ROUNDS}, {password_hasher.workers} hashing "
+        f"process(es), {os.cpu_count()} core(s)"
+    )
+
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=main.app),
+            base_url="http://bench",
+            timeout=None,
+        ) as client:
+            for label, path in (
+                ("inline", "/api/legacy/student/token"),
+                ("pool", "/api/student/token"),
+            ):
+                await run(label, client, path, students, clients)
+    finally:
+        password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.students, args.clients))
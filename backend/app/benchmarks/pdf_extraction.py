@@ -0,0 +1,92 @@
+"""
+Text extraction of a large syllabus: previous loop vs page ranges in processes.
+
+Generates a `--pages` pages syllabus, then extracts its text through the
+previous implementation (the whole PDF in memory, the pages appended to one
+string), through the extractor in a single thread, and through the extractor
+splitting the pages over `--workers` processes. The texts of the extractor
+are checked against the previous one, page per page.
+
+Usage (from backend/app):
+    python -m benchmarks.pdf_extraction --pages 300 --workers 2 4
+"""
+
+import os
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import argparse
+import asyncio
+import tempfile
+import time
+from io import BytesIO
+from PyPDF2 import PdfReader
+from services.pdf_extraction import PdfTextExtractor
+from benchmarks.pdf_fixture import make_syllabus_pdf
+
+
+def legacy_extract(path: str) -> str:
+    # Previous implementation
+    with open(path, "rb") as pdf_file:
+        reader = PdfReader(BytesIO(pdf_file.read()))
+    text = ""
+    for page in reader.pages:
+        text += page.extract_text()
+    return text.strip()
+
+
+async def time_extractor(extractor: PdfTextExtractor, path: str, runs: int):
+    # The first run starts the processes: not counted
+    text, offsets = await extractor.extract(path)
+    start = time.perf_counter()
+    for _ in range(runs):
+        await extractor.extract(path)
+    return (time.perf_counter() - start) / runs, text, offsets
+
+
+def report(name: str, seconds: float, pages: int):
+    print(f"{name:<24} {seconds * 1000:8.1f} ms  {pages / seconds:8.1f} pages/s")
+
+
+async def main_async(args):
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as pdf_file:
+        pdf_file.write(make_syllabus_pdf(args.pages))
+    print(
+        f"{args.pages} pages, {os.path.getsize(pdf_file.name) / 1e6:.1f} MB, "
+        f"{os.cpu_count()} core(s)"
+    )
+
+    try:
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            expected = legacy_extract(pdf_file.name)
+        report("previous", (time.perf_counter() - start) / args.runs, args.pages)
+
+        for workers in [1] + args.workers:
+            extractor = PdfTextExtractor(workers=workers, min_parallel_pages=1)
+            try:
+                seconds, text, offsets = await time_extractor(
+                    extractor, pdf_file.name, args.runs
+                )
+            finally:
+                extractor.shutdown()
+
+            assert len(offsets) == args.pages
+            # The previous loop joined the pages without separator
+            pages = [
+                text[offset : end - 1]
+                for offset, end in zip(offsets, offsets[1:] + [len(text) + 1])
+            ]
+            assert "".join(pages).strip() == expected, "texts differ"
+            name = "thread" if workers == 1 else f"{workers} processes"
+            report(name, seconds, args.pages)
+    finally:
+        os.unlink(pdf_file.name)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--runs", type=int, default=3)
+    asyncio.run(main_async(parser.parse_args()))
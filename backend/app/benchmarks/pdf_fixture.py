@@ -0,0 +1,69 @@
+"""
+Syllabus PDFs of any number of pages, generated without extra dependencies.
+
+Every page holds `lines` lines of text in Helvetica, and the first line of a
+page names its chapter, so that text extraction has real work to do.
+"""
+
+CHAPTER_PAGES = 10
+
+LOREM = (
+    "Les etudiants etudient les notions du chapitre a travers des exercices "
+    "et des exemples commentes en classe."
+)
+
+
+def page_text(page: int, lines: int):
+    yield f"Chapitre {page // CHAPTER_PAGES + 1} - page {page + 1}"
+    for line in range(1, lines):
+        yield f"{line}. {LOREM}"
+
+
+def page_stream(page: int, lines: int) -> bytes:
+    commands = ["BT", "/F1 9 Tf", "11 TL", "40 800 Td"]
+    for text in page_text(page, lines):
+        escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        commands.append(f"({escaped}) Tj T*")
+    commands.append("ET")
+    return "\n".join(commands).encode("latin-1")
+
+
+def make_syllabus_pdf(pages: int, lines: int = 60) -> bytes:
+    """Returns the bytes of a `pages` pages PDF."""
+    # Objects: 1 catalog, 2 page tree, 3 font, then a page and its content
+    # stream for every page
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    kids = []
+    for page in range(pages):
+        page_id, content_id = 4 + 2 * page, 5 + 2 * page
+        kids.append(f"{page_id} 0 R")
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode()
+        stream = page_stream(page, lines)
+        objects[content_id] = (
+            f"<< /Length {len(stream)} >>\nstream\n".encode()
+            + stream
+            + b"\nendstream"
+        )
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode()
+
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for number in sorted(objects):
+        offsets[number] = len(pdf)
+        pdf += f"{number} 0 obj\n".encode() + objects[number] + b"\nendobj\n"
+
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for number in sorted(objects):
+        pdf += f"{offsets[number]:010d} 00000 n \n".encode()
+    pdf += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF\n"
+    ).encode()
+    return bytes(pdf)
@@ -0,0 +1,175 @@
+"""
+Query plans of the hot lookups on student_response, enrollment and feedback.
+
+Runs the grading and enrollment CRUD functions against a temporary SQLite
+database, records the statements they send, and prints the EXPLAIN QUERY PLAN
+of each one. Exits with status 1 if any of them scans one of these tables
+instead of searching it through an index, so that a dropped or unused index
+is noticed before it reaches production.
+
+Usage (from backend/app):
+    python -m benchmarks.query_plans --students 200 --verbose
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import sys
+import tempfile
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+from db.session import Base
+from models import Assignment, Course, Enrollment, Question, Student, StudentResponse
+from schemas.enrollment import EnrollmentCreate
+from crud.enrollment_crud import (
+    create_enrollment,
+    delete_enrollment,
+    get_courses_by_student,
+    get_enrollments_by_student,
+)
+from crud.grading_crud import (
+    get_student_grading_feedback,
+    get_student_responses,
+    process_and_store_llm_output,
+    validate_student_assignment,
+)
+
+HOT_TABLES = ("student_response", "enrollment", "feedback")
+FULL_SCAN = re.compile(rf"^SCAN ({'|'.join(HOT_TABLES)})\b")
+
+
+def populate(db, students: int, questions: int):
+    db.add(Course(id=1, name="Plans", code="PLANS"))
+    db.add(Course(id=2, name="Other", code="OTHER"))
+    db.add(Assignment(id=1, title="Assignment", points=20, course_id=1))
+    db.execute(
+        insert(Student),
+        [
+            {
+                "id": s,
+                "name": f"Student {s}",
+                "email": f"student{s}@example.com",
+                "hashed_password": "x",
+            }
+            for s in range(1, students + 1)
+        ],
+    )
+    db.execute(
+        insert(Enrollment),
+        [
+            {"student_id": s, "course_id": 1, "course_code": "PLANS"}
+            for s in range(1, students + 1)
+        ],
+    )
+    db.execute(
+        insert(Question),
+        [
+            {"id": q, "question_text": "?", "max_points": 5, "assignment_id": 1}
+            for q in range(1, questions + 1)
+        ],
+    )
+    db.execute(
+        insert(StudentResponse),
+        [
+            {
+                "assignment_id": 1,
+                "student_id": s,
+                "question_id": q,
+                "response_text": "x",
+            }
+            for s in range(1, students + 1)
+            for q in range(1, questions + 1)
+        ],
+    )
+    db.commit()
+
+
+def exercise(db, student_id: int, questions: int):
+    # The lookups made while grading a copy and reviewing it
+    asyncio.run(get_student_responses(db, 1, student_id))
+    process_and_store_llm_output(
+        db=db,
+        llm_output={
+            "advice": "Keep going",
+            "grading": {
+                str(q): {"note": 3, "commentaires": "ok"}
+                for q in range(1, questions + 1)
+            },
+        },
+        assignment_id=1,
+        student_id=student_id,
+    )
+    get_student_grading_feedback(db, student_id=student_id, assignment_id=1)
+    validate_student_assignment(db, student_id=student_id, assignment_id=1)
+
+    # The lookups made when a student joins, lists and leaves courses
+    create_enrollment(db, EnrollmentCreate(student_id=student_id, course_code="OTHER"))
+    get_enrollments_by_student(db, student_id)
+    get_courses_by_student(db, student_id)
+    delete_enrollment(db, student_id, "OTHER")
+
+
+def explain(connection, statement: str, parameters) -> list:
+    if isinstance(parameters, list):
+        # executemany: the plan is the same for every parameter set
+        parameters = parameters[0] if parameters else ()
+    cursor = connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return [row[3] for row in cursor.fetchall()]
+
+
+def main(students: int, questions: int, verbose: bool) -> int:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'plans.db')}")
+        Base.metadata.create_all(engine)
+        session_factory = sessionmaker(bind=engine, autoflush=False)
+
+        db = session_factory()
+        populate(db, students, questions)
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if any(table in statement for table in HOT_TABLES):
+                statements.append((statement, parameters))
+
+        event.listen(engine, "before_cursor_execute", record)
+        exercise(db, students // 2, questions)
+        event.remove(engine, "before_cursor_execute", record)
+        db.close()
+
+        failures = 0
+        raw = engine.raw_connection()
+        try:
+            seen = set()
+            for statement, parameters in statements:
+                if statement in seen:
+                    continue
+                seen.add(statement)
+                plan = explain(raw.driver_connection, statement, parameters)
+                scans = [step for step in plan if FULL_SCAN.match(step)]
+                failures += bool(scans)
+                if scans or verbose:
+                    print(" ".join(statement.split()))
+                    for step in plan:
+                        marker = "!!" if step in scans else "  "
+                        print(f"  {marker} {step}")
+                    print()
+        finally:
+            raw.close()
+            engine.dispose()
+
+    print(
+        f"{len(seen)} statements checked, {failures} full table scan(s) on "
+        f"{', '.join(HOT_TABLES)}"
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--questions", type=int, default=4)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    sys.exit(main(args.students, args.questions, args.verbose))
@@ -0,0 +1,115 @@
+"""
+Question composition: one transaction per question vs a single bulk transaction.
+
+Both paths write the same questions and answer keys into a temporary SQLite
+database, so that the difference comes from the number of commits only.
+
+Usage (from backend/app):
+    python -m benchmarks.question_bulk_insert --questions 50 --runs 20
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from db.session import Base
+from models.operation_models import Assignment, Course, Question, TeacherResponse
+from schemas.question import AssignmentQuestionsCreate
+from crud.question_crud import create_questions
+
+
+def legacy_create_questions(db, assignment_questions: AssignmentQuestionsCreate):
+    # Previous implementation: 2N+1 transactions for N questions
+    created_questions = []
+    for question in assignment_questions.questions:
+        db_question = Question(
+            question_text=question.question_text,
+            max_points=question.max_points,
+            assignment_id=assignment_questions.assignment_id,
+        )
+        db.add(db_question)
+        db.commit()
+        db.refresh(db_question)
+
+        for teacher_answer in question.teacher_answers:
+            db.add(
+                TeacherResponse(
+                    response_text=teacher_answer["answer_text"],
+                    question_id=db_question.id,
+                )
+            )
+        db.commit()
+        db.refresh(db_question)
+        created_questions.append(db_question)
+
+    assignment = (
+        db.query(Assignment)
+        .filter(Assignment.id == assignment_questions.assignment_id)
+        .first()
+    )
+    assignment.composition = True
+    db.commit()
+    db.refresh(assignment)
+    return created_questions
+
+
+def make_questions(assignment_id: int, count: int) -> AssignmentQuestionsCreate:
+    return AssignmentQuestionsCreate(
+        assignment_id=assignment_id,
+        questions=[
+            {
+                "question_text": f"Question {i} ?",
+                "max_points": 2,
+                "teacher_answers": [{"answer_text": f"Réponse {i}"}],
+            }
+            for i in range(count)
+        ],
+    )
+
+
+def run(label: str, create, session_factory, questions: int, runs: int):
+    timings = []
+    for _ in range(runs):
+        db = session_factory()
+        assignment = Assignment(title="Bench", points=questions * 2, course_id=1)
+        db.add(assignment)
+        db.commit()
+
+        payload = make_questions(assignment.id, questions)
+        start = time.perf_counter()
+        create(db, payload)
+        timings.append(time.perf_counter() - start)
+        db.close()
+
+    timings.sort()
+    median = timings[len(timings) // 2] * 1000
+    print(
+        f"{label:<8} {questions} questions: median {median:8.2f} ms"
+        f"  best {timings[0] * 1000:8.2f} ms"
+    )
+
+
+def main(questions: int, runs: int):
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        session_factory = sessionmaker(bind=engine, autoflush=False)
+
+        db = session_factory()
+        db.add(Course(id=1, name="Bench", code="BENCH"))
+        db.commit()
+        db.close()
+
+        run("legacy", legacy_create_questions, session_factory, questions, runs)
+        run("bulk", create_questions, session_factory, questions, runs)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    main(args.questions, args.runs)
@@ -0,0 +1,92 @@
+"""
+Cost of the token revocation check with `--revoked` revoked token ids.
+
+Fills the revoked_token table of a temporary SQLite database, loads it into
+the revocation list, and reports the load time, the memory of the list, the
+time of a refresh picking up `--added` new revocations, and the time of a
+membership check (revoked and valid ids) next to the JWT decode of an access
+token, which every authenticated request does anyway.
+
+Usage (from backend/app):
+    python -m benchmarks.revocation_check --revoked 1000000
+"""
+
+import os
+import tempfile
+
+# The database and the settings are read when the app is imported
+_directory = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_directory.name, 'bench.db')}"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import argparse
+import sys
+import time
+import timeit
+from datetime import datetime, timedelta
+from uuid import uuid4
+from sqlalchemy import insert
+from core.revocation import RevocationList
+from core.security import create_access_token, decode_access_token
+from db.session import Base, SessionLocal, engine
+from models import RevokedToken
+
+
+def insert_revoked(db, count: int):
+    expires_at = datetime.utcnow() + timedelta(days=7)
+    for start in range(0, count, 100000):
+        db.execute(
+            insert(RevokedToken),
+            [
+                {"jti": uuid4().hex, "expires_at": expires_at}
+                for _ in range(min(100000, count - start))
+            ],
+        )
+    db.commit()
+
+
+def list_size(revocations: RevocationList) -> int:
+    keys = revocations._keys
+    return sys.getsizeof(keys) + sum(sys.getsizeof(key) for key in keys)
+
+
+def report(label: str, statement, number: int):
+    best = min(timeit.repeat(statement, number=number, repeat=5))
+    print(f"{label:<24} {best / number * 1e9:8.0f} ns")
+
+
+def main(args):
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    insert_revoked(db, args.revoked)
+
+    revocations = RevocationList(refresh_interval=30)
+    start = time.perf_counter()
+    revocations.load(db)
+    print(
+        f"load     {len(revocations):>9} ids in {time.perf_counter() - start:6.2f}s"
+        f"  ({list_size(revocations) / 2**20:.0f} MiB in memory)"
+    )
+
+    revoked = db.query(RevokedToken.jti).first().jti
+    insert_revoked(db, args.added)
+    start = time.perf_counter()
+    revocations.refresh(db)
+    print(
+        f"refresh  {args.added:>9} new ids in "
+        f"{(time.perf_counter() - start) * 1000:6.2f} ms"
+    )
+    db.close()
+
+    valid = uuid4().hex
+    token = create_access_token({"sub": "student@example.com", "role": "student"})
+    report("check revoked id", lambda: revoked in revocations, 10**6)
+    report("check valid id", lambda: valid in revocations, 10**6)
+    report("decode access token", lambda: decode_access_token(token), 10**4)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--revoked", type=int, default=1000000)
+    parser.add_argument("--added", type=int, default=1000)
+    main(parser.parse_args())
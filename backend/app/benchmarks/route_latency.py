@@ -0,0 +1,156 @@
+"""
+Latency of a cheap GET route while gradings are in flight: sync Session vs
+AsyncSession.
+
+Serves the app in-process on a temporary SQLite database and keeps
+`--gradings` POST /api/get_grading/ calls in flight against the stub LLM
+server. Meanwhile `--readers` clients read the grading feedback of a copy,
+first through the previous implementation (sync Session queries run on the
+event loop), then through the current AsyncSession route, and the latency
+percentiles of both are compared.
+
+Usage (from backend/app):
+    python -m benchmarks.route_latency --gradings 50 --readers 10 --duration 5
+"""
+
+import os
+import tempfile
+
+# The database and the settings are read when the app is imported
+_directory = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_directory.name, 'bench.db')}"
+os.environ["GRADING_CACHE_ENABLED"] = "false"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import argparse
+import asyncio
+import time
+import httpx
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+import main
+from db.init_db import get_db
+from db.session import Base, SessionLocal, engine
+from core.security import check_user_active, create_token
+from crud.grading_crud import get_student_grading_feedback
+from models import Student
+from services.llm_providers import OpenAIProvider
+from services.llm_registry import llm_registry
+from benchmarks.gradebook_query import populate
+from benchmarks.stub_llm_server import start_stub_server
+
+legacy_router = APIRouter()
+
+
+@legacy_router.get("/legacy/grading_feedback/{student_id}/{assignment_id}")
+async def legacy_grading_feedback(
+    student_id: int,
+    assignment_id: int,
+    db: Session = Depends(get_db),
+    user=Depends(check_user_active),
+):
+    # Previous implementation: sync Session queries inside an async route
+    return get_student_grading_feedback(db, student_id, assignment_id)
+
+
+GRADING_REQUEST = {
+    "teacher_corrected_assessment": "Question 1: 2 + 2 = 4",
+    "grading_criteria": "2 points",
+    "student_responses": "Question 1: 4",
+}
+
+
+async def keep_grading(client: httpx.AsyncClient, stop: asyncio.Event, done: list):
+    while not stop.is_set():
+        response = await client.post(
+            "/api/get_grading/", params={"provider": "openai"}, json=GRADING_REQUEST
+        )
+        response.raise_for_status()
+        done.append(1)
+
+
+async def read(client: httpx.AsyncClient, path: str, stop: asyncio.Event, latencies):
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get(path)
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+
+
+async def run(label: str, client, path: str, gradings: int, readers: int, duration):
+    stop = asyncio.Event()
+    latencies, done = [], []
+    tasks = [
+        asyncio.create_task(keep_grading(client, stop, done)) for _ in range(gradings)
+    ]
+    # Let the gradings reach the LLM before measuring
+    await asyncio.sleep(0.2)
+    tasks += [
+        asyncio.create_task(read(client, path, stop, latencies))
+        for _ in range(readers)
+    ]
+    await asyncio.sleep(duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+
+    latencies.sort()
+
+    def percentile(p: float) -> float:
+        return latencies[int(p * (len(latencies) - 1))] * 1000
+
+    print(
+        f"{label:<8} {len(latencies):>6} reads  p50 {percentile(0.5):8.2f} ms"
+        f"  p99 {percentile(0.99):8.2f} ms  max {latencies[-1] * 1000:8.2f} ms"
+        f"  gradings {len(done):>5}"
+    )
+
+
+async def main_async(args):
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    populate(db, args.assignments, args.students, args.questions)
+    token = create_token(db.get(Student, 1)).access_token
+    db.close()
+
+    server, base_url = start_stub_server(delay=args.delay)
+    llm_registry.register(
+        OpenAIProvider(api_key="stub", model="stub", base_url=base_url)
+    )
+    main.app.include_router(legacy_router, prefix="/api")
+
+    print(
+        f"{args.gradings} gradings in flight ({args.delay}s each), "
+        f"{args.readers} readers, {args.assignments} assignments x "
+        f"{args.students} students"
+    )
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=main.app),
+            base_url="http://bench",
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=None,
+        ) as client:
+            for label, path in (
+                ("sync", "/api/legacy/grading_feedback/1/1"),
+                ("async", "/api/grading_feedback/1/1"),
+            ):
+                (await client.get(path)).raise_for_status()
+                await run(
+                    label, client, path, args.gradings, args.readers, args.duration
+                )
+    finally:
+        await llm_registry.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--gradings", type=int, default=50)
+    parser.add_argument("--readers", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--delay", type=float, default=0.5)
+    parser.add_argument("--assignments", type=int, default=10)
+    parser.add_argument("--students", type=int, default=100)
+    parser.add_argument("--questions", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
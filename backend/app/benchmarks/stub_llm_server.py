@@ -0,0 +1,116 @@
+"""
+Local OpenAI-compatible chat completion server used by the benchmarks.
+
+Every request sleeps for `delay` seconds before answering with a fixed
+grading, which mimics the latency of a real provider without any cost.
+Streamed requests ("stream": true) receive the grading in small chunks
+spread over the same delay.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+GRADING_CONTENT = json.dumps(
+    {
+        "advice": "Bon travail dans l'ensemble.",
+        "grading": {"1": {"note": 2, "commentaires": "Bonne réponse."}},
+    }
+)
+
+# Characters per chunk of a streamed answer
+STREAM_CHUNK_SIZE = 16
+
+
+def make_handler(delay: float, content: str):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if request.get("stream"):
+                self.stream_completion()
+                return
+
+            time.sleep(delay)
+
+            body = json.dumps(
+                {
+                    "id": "stub",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": "stub",
+                    "choices": [
+                        {
+                            "index": 0,
+                            "finish_reason": "stop",
+                            "message": {"role": "assistant", "content": content},
+                        }
+                    ],
+                    "usage": {
+                        "prompt_tokens": 1,
+                        "completion_tokens": 1,
+                        "total_tokens": 2,
+                    },
+                }
+            ).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def stream_completion(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            pieces = [
+                content[i : i + STREAM_CHUNK_SIZE]
+                for i in range(0, len(content), STREAM_CHUNK_SIZE)
+            ]
+            for piece in pieces + [None]:
+                time.sleep(delay / (len(pieces) + 1))
+                chunk = {
+                    "id": "stub",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": "stub",
+                    "choices": [
+                        {
+                            "index": 0,
+                            "delta": {"content": piece} if piece else {},
+                            "finish_reason": None if piece else "stop",
+                        }
+                    ],
+                }
+                self.write_chunk(f"data: {json.dumps(chunk)}\n\n")
+            self.write_chunk("data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+
+        def write_chunk(self, text: str):
+            data = text.encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def start_stub_server(delay: float = 0.5, content: str = GRADING_CONTENT):
+    """
+    Starts the stub server on a free local port in a daemon thread.
+
+    Returns:
+        tuple: The server instance and its base URL (".../v1").
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(delay, content))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_port}/v1"
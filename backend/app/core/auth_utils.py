@@ -1,11 +1,16 @@
+from datetime import datetime
+from typing import Optional
 from fastapi import Depends, HTTPException
 from sqlalchemy.orm import Session
 from jwt import InvalidTokenError
 
+from db.executor import db_executor
+
 from models.user_models import Teacher, Student
 from db.init_db import get_db
 from schemas.token import Token
 from .security import create_token, create_refresh_token, verify_token
+from .revocation import revocation_list
 
 
 async def token_refresher(refresh_token: str, db: Session = Depends(get_db)):
@@ -26,7 +31,9 @@ async def token_refresher(refresh_token: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=401, detail="Invalid user")
 
     access_token = create_token(user)
-    refresh_token = create_refresh_token({"sub": user.email, "role": role})
+    refresh_token = create_refresh_token(
+        {"sub": user.email, "role": role, "uid": user.id}
+    )
 
     # Debugging print statements
     print(f"Access Token: {access_token}")
@@ -37,3 +44,18 @@ async def token_refresher(refresh_token: str, db: Session = Depends(get_db)):
         refresh_token=str(refresh_token),
         token_type="bearer",
     )
+
+
+async def token_revoker(access_claims: dict, refresh_token: Optional[str], db: Session):
+    # Tokens issued without a jti cannot be revoked: they expire
+    payloads = [access_claims]
+    if refresh_token:
+        payloads.append(verify_token(refresh_token))
+    for payload in payloads:
+        if payload.get("jti"):
+            await db_executor.run(
+                revocation_list.revoke,
+                db,
+                payload["jti"],
+                datetime.utcfromtimestamp(payload["exp"]),
+            )
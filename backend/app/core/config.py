@@ -11,10 +11,46 @@ class Settings:
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(
         os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 600)
     )
+    # bcrypt cost factor of new hashes; other hashes are updated at login
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", 12))
+    # Processes hashing and verifying passwords (0: one per core)
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", 0))
+    # Users resolved from access tokens, cached for PRINCIPAL_CACHE_TTL seconds
+    PRINCIPAL_CACHE_ENABLED: bool = (
+        os.getenv("PRINCIPAL_CACHE_ENABLED", "true").lower() == "true"
+    )
+    PRINCIPAL_CACHE_TTL: int = int(os.getenv("PRINCIPAL_CACHE_TTL", 300))
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = int(
+        os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", 10000)
+    )
+    # Redis URL of a cache shared by all the workers (empty: one per worker)
+    PRINCIPAL_CACHE_URL: str = os.getenv("PRINCIPAL_CACHE_URL", "")
+    # Seconds between two loads of the tokens revoked by the other workers
+    REVOCATION_REFRESH_INTERVAL: int = int(
+        os.getenv("REVOCATION_REFRESH_INTERVAL", 30)
+    )
 
     # ----------Database configuration-----------
     # The DATABASE_URL variable will be loaded from the .env file
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./app/database.db")
+    # Connection pool of server databases (PostgreSQL)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 20))
+    # Seconds a request waits for a free connection before failing
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    # Seconds after which a connection is replaced (-1: never)
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    # Check connections before using them, to survive database restarts
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # Threads running the sync queries of the async routes; keep it below
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW so that threads do not wait for connections
+    DB_THREADPOOL_SIZE: int = int(os.getenv("DB_THREADPOOL_SIZE", 16))
+    # SQLite: write-ahead log, so that reads are not blocked by a write
+    SQLITE_WAL: bool = os.getenv("SQLITE_WAL", "true").lower() == "true"
+    # SQLite: milliseconds a write waits for the database lock
+    SQLITE_BUSY_TIMEOUT: int = int(os.getenv("SQLITE_BUSY_TIMEOUT", 5000))
+    # SQLite: bytes of the database file read through mmap (0: disabled)
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
 
     # ----------API configuration----------------
 
@@ -32,6 +68,93 @@ class Settings:
     azure_openai_endpoint: str = os.getenv("AZURE_OPENAI_ENDPOINT")
     azure_openai_deployment_name: str = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME")
 
+    # ----------LLM providers configuration------
+    # Provider used when neither the request nor the course selects one
+    # (openai, azure_openai, together, github)
+    LLM_DEFAULT_PROVIDER: str = os.getenv("LLM_DEFAULT_PROVIDER", "github")
+    # Provider used for chapter extraction and question generation
+    LLM_QUERY_PROVIDER: str = os.getenv("LLM_QUERY_PROVIDER", "openai")
+    OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4o")
+    TOGETHER_MODEL: str = os.getenv(
+        "TOGETHER_MODEL", "meta-llama/Meta-Llama-3-70B-Instruct-Lite"
+    )
+    GITHUB_MODEL: str = os.getenv("GITHUB_MODEL", "Meta-Llama-3-8B-Instruct")
+    GITHUB_MODELS_ENDPOINT: str = os.getenv(
+        "GITHUB_MODELS_ENDPOINT", "https://models.inference.ai.azure.com"
+    )
+    # Connection pool shared by all the calls made to one provider
+    LLM_MAX_CONNECTIONS: int = int(os.getenv("LLM_MAX_CONNECTIONS", 100))
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = int(
+        os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", 20)
+    )
+    LLM_KEEPALIVE_EXPIRY: float = float(os.getenv("LLM_KEEPALIVE_EXPIRY", 60))
+    LLM_TIMEOUT: float = float(os.getenv("LLM_TIMEOUT", 120))
+    # Deadline of a single LLM call attempt, in seconds
+    LLM_CALL_TIMEOUT: float = float(os.getenv("LLM_CALL_TIMEOUT", 60))
+    # Retries of a call failing with a timeout, a 429 or a 5xx
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", 3))
+    LLM_BACKOFF_BASE: float = float(os.getenv("LLM_BACKOFF_BASE", 0.5))
+    LLM_BACKOFF_MAX: float = float(os.getenv("LLM_BACKOFF_MAX", 8))
+    # Consecutive failures opening the circuit, and seconds before a new trial
+    LLM_BREAKER_THRESHOLD: int = int(os.getenv("LLM_BREAKER_THRESHOLD", 5))
+    LLM_BREAKER_RESET: float = float(os.getenv("LLM_BREAKER_RESET", 30))
+    # Provider used when the selected one keeps failing (empty: no failover)
+    LLM_FALLBACK_PROVIDER: str = os.getenv("LLM_FALLBACK_PROVIDER", "")
+    # Ask the providers that support it for JSON (structured output) answers
+    LLM_JSON_MODE: bool = os.getenv("LLM_JSON_MODE", "true").lower() == "true"
+
+    # ----------Grading queue configuration------
+    # Number of background workers grading submissions concurrently
+    GRADING_WORKERS: int = int(os.getenv("GRADING_WORKERS", 4))
+    # Seconds an idle worker waits before polling the job table again
+    GRADING_POLL_INTERVAL: float = float(os.getenv("GRADING_POLL_INTERVAL", 2))
+    # Number of attempts before a grading job is marked as failed
+    GRADING_MAX_ATTEMPTS: int = int(os.getenv("GRADING_MAX_ATTEMPTS", 3))
+    # Seconds before the first retry of a failed job, doubled at each attempt
+    GRADING_RETRY_DELAY: float = float(os.getenv("GRADING_RETRY_DELAY", 30))
+    # Seconds after which a running job is deemed abandoned by its process
+    GRADING_LEASE_TIMEOUT: float = float(os.getenv("GRADING_LEASE_TIMEOUT", 900))
+    # Grade each question with its own LLM call instead of the whole copy at once
+    GRADING_PER_QUESTION: bool = (
+        os.getenv("GRADING_PER_QUESTION", "false").lower() == "true"
+    )
+    # Maximum number of questions of one copy graded at the same time
+    GRADING_QUESTION_CONCURRENCY: int = int(
+        os.getenv("GRADING_QUESTION_CONCURRENCY", 8)
+    )
+
+    # ----------Syllabus ingestion configuration-
+    # Number of background workers downloading and chapterizing syllabi
+    SYLLABUS_WORKERS: int = int(os.getenv("SYLLABUS_WORKERS", 2))
+    # Seconds an idle worker waits before polling the course table again
+    SYLLABUS_POLL_INTERVAL: float = float(os.getenv("SYLLABUS_POLL_INTERVAL", 5))
+    # Number of attempts before the ingestion of a syllabus is marked as failed
+    SYLLABUS_MAX_ATTEMPTS: int = int(os.getenv("SYLLABUS_MAX_ATTEMPTS", 3))
+    # Seconds after which a syllabus in progress is deemed abandoned
+    SYLLABUS_LEASE_TIMEOUT: float = float(os.getenv("SYLLABUS_LEASE_TIMEOUT", 900))
+    # Seconds allowed to connect to the syllabus host, and for the whole download
+    SYLLABUS_CONNECT_TIMEOUT: float = float(os.getenv("SYLLABUS_CONNECT_TIMEOUT", 10))
+    SYLLABUS_DOWNLOAD_TIMEOUT: float = float(
+        os.getenv("SYLLABUS_DOWNLOAD_TIMEOUT", 60)
+    )
+    # Larger syllabi are rejected (default: 20 MB)
+    SYLLABUS_MAX_BYTES: int = int(os.getenv("SYLLABUS_MAX_BYTES", 20 * 1024 * 1024))
+    # Processes extracting the text of large PDFs (0: one per core)
+    PDF_EXTRACTION_WORKERS: int = int(os.getenv("PDF_EXTRACTION_WORKERS", 0))
+    # Smaller PDFs are extracted in a thread, without the processes
+    PDF_PARALLEL_MIN_PAGES: int = int(os.getenv("PDF_PARALLEL_MIN_PAGES", 50))
+
+    # ----------Grading cache configuration------
+    GRADING_CACHE_ENABLED: bool = (
+        os.getenv("GRADING_CACHE_ENABLED", "true").lower() == "true"
+    )
+    # Seconds after which a cached grading is ignored (default: 7 days)
+    GRADING_CACHE_TTL: int = int(os.getenv("GRADING_CACHE_TTL", 7 * 24 * 3600))
+    # Least recently used entries are evicted above this size
+    GRADING_CACHE_MAX_ENTRIES: int = int(
+        os.getenv("GRADING_CACHE_MAX_ENTRIES", 10000)
+    )
+
     # ----------Email configuration--------------
 
 
@@ -0,0 +1,101 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+from passlib.context import CryptContext
+from .config import settings
+
+
+@lru_cache(maxsize=None)
+def get_crypt_context(rounds: int) -> CryptContext:
+    # Hashes made with another cost factor are flagged for an update
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+
+# Run in the worker processes: module-level so that they can be pickled
+def _hash(password: str, rounds: int) -> str:
+    return get_crypt_context(rounds).hash(password)
+
+
+def _verify_and_update(
+    password: str, hashed_password: str, rounds: int
+) -> Tuple[bool, Optional[str]]:
+    return get_crypt_context(rounds).verify_and_update(password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Hashes and verifies bcrypt passwords in a pool of worker processes.
+
+    bcrypt is slow on purpose (about 0.3 s at cost 12). Run in the server
+    process, every login holds a core, and a class logging in at the start of
+    an exam is served one student at a time. The pool spreads them over
+    `workers` processes (default: one per core) while the event loop keeps
+    serving the other requests.
+
+    Example:
+        valid, new_hash = await password_hasher.verify_and_update(pw, hashed)
+    """
+
+    def __init__(self, rounds: int, workers: Optional[int] = None):
+        self.rounds = rounds
+        self.workers = workers or os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Forking a process running threads (event loop, db threads)
+                # is unsafe: start the workers from a fresh interpreter
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    async def hash(self, password: str) -> str:
+        return await asyncio.wrap_future(
+            self.start().submit(_hash, password, self.rounds)
+        )
+
+    async def verify_and_update(
+        self, password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Verifies a password against its hash.
+
+        Returns:
+            Tuple[bool, Optional[str]]: Whether the password is valid, and a
+            new hash to store when the hash was made with another cost factor.
+        """
+        return await asyncio.wrap_future(
+            self.start().submit(
+                _verify_and_update, password, hashed_password, self.rounds
+            )
+        )
+
+    def hash_sync(self, password: str) -> str:
+        """Same as `hash`, for sync code: blocks the calling thread only."""
+        return self.start().submit(_hash, password, self.rounds).result()
+
+    def verify_sync(self, password: str, hashed_password: str) -> bool:
+        """Same as `verify_and_update`, for sync code, without the update."""
+        future = self.start().submit(
+            _verify_and_update, password, hashed_password, self.rounds
+        )
+        return future.result()[0]
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+password_hasher = PasswordHasher(
+    rounds=settings.BCRYPT_ROUNDS, workers=settings.PASSWORD_HASH_WORKERS
+)
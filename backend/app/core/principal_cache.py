@@ -0,0 +1,215 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple, Union
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from core.config import settings
+from models.user_models import Institution, Teacher, Student
+
+# Never cached, nor sent to a shared store
+EXCLUDED_COLUMNS = {"hashed_password"}
+
+USER_TYPES = {"teacher": Teacher, "student": Student}
+
+
+def snapshot_principal(user: Union[Teacher, Student]) -> dict:
+    """Returns the columns of a user, and of the institutions of a teacher."""
+
+    def columns(obj) -> dict:
+        return {
+            attr.key: getattr(obj, attr.key)
+            for attr in inspect(type(obj)).column_attrs
+            if attr.key not in EXCLUDED_COLUMNS
+        }
+
+    snapshot = {"columns": columns(user)}
+    if isinstance(user, Teacher):
+        snapshot["institutions"] = [columns(i) for i in user.institutions]
+    return snapshot
+
+
+def restore_principal(role: str, snapshot: dict) -> Union[Teacher, Student]:
+    """
+    Rebuilds a user from its snapshot, detached from any session.
+
+    Every request gets its own instance, so that a route cannot change the
+    cached principal of another one.
+    """
+    user = USER_TYPES[role](**snapshot["columns"])
+    if "institutions" in snapshot:
+        user.institutions = [Institution(**i) for i in snapshot["institutions"]]
+    return user
+
+
+class MemoryPrincipalStore:
+    """In-process TTL/LRU store, private to each worker."""
+
+    def __init__(self, ttl: int, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, role: str, email: str, issued_at) -> Optional[dict]:
+        key = (role, email, issued_at)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    async def set(self, role: str, email: str, issued_at, snapshot: dict):
+        with self._lock:
+            self._entries[(role, email, issued_at)] = (
+                time.monotonic() + self.ttl,
+                snapshot,
+            )
+            self._entries.move_to_end((role, email, issued_at))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, role: str, email: str):
+        with self._lock:
+            for key in [k for k in self._entries if k[:2] == (role, email)]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisPrincipalStore:
+    """
+    Store shared by all the workers, in Redis (requires the `redis` package).
+
+    The tokens of a user are the fields of one hash, so that invalidating the
+    user is a single DEL, seen at once by every worker.
+    """
+
+    def __init__(self, url: str, ttl: int):
+        try:
+            import redis
+            import redis.asyncio as aioredis
+        except ImportError:
+            raise RuntimeError(
+                "PRINCIPAL_CACHE_URL requires the redis package (pip install redis)"
+            )
+        self.ttl = ttl
+        self._client = aioredis.Redis.from_url(url)
+        # Invalidations happen in sync code (session commits)
+        self._sync_client = redis.Redis.from_url(url)
+
+    @staticmethod
+    def _key(role: str, email: str) -> str:
+        return f"principal:{role}:{email}"
+
+    async def get(self, role: str, email: str, issued_at) -> Optional[dict]:
+        value = await self._client.hget(self._key(role, email), str(issued_at))
+        return json.loads(value) if value is not None else None
+
+    async def set(self, role: str, email: str, issued_at, snapshot: dict):
+        key = self._key(role, email)
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, str(issued_at), json.dumps(snapshot, default=str))
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+    def invalidate(self, role: str, email: str):
+        self._sync_client.delete(self._key(role, email))
+
+
+class PrincipalCache:
+    """
+    Cache of the users resolved from access tokens, keyed by (role, email,
+    token iat), so that authenticated requests do not query the user table.
+
+    Entries expire after `ttl` seconds. A user is also dropped from the cache
+    as soon as a change to it (deactivation, new email...) is committed,
+    whichever session made it. With `url`, the entries live in a store shared
+    by all the workers instead of each worker's memory.
+    """
+
+    def __init__(self, enabled: bool, ttl: int, max_entries: int, url: str = ""):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.url = url
+        self._store = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def store(self):
+        if self._store is None:
+            if self.url:
+                self._store = RedisPrincipalStore(self.url, self.ttl)
+            else:
+                self._store = MemoryPrincipalStore(self.ttl, self.max_entries)
+        return self._store
+
+    async def get(self, role: str, email: str, issued_at):
+        if not self.enabled:
+            return None
+        snapshot = await self.store.get(role, email, issued_at)
+        if snapshot is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return restore_principal(role, snapshot)
+
+    async def set(self, role: str, email: str, issued_at, user):
+        if self.enabled:
+            await self.store.set(role, email, issued_at, snapshot_principal(user))
+
+    def invalidate(self, role: str, email: str):
+        if self.enabled:
+            self.store.invalidate(role, email)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "shared": bool(self.url),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+principal_cache = PrincipalCache(
+    enabled=settings.PRINCIPAL_CACHE_ENABLED,
+    ttl=settings.PRINCIPAL_CACHE_TTL,
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    url=settings.PRINCIPAL_CACHE_URL,
+)
+
+
+def _changed_user(mapper, connection, target):
+    # Remember the user, and its previous email, until the commit
+    role = "teacher" if isinstance(target, Teacher) else "student"
+    emails = {target.email, *inspect(target).attrs.email.history.deleted}
+    session = inspect(target).session
+    if session is not None:
+        changed = session.info.setdefault("changed_principals", set())
+        changed.update((role, email) for email in emails if email)
+
+
+def _invalidate_changed_users(session: Session):
+    for role, email in session.info.pop("changed_principals", ()):
+        principal_cache.invalidate(role, email)
+
+
+def _forget_changed_users(session: Session, previous_transaction=None):
+    session.info.pop("changed_principals", None)
+
+
+for user_type in USER_TYPES.values():
+    event.listen(user_type, "after_update", _changed_user)
+    event.listen(user_type, "after_delete", _changed_user)
+event.listen(Session, "after_commit", _invalidate_changed_users)
+event.listen(Session, "after_soft_rollback", _forget_changed_users)
@@ -0,0 +1,271 @@
+import asyncio
+import calendar
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import event, func, inspect, insert, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from core.config import settings
+from db.executor import db_executor
+from db.session import SessionLocal
+from models.user_models import RevokedToken, RevokedUserTokens, Student, Teacher
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two deletions of the rows of expired tokens
+PURGE_INTERVAL = 3600
+
+# Seconds during which an id skipped by a refresh is looked for again: ids are
+# allocated at insert time, but the transactions can commit out of order
+GAP_TIMEOUT = 300
+
+# Longest lifetime of a token (refresh tokens: 7 days, see core/security.py)
+TOKEN_LIFETIME = max(
+    timedelta(days=7), timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+)
+
+
+def _key(jti: str) -> int:
+    # First 64 bits of the (random, hexadecimal) jti: 40% less memory than the
+    # strings, for one chance in ~10^13 of rejecting a valid token per million
+    # revocations
+    return int(jti[:16], 16)
+
+
+def _timestamp(revoked_at: datetime) -> int:
+    # Same rounding as the "iat" claim, in whole seconds
+    return calendar.timegm(revoked_at.utctimetuple())
+
+
+class _NewRows:
+    """
+    Reads the rows of a revocation table by increasing id.
+
+    A transaction can commit after another one holding a larger id (on
+    PostgreSQL): the ids skipped by a read are looked for again by the next
+    ones, for GAP_TIMEOUT seconds.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.last_id = 0
+        self._gaps: Dict[int, float] = {}
+
+    def read_all(self, db: Session, *columns) -> List[tuple]:
+        rows = db.query(self.model.id, *columns).all()
+        # Only the ids following the rows older than GAP_TIMEOUT can still be
+        # committed: older gaps are rows purged or rolled back
+        settled_id = (
+            db.query(func.max(self.model.id))
+            .filter(
+                self.model.revoked_at
+                < datetime.utcnow() - timedelta(seconds=GAP_TIMEOUT)
+            )
+            .scalar()
+        )
+        first_id = min((row[0] for row in rows), default=1)
+        self.last_id = 0
+        self._gaps = {}
+        self._track(rows, max(settled_id or 0, first_id - 1))
+        return rows
+
+    def read_new(self, db: Session, *columns) -> List[tuple]:
+        now = time.monotonic()
+        self._gaps = {
+            id: seen for id, seen in self._gaps.items() if now - seen < GAP_TIMEOUT
+        }
+        condition = self.model.id > self.last_id
+        if self._gaps:
+            condition = or_(condition, self.model.id.in_(list(self._gaps)))
+        rows = db.query(self.model.id, *columns).filter(condition).all()
+        self._track(rows, self.last_id)
+        return rows
+
+    def _track(self, rows: List[tuple], after_id: int):
+        ids = {row[0] for row in rows}
+        last_id = max(ids, default=self.last_id)
+        now = time.monotonic()
+        for id in range(after_id + 1, last_id):
+            if id not in ids:
+                self._gaps.setdefault(id, now)
+        for id in ids:
+            self._gaps.pop(id, None)
+        self.last_id = max(self.last_id, last_id)
+
+
+class RevocationList:
+    """
+    Tokens revoked before their expiry, held in memory: checking a token is
+    a lookup, not a query.
+
+    A token is revoked either by its id (`jti` claim), at logout, or with all
+    the tokens of its user issued up to a date, when the user is deactivated
+    (the `_deactivated_user` hook, in the transaction of the deactivation).
+
+    The revocation tables are shared by the workers. A revocation applies at
+    once in the worker that makes it, and in the others at their next
+    refresh, every `refresh_interval` seconds, which only reads the rows added
+    since the previous one. Every PURGE_INTERVAL seconds, the rows of expired
+    tokens are deleted and the list is reloaded.
+
+    Example:
+        if revocation_list.is_revoked(payload):
+            raise credentials_exception
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self._keys: Set[int] = set()
+        # Tokens of a user issued up to this timestamp are revoked
+        self._users: Dict[Tuple[str, int], int] = {}
+        self._tokens = _NewRows(RevokedToken)
+        self._user_tokens = _NewRows(RevokedUserTokens)
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def __contains__(self, jti) -> bool:
+        return jti is not None and _key(jti) in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def is_revoked(self, payload: dict) -> bool:
+        if payload.get("jti") in self:
+            return True
+        # "iat" is in whole seconds: the tokens issued in the second of the
+        # revocation are revoked too
+        revoked_until = self._users.get((payload.get("role"), payload.get("uid")))
+        return revoked_until is not None and payload.get("iat", 0) <= revoked_until
+
+    @staticmethod
+    def _add_users(users: Dict[Tuple[str, int], int], rows):
+        for role, user_id, revoked_at in rows:
+            key = (role, user_id)
+            users[key] = max(users.get(key, 0), _timestamp(revoked_at))
+
+    def add_revoked_users(self, rows: List[Tuple[str, int, datetime]]):
+        """Applies (role, user_id, revoked_at) revocations already stored."""
+        with self._lock:
+            self._add_users(self._users, rows)
+
+    def load(self, db: Session):
+        """Deletes the rows of expired tokens and loads all the others."""
+        now = datetime.utcnow()
+        for model in (RevokedToken, RevokedUserTokens):
+            db.query(model).filter(model.expires_at < now).delete(
+                synchronize_session=False
+            )
+        db.commit()
+
+        tokens = self._tokens.read_all(db, RevokedToken.jti)
+        user_tokens = self._user_tokens.read_all(
+            db,
+            RevokedUserTokens.role,
+            RevokedUserTokens.user_id,
+            RevokedUserTokens.revoked_at,
+        )
+        keys = {_key(jti) for _, jti in tokens}
+        users: Dict[Tuple[str, int], int] = {}
+        self._add_users(users, (row[1:] for row in user_tokens))
+        with self._lock:
+            self._keys, self._users = keys, users
+            self._loaded_at = time.monotonic()
+
+    def refresh(self, db: Session):
+        """Loads the rows added since the last load or refresh."""
+        tokens = self._tokens.read_new(db, RevokedToken.jti)
+        user_tokens = self._user_tokens.read_new(
+            db,
+            RevokedUserTokens.role,
+            RevokedUserTokens.user_id,
+            RevokedUserTokens.revoked_at,
+        )
+        with self._lock:
+            self._keys.update(_key(jti) for _, jti in tokens)
+            self._add_users(self._users, (row[1:] for row in user_tokens))
+
+    def revoke(self, db: Session, jti: str, expires_at: datetime):
+        try:
+            db.add(RevokedToken(jti=jti, expires_at=expires_at))
+            db.commit()
+        except IntegrityError:
+            # Already revoked
+            db.rollback()
+        with self._lock:
+            self._keys.add(_key(jti))
+
+    def start(self):
+        if self._task is not None:
+            return
+
+        db = SessionLocal()
+        try:
+            self.load(db)
+        finally:
+            db.close()
+        self._task = asyncio.create_task(self._refresh_periodically())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _refresh_periodically(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            db = SessionLocal()
+            try:
+                if time.monotonic() - self._loaded_at >= PURGE_INTERVAL:
+                    await db_executor.run(self.load, db)
+                else:
+                    await db_executor.run(self.refresh, db)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to refresh the revoked tokens: {e}")
+            finally:
+                db.close()
+
+
+revocation_list = RevocationList(refresh_interval=settings.REVOCATION_REFRESH_INTERVAL)
+
+
+def _deactivated_user(mapper, connection, target):
+    # Revoke the tokens of the user in the transaction of the deactivation
+    if target.is_active or not any(inspect(target).attrs.is_active.history.deleted):
+        return
+    role = "teacher" if isinstance(target, Teacher) else "student"
+    revoked_at = datetime.utcnow()
+    connection.execute(
+        insert(RevokedUserTokens).values(
+            role=role,
+            user_id=target.id,
+            revoked_at=revoked_at,
+            expires_at=revoked_at + TOKEN_LIFETIME,
+        )
+    )
+    session = inspect(target).session
+    if session is not None:
+        revoked = session.info.setdefault("revoked_users", [])
+        revoked.append((role, target.id, revoked_at))
+
+
+def _apply_revoked_users(session: Session):
+    revoked = session.info.pop("revoked_users", None)
+    if revoked:
+        revocation_list.add_revoked_users(revoked)
+
+
+def _forget_revoked_users(session: Session, previous_transaction=None):
+    session.info.pop("revoked_users", None)
+
+
+for user_type in (Teacher, Student):
+    event.listen(user_type, "after_update", _deactivated_user)
+event.listen(Session, "after_commit", _apply_revoked_users)
+event.listen(Session, "after_soft_rollback", _forget_revoked_users)
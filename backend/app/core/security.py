@@ -1,31 +1,45 @@
 from datetime import datetime, timedelta
 from typing import Union
+from uuid import uuid4
 import jwt as _jwt
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from jwt import InvalidTokenError
 from models.user_models import Teacher, Student
-from db.init_db import get_db
-from schemas.token import Token, TokenData
-from passlib.context import CryptContext
+from db.init_db import get_async_db
+from db.session import AsyncSessionLocal
+from schemas.token import Principal, Token, TokenData
 from .config import settings
+from .passwords import password_hasher
+from .principal_cache import principal_cache
+from .revocation import revocation_list
 
 # from .config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
 
 # Define OAuth2PasswordBearer schemes
 teacher_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/teacher/token")
 student_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/student/token")
+# Both roles: the role is read from the token itself
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/student/token")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+ROLES = ("teacher", "student")
+
+credentials_exception = HTTPException(
+    status_code=401,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
 
 
 def verify_password(plain_password: str, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.verify_sync(plain_password, hashed_password)
 
 
 def get_password_hash(password):
-    return pwd_context.hash(password.encode("utf-8"))
+    return password_hasher.hash_sync(password)
 
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
@@ -36,7 +50,7 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
         expire = datetime.utcnow() + timedelta(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow(), "jti": uuid4().hex})
     encoded_jwt = _jwt.encode(
         to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
     )
@@ -49,7 +63,7 @@ def create_refresh_token(data: dict, expires_delta: timedelta = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(days=7)  # Refresh token validity
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow(), "jti": uuid4().hex})
     encoded_jwt = _jwt.encode(
         to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
     )
@@ -61,69 +75,128 @@ def create_token(user: Union[Teacher, Student]) -> Token:
         "sub": user.email,
         "role": "teacher" if isinstance(user, Teacher) else "student",
     }
-    access_token = create_access_token(user_data)
-    refresh_token = create_refresh_token(user_data)
+    # The principal travels in the access token only: refreshing a token
+    # reads the user again. Both carry the user id, to revoke them by user.
+    access_token = create_access_token(
+        {**user_data, "uid": user.id, "active": bool(user.is_active)}
+    )
+    refresh_token = create_refresh_token({**user_data, "uid": user.id})
     return Token(
         access_token=access_token, refresh_token=refresh_token, token_type="bearer"
     )
 
 
-def get_user_from_token(token: str, db: Session):
-    credentials_exception = HTTPException(
-        status_code=401,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+def decode_access_token(token: str) -> dict:
     try:
         payload = _jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        email: str = payload.get("sub")
-        role: str = payload.get("role")
-        if email is None or role is None:
-            raise credentials_exception
-        token_data = TokenData(email=email)
     except InvalidTokenError:
         raise credentials_exception
+    if payload.get("sub") is None or payload.get("role") not in ROLES:
+        raise credentials_exception
+    if revocation_list.is_revoked(payload):
+        raise credentials_exception
+    return payload
+
+
+async def get_user_from_token(token: str, db: AsyncSession):
+    return await get_user_from_claims(decode_access_token(token), db)
+
+
+async def get_user_from_claims(payload: dict, db: AsyncSession):
+    role: str = payload["role"]
+    token_data = TokenData(email=payload["sub"])
+    issued_at = payload.get("iat")
+    user = await principal_cache.get(role, token_data.email, issued_at)
+    if user is not None:
+        return user
 
     if role == "teacher":
-        user = db.query(Teacher).filter(Teacher.email == token_data.email).first()
-    elif role == "student":
-        user = db.query(Student).filter(Student.email == token_data.email).first()
+        # Loaded now: relationships cannot be lazy loaded by an AsyncSession
+        stmt = (
+            select(Teacher)
+            .options(selectinload(Teacher.institutions))
+            .where(Teacher.email == token_data.email)
+        )
     else:
-        raise credentials_exception
+        stmt = select(Student).where(Student.email == token_data.email)
 
+    user = (await db.execute(stmt)).scalars().first()
     if user is None:
         raise credentials_exception
 
+    await principal_cache.set(role, token_data.email, issued_at, user)
     return user
 
 
-def get_current_teacher(
-    token: str = Depends(teacher_oauth2_scheme), db: Session = Depends(get_db)
-):
-    return get_user_from_token(token, db)
+async def get_token_claims(token: str = Depends(oauth2_scheme)) -> dict:
+    # Resolved once per request, whichever dependencies need the claims
+    return decode_access_token(token)
 
 
-def get_current_student(
-    token: str = Depends(student_oauth2_scheme), db: Session = Depends(get_db)
-):
-    return get_user_from_token(token, db)
+async def get_current_principal(
+    payload: dict = Depends(get_token_claims),
+) -> Principal:
+    """
+    Returns the user making the request, as described by its access token.
 
+    The id, role and active flag of the user are signed claims of the token:
+    no database lookup is needed. The tokens issued before a deactivation
+    are revoked (see core/revocation.py).
+    """
+    if "uid" in payload and "active" in payload:
+        return Principal(
+            id=payload["uid"],
+            email=payload["sub"],
+            role=payload["role"],
+            is_active=payload["active"],
+        )
+
+    # Tokens issued before the principal claims
+    async with AsyncSessionLocal() as db:
+        user = await get_user_from_claims(payload, db)
+    return Principal(
+        id=user.id,
+        email=user.email,
+        role=payload["role"],
+        is_active=bool(user.is_active),
+    )
 
-def get_current_user(
-    student: Union[Student, None] = Depends(get_current_student),
-    teacher: Union[Teacher, None] = Depends(get_current_teacher),
-):
 
-    if student:
-        return student
-    if teacher:
-        return teacher
-    raise HTTPException(status_code=401, detail="Could not validate credentials")
+async def get_current_user(
+    payload: dict = Depends(get_token_claims),
+    db: AsyncSession = Depends(get_async_db),
+) -> Union[Teacher, Student]:
+    """Returns the database record of the user, for the routes that need it."""
+    return await get_user_from_claims(payload, db)
+
+
+async def get_current_teacher(
+    payload: dict = Depends(get_token_claims),
+    db: AsyncSession = Depends(get_async_db),
+) -> Teacher:
+    if payload["role"] != "teacher":
+        raise credentials_exception
+    return await get_user_from_claims(payload, db)
+
+
+async def get_current_student(
+    payload: dict = Depends(get_token_claims),
+    db: AsyncSession = Depends(get_async_db),
+) -> Student:
+    if payload["role"] != "student":
+        raise credentials_exception
+    return await get_user_from_claims(payload, db)
+
+
+async def check_user_active(principal: Principal = Depends(get_current_principal)):
+    if not principal.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user.")
+    return principal
 
 
-async def check_user_active(
+async def check_user_record_active(
     current_user: Union[Teacher, Student] = Depends(get_current_user)
 ):
     if not current_user.is_active:
@@ -136,10 +209,12 @@ def verify_token(token: str):
         payload = _jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        return payload
     except InvalidTokenError:
+        payload = None
+    if payload is None or revocation_list.is_revoked(payload):
         raise HTTPException(
             status_code=401,
             detail="Invalid token",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    return payload
@@ -11,7 +11,7 @@ from schemas.teacher import TeacherRead
 
 
 # Create a new assignment
-async def create_assignment(
+def create_assignment(
     db: Session, user: TeacherRead, assignment: AssignmentCreate
 ):
     db_assignment = Assignment(
@@ -30,7 +30,7 @@ async def create_assignment(
 
 
 # Get all assignments for a course
-async def get_all_assignments(user: TeacherRead, db: Session, course_id: int):
+def get_all_assignments(user: TeacherRead, db: Session, course_id: int):
     assignments = (
         db.query(Assignment)
         .filter(Assignment.course_id == course_id)
@@ -41,7 +41,7 @@ async def get_all_assignments(user: TeacherRead, db: Session, course_id: int):
 
 
 # Select an assignment
-async def assignment_selector(assignment_id: int, user: TeacherRead, db: Session):
+def assignment_selector(assignment_id: int, user: TeacherRead, db: Session):
     assignment = (
         db.query(Assignment)
         .filter(Assignment.course.has(teacher_id=user.id))
@@ -54,26 +54,26 @@ async def assignment_selector(assignment_id: int, user: TeacherRead, db: Session
 
 
 # Get selected assignment
-async def get_assignment(assignment_id: int, user: TeacherRead, db: Session):
-    assignment = await assignment_selector(assignment_id, user, db)
+def get_assignment(assignment_id: int, user: TeacherRead, db: Session):
+    assignment = assignment_selector(assignment_id, user, db)
     return AssignmentRead.from_orm(assignment)
 
 
 # Delete an assignment
-async def delete_assignment(assignment_id: int, user: TeacherRead, db: Session):
-    assignment = await assignment_selector(assignment_id, user, db)
+def delete_assignment(assignment_id: int, user: TeacherRead, db: Session):
+    assignment = assignment_selector(assignment_id, user, db)
     db.delete(assignment)
     db.commit()
 
 
 # Update an assignment
-async def update_assignment(
+def update_assignment(
     assignment_id: int,
     assignment_data: AssignmentUpdate,
     user: TeacherRead,
     db: Session,
 ):
-    assignment = await assignment_selector(assignment_id, user, db)
+    assignment = assignment_selector(assignment_id, user, db)
     for key, value in assignment_data.dict(exclude_unset=True).items():
         if key == "course_id":
             continue
@@ -85,7 +85,7 @@ async def update_assignment(
 
 
 # Get student assignments
-async def get_student_assignments(user, db: Session, student_id: int, course_id: int):
+def get_student_assignments(user, db: Session, student_id: int, course_id: int):
     # logger.info(
     #     f"Fetching enrollment for student_id: {student_id}, course_id: {course_id}"
     # )
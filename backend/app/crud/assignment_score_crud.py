@@ -0,0 +1,140 @@
+from typing import Optional
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+from db.upsert import upsert_insert
+from models.operation_models import (
+    Assignment,
+    AssignmentStudentScore,
+    Feedback,
+    StudentResponse,
+)
+
+SCORE_COLUMNS = [
+    "assignment_id",
+    "student_id",
+    "total",
+    "graded_count",
+    "response_count",
+    "validated",
+]
+
+
+def _score_select(*filters):
+    # One summary row per (assignment, student) computed from the responses
+    return (
+        select(
+            StudentResponse.assignment_id,
+            StudentResponse.student_id,
+            func.sum(StudentResponse.grade),
+            func.count(StudentResponse.grade),
+            func.count(StudentResponse.id),
+            func.count(Feedback.id).filter(Feedback.state.is_(True)) > 0,
+        )
+        .outerjoin(Feedback, Feedback.student_response_id == StudentResponse.id)
+        .where(*filters)
+        .group_by(StudentResponse.assignment_id, StudentResponse.student_id)
+    )
+
+
+def refresh_assignment_student_score(db: Session, assignment_id: int, student_id: int):
+    """
+    Recomputes the gradebook summary of one copy, without committing.
+
+    Only the responses of the copy are read (a few rows through the index), so
+    the cost does not grow with the number of responses of the course.
+    """
+    scores = _score_select(
+        StudentResponse.assignment_id == assignment_id,
+        StudentResponse.student_id == student_id,
+    )
+
+    insert = upsert_insert(db)
+    if insert is not None:
+        stmt = insert(AssignmentStudentScore).from_select(SCORE_COLUMNS, scores)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[
+                    AssignmentStudentScore.assignment_id,
+                    AssignmentStudentScore.student_id,
+                ],
+                set_={
+                    "total": stmt.excluded.total,
+                    "graded_count": stmt.excluded.graded_count,
+                    "response_count": stmt.excluded.response_count,
+                    "validated": stmt.excluded.validated,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            )
+        )
+        return
+
+    row = db.execute(scores).first()
+    if row is None:
+        return
+    score = (
+        db.query(AssignmentStudentScore)
+        .filter_by(assignment_id=assignment_id, student_id=student_id)
+        .first()
+    )
+    if not score:
+        score = AssignmentStudentScore(
+            assignment_id=assignment_id, student_id=student_id
+        )
+        db.add(score)
+    for column, value in zip(SCORE_COLUMNS[2:], row[2:]):
+        setattr(score, column, value)
+    db.flush()
+
+
+def rebuild_assignment_scores(db: Session, course_id: Optional[int] = None) -> int:
+    """
+    Recomputes the gradebook summary from scratch, for a course or for all.
+
+    Returns:
+        int: The number of summary rows written.
+    """
+    filters = []
+    if course_id is not None:
+        assignment_ids = select(Assignment.id).where(Assignment.course_id == course_id)
+        filters.append(StudentResponse.assignment_id.in_(assignment_ids))
+        db.execute(
+            delete(AssignmentStudentScore).where(
+                AssignmentStudentScore.assignment_id.in_(assignment_ids)
+            )
+        )
+    else:
+        db.execute(delete(AssignmentStudentScore))
+
+    result = db.execute(
+        AssignmentStudentScore.__table__.insert().from_select(
+            SCORE_COLUMNS, _score_select(*filters)
+        )
+    )
+    db.commit()
+    return result.rowcount
+
+
+def backfill_assignment_scores(db: Session) -> int:
+    """
+    Fills the gradebook summary of the copies graded before it was kept, once:
+    nothing is done if the summary already has rows.
+
+    Rows written meanwhile by a grade write, or by another process doing the
+    same backfill, are kept as they are (they are up to date).
+
+    Returns:
+        int: The number of summary rows written.
+    """
+    if db.query(AssignmentStudentScore.assignment_id).first() is not None:
+        return 0
+
+    insert = upsert_insert(db)
+    if insert is None:
+        return rebuild_assignment_scores(db)
+    result = db.execute(
+        insert(AssignmentStudentScore)
+        .from_select(SCORE_COLUMNS, _score_select())
+        .on_conflict_do_nothing()
+    )
+    db.commit()
+    return result.rowcount
@@ -2,19 +2,39 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from models.user_models import Teacher, Student
 from typing import Type, Union
-from core.security import verify_password
+from core.passwords import password_hasher
+from db.executor import db_executor
 
 
-async def get_user_by_email(
+def get_user_by_email(
     db: Session, email: str, user_type: Type[Union[Student, Teacher]]
 ):
     return db.query(user_type).filter(user_type.email == email).first()
 
 
+def update_password_hash(db: Session, user: Union[Teacher, Student], hashed: str):
+    user.hashed_password = hashed
+    db.commit()
+
+
 async def authenticate_user(
     username: str, password: str, db: Session, user_type: Type[Union[Teacher, Student]]
 ):
-    user = db.query(user_type).filter(user_type.email == username).first()
-    if not user or not verify_password(password, user.hashed_password):
+    """
+    Checks the credentials of a user, in the password hashing processes.
+
+    A password hashed with another bcrypt cost factor than BCRYPT_ROUNDS is
+    hashed again with the current one, now that it is known.
+    """
+    user = await db_executor.run(get_user_by_email, db, username, user_type)
+    if not user:
+        return None
+
+    valid, new_hash = await password_hasher.verify_and_update(
+        password, user.hashed_password
+    )
+    if not valid:
         return None
+    if new_hash:
+        await db_executor.run(update_password_hash, db, user, new_hash)
     return user
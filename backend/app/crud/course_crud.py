@@ -1,87 +1,30 @@
 import random
 import string
-from typing import List
+from typing import List, Optional
 from sqlalchemy.orm import Session, joinedload
-from pydantic import HttpUrl
-import requests
-from io import BytesIO
-from PyPDF2 import PdfReader
 from fastapi import HTTPException
 from datetime import datetime
 from models.operation_models import Course, Enrollment
 from models.user_models import Teacher, Student
 from schemas.course import CourseCreate, CourseUpdate, CourseRead
 from schemas.teacher import TeacherRead
-from services.course_chapters import extract_chapters_from_syllabus
+from crud.syllabus_crud import check_syllabus_ready
+from services.llm_registry import llm_registry
 
 
 def generate_course_code(length=7):
     return "".join(random.choices(string.ascii_uppercase + string.digits, k=length))
 
 
-# Step 1: Download the PDF file
-async def download_pdf(syllabus_url: HttpUrl) -> BytesIO:
-    try:
-        response = requests.get(syllabus_url)
-        response.raise_for_status()
-        return BytesIO(response.content)
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Error downloading syllabus PDF: {str(e)}"
-        )
-
-
-# Step 2: Extract text from the PDF
-async def extract_text_from_pdf(pdf_content: BytesIO) -> str:
-    try:
-        reader = PdfReader(pdf_content)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text()
-        return text.strip()
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Error extracting text from PDF: {str(e)}"
-        )
-
-
-# Main function to create a course
-async def create_course(
-    user: TeacherRead, db: Session, course: CourseCreate
-) -> CourseRead:
-    # Generate a unique course code
+def generate_unique_course_code(db: Session) -> str:
     while True:
         course_code = generate_course_code()
         existing_course = db.query(Course).filter_by(code=course_code).first()
         if not existing_course:
-            break
+            return course_code
 
-    # Download the syllabus PDF
-    if not course.syllabus_url:
-        raise HTTPException(status_code=400, detail="Syllabus URL is required")
-
-    pdf_content = await download_pdf(course.syllabus_url)
-
-    # Extract syllabus content from the PDF
-    syllabus_content = await extract_text_from_pdf(pdf_content)
-    # Extract chapters from the syllabus content using the LLM
-    course_chapters = await extract_chapters_from_syllabus(syllabus_content)
-    print(course_chapters)
-
-    # Create the course object
-    db_course = Course(
-        name=course.name,
-        section=course.section,
-        subject=course.subject,
-        teacher_id=course.teacher_id,
-        code=course_code,
-        created_at=datetime.now(),
-        updated_at=datetime.now(),
-        syllabus_url=course.syllabus_url,
-        syllabus_content=syllabus_content,
-        course_chapters=course_chapters,
-    )
 
+def store_course(db: Session, db_course: Course) -> CourseRead:
     # Add to database
     db.add(db_course)
     db.commit()
@@ -98,10 +41,46 @@ async def create_course(
         created_at=db_course.created_at,
         updated_at=db_course.updated_at,
         syllabus_url=db_course.syllabus_url,
+        llm_provider=db_course.llm_provider,
+        syllabus_status=db_course.syllabus_status,
+        syllabus_error=db_course.syllabus_error,
+    )
+
+
+def check_llm_provider(name: Optional[str]):
+    # An unknown provider would only fail later, in every grading of the course
+    if name is None:
+        return
+    try:
+        llm_registry.get(name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# Main function to create a course
+def create_course(user: TeacherRead, db: Session, course: CourseCreate) -> CourseRead:
+    if not course.syllabus_url:
+        raise HTTPException(status_code=400, detail="Syllabus URL is required")
+    check_llm_provider(course.llm_provider)
+
+    # The syllabus is downloaded, extracted and split into chapters in the
+    # background (services/syllabus_ingestion.py)
+    db_course = Course(
+        name=course.name,
+        section=course.section,
+        subject=course.subject,
+        teacher_id=course.teacher_id,
+        code=generate_unique_course_code(db),
+        created_at=datetime.now(),
+        updated_at=datetime.now(),
+        syllabus_url=course.syllabus_url,
+        llm_provider=course.llm_provider,
+        syllabus_status="pending",
     )
+    return store_course(db, db_course)
 
 
-async def get_all_courses(user: TeacherRead, db: Session) -> List[CourseRead]:
+def get_all_courses(user: TeacherRead, db: Session) -> List[CourseRead]:
     courses = db.query(Course).filter(Course.teacher_id == user.id).all()
     course_list = []
     for course in courses:
@@ -117,7 +96,7 @@ async def get_all_courses(user: TeacherRead, db: Session) -> List[CourseRead]:
 
 
 # Select a course
-async def course_selector(course_id: int, user: TeacherRead, db: Session):
+def course_selector(course_id: int, user: TeacherRead, db: Session):
     # Use `joinedload` to eagerly load the teacher relationship
     course = (
         db.query(Course)
@@ -131,8 +110,8 @@ async def course_selector(course_id: int, user: TeacherRead, db: Session):
     return course
 
 
-async def get_course(course_id: int, user: TeacherRead, db: Session):
-    course = await course_selector(course_id, user, db)
+def get_course(course_id: int, user: TeacherRead, db: Session):
+    course = course_selector(course_id, user, db)
     # Constructing the full teacher name
     if course.teacher:
         teacher_full_name = f"{course.teacher.name} {course.teacher.postname or ''} {course.teacher.last_name or ''}".strip()
@@ -144,16 +123,17 @@ async def get_course(course_id: int, user: TeacherRead, db: Session):
     return course_data
 
 
-async def delete_course(course_id: int, user: TeacherRead, db: Session):
-    course = await course_selector(course_id, user, db)
+def delete_course(course_id: int, user: TeacherRead, db: Session):
+    course = course_selector(course_id, user, db)
     db.delete(course)
     db.commit()
 
 
-async def update_course(
+def update_course(
     course_id: int, course: CourseUpdate, user: TeacherRead, db: Session
 ):
-    db_course = await course_selector(course_id, user, db)
+    db_course = course_selector(course_id, user, db)
+    check_llm_provider(course.llm_provider)
     for key, value in course.dict(exclude_unset=True).items():
         if key == "teacher_id":
             continue
@@ -165,12 +145,14 @@ async def update_course(
 
 
 # Get all course chapters and their IDs
-async def get_chapters_by_course_id(course_id: int, db: Session):
+def get_chapters_by_course_id(course_id: int, db: Session):
     course = db.query(Course).filter(Course.id == course_id).first()
 
     if not course:
         return None
 
+    # A 409 rather than a 404 while the syllabus is pending or failed
+    check_syllabus_ready(course)
     return course.course_chapters
 
 
@@ -2,7 +2,10 @@ import re
 import json
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import bindparam, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.upsert import upsert_insert
+from crud.assignment_score_crud import refresh_assignment_student_score
 from models.operation_models import (
     Question,
     TeacherResponse,
@@ -15,7 +18,10 @@ async def get_questions_and_max_points(db: Session, assignment_id: int):
     # Query to get questions, max points, and teacher responses for the assignment
     stmt = (
         select(
-            Question.question_text, Question.max_points, TeacherResponse.response_text
+            Question.id,
+            Question.question_text,
+            Question.max_points,
+            TeacherResponse.response_text,
         )
         .join(TeacherResponse, TeacherResponse.question_id == Question.id)
         .where(Question.assignment_id == assignment_id)
@@ -25,6 +31,7 @@ async def get_questions_and_max_points(db: Session, assignment_id: int):
 
     questions_and_points = [
         {
+            "question_id": row.id,
             "question_text": row.question_text,
             "max_points": row.max_points,
             "correct_answer": row.response_text,
@@ -92,34 +99,55 @@ def process_llm_output(llm_output: dict) -> tuple:
 
 
 def store_advice(db: Session, assignment_id: int, student_id: int, advice: str):
-    # Retrieve the StudentResponse record
-    student_response = (
-        db.query(StudentResponse)
-        .filter_by(assignment_id=assignment_id, student_id=student_id)
-        .first()
+    """
+    Creates or updates the feedback of a copy, without committing.
+
+    The feedback is attached to the first response of the student. On SQLite
+    and PostgreSQL this is a single INSERT ... SELECT ... ON CONFLICT.
+    """
+    first_response = (
+        select(StudentResponse.id)
+        .where(
+            StudentResponse.assignment_id == assignment_id,
+            StudentResponse.student_id == student_id,
+        )
+        .order_by(StudentResponse.id)
+        .limit(1)
     )
 
-    if student_response:
-        # Check if feedback already exists for this StudentResponse
-        feedback = (
-            db.query(Feedback)
-            .filter_by(student_response_id=student_response.id)
-            .first()
+    insert = upsert_insert(db)
+    if insert is not None:
+        stmt = insert(Feedback).from_select(
+            ["assignment_id", "student_response_id", "advice"],
+            first_response.with_only_columns(
+                literal(assignment_id), StudentResponse.id, literal(advice)
+            ),
+        )
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[Feedback.student_response_id],
+                set_={"advice": stmt.excluded.advice},
+            )
         )
+        return
 
-        if not feedback:
-            # Create new feedback if it doesn't exist
-            feedback = Feedback(
+    student_response_id = db.execute(first_response).scalar()
+    if student_response_id is None:
+        return
+    feedback = (
+        db.query(Feedback).filter_by(student_response_id=student_response_id).first()
+    )
+    if not feedback:
+        db.add(
+            Feedback(
                 assignment_id=assignment_id,
-                student_response_id=student_response.id,
+                student_response_id=student_response_id,
                 advice=advice,
             )
-            db.add(feedback)
-        else:
-            # Update existing feedback
-            feedback.advice = advice
-
-        db.commit()
+        )
+    else:
+        feedback.advice = advice
+    db.flush()
 
 
 # def get_student_grade_record(db: Session, assignment_id: int, student_id: int):
@@ -152,34 +180,49 @@ def store_advice(db: Session, assignment_id: int, student_id: int, advice: str):
 
 
 def store_grading(db: Session, assignment_id: int, student_id: int, grading: dict):
+    """
+    Writes the LLM grades of a copy, without committing.
+
+    All the responses are updated by one executemany UPDATE keyed on
+    (assignment_id, student_id, question_id), then the gradebook summary of
+    the copy is refreshed.
+    """
+    rows = []
     for question_key, grade_data in grading.items():
         try:
             question_id = int(question_key)
         except ValueError:
             raise ValueError(f"Invalid question key format: {question_key}")
 
-        note = grade_data.get("note")
-        comment = grade_data.get("commentaires")
-
-        # Find the corresponding student response based on assignment_id, student_id, and question_id
-        student_response = (
-            db.query(StudentResponse)
-            .filter_by(
-                assignment_id=assignment_id,
-                student_id=student_id,
-                question_id=question_id,
-            )
-            .first()
+        rows.append(
+            {
+                "b_question_id": question_id,
+                "b_grade": grade_data.get("note"),
+                "b_comment": grade_data.get("commentaires"),
+            }
+        )
+    if not rows:
+        return
+
+    student_response = StudentResponse.__table__
+    result = db.execute(
+        update(student_response)
+        .where(
+            student_response.c.assignment_id == assignment_id,
+            student_response.c.student_id == student_id,
+            student_response.c.question_id == bindparam("b_question_id"),
+        )
+        .values(grade=bindparam("b_grade"), comment=bindparam("b_comment")),
+        rows,
+    )
+    if result.rowcount >= 0 and result.rowcount < len(rows):
+        print(
+            f"No student response found for {len(rows) - result.rowcount} graded "
+            f"question(s) of assignment_id={assignment_id}, student_id={student_id}"
         )
-        if student_response:
-            student_response.grade = note
-            student_response.comment = comment
-        else:
-            print(
-                f"No student response found for assignment_id={assignment_id}, student_id={student_id}, question_id={question_id}"
-            )
 
-    db.commit()
+    # Keep the gradebook summary of the copy in sync
+    refresh_assignment_student_score(db, assignment_id, student_id)
 
 
 def process_and_store_llm_output(
@@ -194,36 +237,37 @@ def process_and_store_llm_output(
     print(f"Advice: {advice}")
     print(f"Grading: {grading}")
 
-    # Step 2: Store the advice
-    store_advice(db, assignment_id, student_id, advice)
-
-    # Step 3: Store the grading
-    store_grading(db, assignment_id, student_id, grading)
+    # Step 2 and 3: Store the advice and the grading in one transaction
+    try:
+        store_advice(db, assignment_id, student_id, advice)
+        store_grading(db, assignment_id, student_id, grading)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
 
 
-def get_student_grading_feedback(db: Session, student_id: int, assignment_id: int):
-    # Retrieve all student responses for the assignment and student
-    student_responses = (
-        db.query(StudentResponse)
-        .filter(
-            StudentResponse.student_id == student_id,
-            StudentResponse.assignment_id == assignment_id,
-        )
-        .all()
+def _copy_responses(student_id: int, assignment_id: int):
+    # Query to get all student responses for the assignment and student
+    return select(StudentResponse).where(
+        StudentResponse.student_id == student_id,
+        StudentResponse.assignment_id == assignment_id,
     )
 
-    if not student_responses:
-        return None
 
-    # Retrieve the global advice from any of the feedback records
-    feedback = (
-        db.query(Feedback)
-        .filter(
+def _copy_feedback(assignment_id: int, student_response_id: int):
+    # The global advice is stored with the first response of the copy
+    return (
+        select(Feedback)
+        .where(
             Feedback.assignment_id == assignment_id,
-            Feedback.student_response_id == student_responses[0].id,
+            Feedback.student_response_id == student_response_id,
         )
-        .first()
+        .limit(1)
     )
+
+
+def _grading_feedback(student_responses, feedback):
     advice = feedback.advice if feedback else None
     state = feedback.state if feedback else None
 
@@ -247,6 +291,41 @@ def get_student_grading_feedback(db: Session, student_id: int, assignment_id: in
     }
 
 
+def get_student_grading_feedback(db: Session, student_id: int, assignment_id: int):
+    student_responses = (
+        db.execute(_copy_responses(student_id, assignment_id)).scalars().all()
+    )
+    if not student_responses:
+        return None
+
+    feedback = (
+        db.execute(_copy_feedback(assignment_id, student_responses[0].id))
+        .scalars()
+        .first()
+    )
+    return _grading_feedback(student_responses, feedback)
+
+
+async def get_student_grading_feedback_async(
+    db: AsyncSession, student_id: int, assignment_id: int
+):
+    """Same as `get_student_grading_feedback`, with an AsyncSession."""
+    student_responses = (
+        (await db.execute(_copy_responses(student_id, assignment_id)))
+        .scalars()
+        .all()
+    )
+    if not student_responses:
+        return None
+
+    feedback = (
+        (await db.execute(_copy_feedback(assignment_id, student_responses[0].id)))
+        .scalars()
+        .first()
+    )
+    return _grading_feedback(student_responses, feedback)
+
+
 def validate_student_assignment(db: Session, student_id: int, assignment_id: int):
     # Retrieve student response for the assignment
     student_response = (
@@ -279,6 +358,20 @@ def validate_student_assignment(db: Session, student_id: int, assignment_id: int
             detail=f"No feedback found for student_response_id={student_response.id}",
         )
 
+    db.flush()
+    refresh_assignment_student_score(db, assignment_id, student_id)
     db.commit()
     db.refresh(feedback)
     return feedback
+
+
+async def validate_student_assignment_async(
+    db: AsyncSession, student_id: int, assignment_id: int
+):
+    """
+    Same as `validate_student_assignment`, with an AsyncSession.
+
+    The validation and the gradebook refresh run as one unit of sync code,
+    on the async connection, without blocking the event loop.
+    """
+    return await db.run_sync(validate_student_assignment, student_id, assignment_id)
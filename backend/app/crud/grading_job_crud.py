@@ -0,0 +1,293 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import func, insert, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from models.operation_models import (
+    Assignment,
+    Course,
+    GradingJob,
+    GradingBatch,
+    StudentResponse,
+)
+from schemas.token import Principal
+
+# Longest wait, in seconds, before a failed job is retried
+MAX_RETRY_DELAY = 3600
+
+
+def create_grading_job(db: Session, assignment_id: int, student_id: int) -> GradingJob:
+    # Reuse a job that is still waiting for the same submission
+    job = (
+        db.query(GradingJob)
+        .filter(
+            GradingJob.assignment_id == assignment_id,
+            GradingJob.student_id == student_id,
+            GradingJob.status == "pending",
+        )
+        .first()
+    )
+    if job:
+        return job
+
+    job = GradingJob(assignment_id=assignment_id, student_id=student_id)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+async def create_grading_job_async(
+    db: AsyncSession, assignment_id: int, student_id: int
+) -> GradingJob:
+    """Same as `create_grading_job`, with an AsyncSession."""
+    return await db.run_sync(create_grading_job, assignment_id, student_id)
+
+
+def get_grading_job(db: Session, job_id: int) -> Optional[GradingJob]:
+    return db.query(GradingJob).filter(GradingJob.id == job_id).first()
+
+
+def get_grading_job_for_user(
+    db: Session, job_id: int, user: Principal
+) -> Optional[GradingJob]:
+    # Only the student of the copy and the teacher of the course see the job
+    query = db.query(GradingJob).filter(GradingJob.id == job_id)
+    if user.role == "student":
+        query = query.filter(GradingJob.student_id == user.id)
+    else:
+        query = (
+            query.join(Assignment, GradingJob.assignment_id == Assignment.id)
+            .join(Course, Assignment.course_id == Course.id)
+            .filter(Course.teacher_id == user.id)
+        )
+    return query.first()
+
+
+def claim_next_grading_job(db: Session) -> Optional[GradingJob]:
+    """
+    Atomically moves the oldest pending job to "running".
+
+    The conditional UPDATE guarantees that a job is handed to a single worker,
+    even when several workers (or processes) poll the table at the same time.
+    Failed jobs are skipped until their `next_attempt_at`.
+    """
+    while True:
+        job = (
+            db.query(GradingJob)
+            .filter(
+                GradingJob.status == "pending",
+                or_(
+                    GradingJob.next_attempt_at.is_(None),
+                    GradingJob.next_attempt_at <= datetime.utcnow(),
+                ),
+            )
+            .order_by(GradingJob.id)
+            .first()
+        )
+        if not job:
+            return None
+
+        claimed = (
+            db.query(GradingJob)
+            .filter(GradingJob.id == job.id, GradingJob.status == "pending")
+            .update(
+                {
+                    GradingJob.status: "running",
+                    GradingJob.started_at: datetime.utcnow(),
+                    GradingJob.attempts: GradingJob.attempts + 1,
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        if claimed:
+            db.refresh(job)
+            return job
+
+
+def claim_grading_job(
+    db: Session, assignment_id: int, student_id: int
+) -> Optional[GradingJob]:
+    # Takes the pending job of a submission graded outside of the workers
+    job = (
+        db.query(GradingJob)
+        .filter(
+            GradingJob.assignment_id == assignment_id,
+            GradingJob.student_id == student_id,
+            GradingJob.status == "pending",
+        )
+        .first()
+    )
+    if not job:
+        return None
+
+    claimed = (
+        db.query(GradingJob)
+        .filter(GradingJob.id == job.id, GradingJob.status == "pending")
+        .update(
+            {
+                GradingJob.status: "running",
+                GradingJob.started_at: datetime.utcnow(),
+                GradingJob.attempts: GradingJob.attempts + 1,
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    if not claimed:
+        return None
+    db.refresh(job)
+    return job
+
+
+def is_grading_job_running(db: Session, assignment_id: int, student_id: int) -> bool:
+    return (
+        db.query(GradingJob.id)
+        .filter(
+            GradingJob.assignment_id == assignment_id,
+            GradingJob.student_id == student_id,
+            GradingJob.status == "running",
+        )
+        .first()
+        is not None
+    )
+
+
+async def is_grading_job_running_async(
+    db: AsyncSession, assignment_id: int, student_id: int
+) -> bool:
+    """Same as `is_grading_job_running`, with an AsyncSession."""
+    return await db.run_sync(is_grading_job_running, assignment_id, student_id)
+
+
+def release_grading_job(db: Session, job: GradingJob):
+    # Hands an unfinished job back to the workers
+    job.status = "pending"
+    job.attempts = max(job.attempts - 1, 0)
+    db.commit()
+
+
+def complete_grading_job(db: Session, job: GradingJob):
+    job.status = "done"
+    job.error = None
+    job.finished_at = datetime.utcnow()
+    db.commit()
+
+
+def fail_grading_job(
+    db: Session, job: GradingJob, error: str, max_attempts: int, retry_delay: float
+):
+    # Put the job back in the queue until it runs out of attempts, after a
+    # delay doubling at each attempt: a provider down is not hammered
+    job.error = error
+    if job.attempts >= max_attempts:
+        job.status = "failed"
+        job.finished_at = datetime.utcnow()
+    else:
+        delay = min(retry_delay * 2 ** max(job.attempts - 1, 0), MAX_RETRY_DELAY)
+        job.status = "pending"
+        job.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+    db.commit()
+
+
+def requeue_stale_grading_jobs(db: Session, lease_timeout: float) -> int:
+    """
+    Puts back in the queue the jobs "running" for more than `lease_timeout`
+    seconds, left by a process that stopped before finishing them.
+
+    Younger jobs may still be graded by a live worker of another process (or
+    of the previous process, during a rolling restart): they are left alone.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=lease_timeout)
+    requeued = (
+        db.query(GradingJob)
+        .filter(GradingJob.status == "running", GradingJob.started_at < cutoff)
+        .update({GradingJob.status: "pending"}, synchronize_session=False)
+    )
+    db.commit()
+    return requeued
+
+
+def create_grading_batch(db: Session, assignment_id: int) -> GradingBatch:
+    """
+    Queues a grading job for every student with ungraded responses.
+
+    Students who already have a queued job keep it, the job is only attached
+    to the batch so that it counts in the batch progress.
+    """
+    student_ids = [
+        row.student_id
+        for row in db.query(StudentResponse.student_id)
+        .filter(
+            StudentResponse.assignment_id == assignment_id,
+            StudentResponse.grade.is_(None),
+        )
+        .distinct()
+    ]
+
+    batch = GradingBatch(assignment_id=assignment_id)
+    db.add(batch)
+    db.flush()
+
+    queued_jobs = (
+        db.query(GradingJob)
+        .filter(
+            GradingJob.assignment_id == assignment_id,
+            GradingJob.student_id.in_(student_ids),
+            GradingJob.status.in_(["pending", "running"]),
+        )
+        .all()
+    )
+    for job in queued_jobs:
+        job.batch_id = batch.id
+
+    queued_students = {job.student_id for job in queued_jobs}
+    new_jobs = [
+        {"assignment_id": assignment_id, "student_id": student_id, "batch_id": batch.id}
+        for student_id in student_ids
+        if student_id not in queued_students
+    ]
+    if new_jobs:
+        db.execute(insert(GradingJob), new_jobs)
+
+    db.commit()
+    db.refresh(batch)
+    return batch
+
+
+def get_grading_batch(db: Session, batch_id: int) -> Optional[GradingBatch]:
+    return db.query(GradingBatch).filter(GradingBatch.id == batch_id).first()
+
+
+def get_grading_batch_progress(db: Session, batch: GradingBatch) -> dict:
+    counts = dict(
+        db.query(GradingJob.status, func.count(GradingJob.id))
+        .filter(GradingJob.batch_id == batch.id)
+        .group_by(GradingJob.status)
+        .all()
+    )
+    remaining = counts.get("pending", 0) + counts.get("running", 0)
+
+    finished_at = None
+    if not remaining:
+        finished_at = (
+            db.query(func.max(GradingJob.finished_at))
+            .filter(GradingJob.batch_id == batch.id)
+            .scalar()
+        ) or batch.created_at
+    elapsed = (finished_at or datetime.utcnow()) - batch.created_at
+
+    return {
+        "id": batch.id,
+        "assignment_id": batch.assignment_id,
+        "status": "running" if remaining else "done",
+        "total": sum(counts.values()),
+        "pending": counts.get("pending", 0),
+        "running": counts.get("running", 0),
+        "done": counts.get("done", 0),
+        "failed": counts.get("failed", 0),
+        "created_at": batch.created_at,
+        "finished_at": finished_at,
+        "elapsed_seconds": elapsed.total_seconds(),
+    }
@@ -1,43 +1,75 @@
+from typing import List
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
 from models.operation_models import Question, TeacherResponse, Assignment
 from schemas.question import AssignmentQuestionsCreate
 from schemas.question import QuestionUpdate
 
 
-def create_questions(db: Session, assignment_questions: AssignmentQuestionsCreate):
-    created_questions = []
-
-    for question in assignment_questions.questions:
-        db_question = Question(
-            question_text=question.question_text,
-            max_points=question.max_points,
-            assignment_id=assignment_questions.assignment_id,
-        )
-        db.add(db_question)
-        db.commit()
-        db.refresh(db_question)
+def create_questions(
+    db: Session, assignment_questions: AssignmentQuestionsCreate
+) -> List[Question]:
+    """
+    Creates the questions of an assignment and their answer keys atomically.
+
+    The questions are inserted with one multi-row INSERT ... RETURNING, the
+    teacher answers with one executemany INSERT, and the composition flag of
+    the assignment is set in the same transaction.
+
+    Args:
+        db (Session): Database session.
+        assignment_questions (AssignmentQuestionsCreate): The questions, e.g.
+            the output of `compose_evaluation`.
+
+    Returns:
+        List[Question]: The created questions, in the given order.
+    """
+    assignment_id = assignment_questions.assignment_id
+    if not assignment_questions.questions:
+        return []
+
+    try:
+        created_questions = db.scalars(
+            insert(Question).returning(Question, sort_by_parameter_order=True),
+            [
+                {
+                    "question_text": question.question_text,
+                    "max_points": question.max_points,
+                    "assignment_id": assignment_id,
+                }
+                for question in assignment_questions.questions
+            ],
+        ).all()
 
         # Create TeacherResponse entries
-        for teacher_answer in question.teacher_answers:
-            db_teacher_response = TeacherResponse(
-                response_text=teacher_answer["answer_text"], question_id=db_question.id
+        teacher_responses = [
+            {
+                "response_text": teacher_answer["answer_text"],
+                "question_id": db_question.id,
+            }
+            for db_question, question in zip(
+                created_questions, assignment_questions.questions
             )
-            db.add(db_teacher_response)
+            for teacher_answer in question.teacher_answers
+            if teacher_answer.get("answer_text")
+        ]
+        if teacher_responses:
+            db.execute(insert(TeacherResponse), teacher_responses)
+
+        # Update Assignment's composition status
+        db.execute(
+            update(Assignment)
+            .where(Assignment.id == assignment_id)
+            .values(composition=True)
+        )
 
+        # Detach the rows so that the commit does not expire them
+        for db_question in created_questions:
+            db.expunge(db_question)
         db.commit()
-        db.refresh(db_question)
-        created_questions.append(db_question)
-
-    # Update Assignment's composition status
-    assignment = (
-        db.query(Assignment)
-        .filter(Assignment.id == assignment_questions.assignment_id)
-        .first()
-    )
-    if assignment:
-        assignment.composition = True
-        db.commit()
-        db.refresh(assignment)
+    except Exception:
+        db.rollback()
+        raise
 
     return created_questions
 
@@ -4,7 +4,7 @@ from schemas.student import StudentCreate
 from core.security import get_password_hash
 
 
-async def register_student(student: StudentCreate, db: Session):
+def register_student(student: StudentCreate, db: Session):
     hashed_password = get_password_hash(student.hashed_password)
     student_obj = Student(
         name=student.name,
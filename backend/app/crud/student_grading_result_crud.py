@@ -1,42 +1,51 @@
+from typing import List, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from models import Assignment, Student, Enrollment, StudentResponse
-from sqlalchemy import func
+from models import (
+    Assignment,
+    AssignmentStudentScore,
+    Student,
+    Enrollment,
+    StudentResponse,
+)
+from crud.assignment_score_crud import refresh_assignment_student_score
 
 
-def get_all_assignments_and_students(db: Session, course_id: int):
+def _gradebook_assignments(course_id: int):
     # Query to get all assignments in the course
-    assignments_data = (
-        db.query(
-            Assignment.id, Assignment.title, Assignment.due_date, Assignment.points
+    return select(
+        Assignment.id, Assignment.title, Assignment.due_date, Assignment.points
+    ).where(Assignment.course_id == course_id)
+
+
+def _gradebook_scores(course_id: int, assignment_ids: List[int]):
+    # Students, their emails, and total grades for every assignment at once
+    return (
+        select(
+            AssignmentStudentScore.assignment_id,
+            Student.id,
+            Student.name,
+            Student.postname,
+            Student.email,
+            AssignmentStudentScore.total.label("total_grade"),
+        )
+        .join(Student, AssignmentStudentScore.student_id == Student.id)
+        .join(Enrollment, Enrollment.student_id == Student.id)
+        .where(
+            Enrollment.course_id == course_id,
+            AssignmentStudentScore.assignment_id.in_(assignment_ids),
         )
-        .filter(Assignment.course_id == course_id)
-        .all()
+        .order_by(AssignmentStudentScore.assignment_id, Student.id)
     )
 
-    # Prepare the final result list
-    result = []
 
+def _gradebook_entries(assignments_data) -> Tuple[list, dict]:
+    # Prepare the final result list, one entry per assignment
+    result = []
+    students_by_assignment = {}
     for assignment in assignments_data:
-        # Query to get students, their emails, and total grades for each assignment
-        student_data = (
-            db.query(
-                Student.id,
-                Student.name,
-                Student.postname,
-                Student.email,
-                func.sum(StudentResponse.grade).label("total_grade"),
-            )
-            .join(Enrollment, Enrollment.student_id == Student.id)
-            .join(StudentResponse, StudentResponse.student_id == Student.id)
-            .filter(
-                Enrollment.course_id == course_id,
-                StudentResponse.assignment_id == assignment.id,
-            )
-            .group_by(Student.id)
-            .all()
-        )
-
-        # Append each assignment with its student data to the result list
+        students_by_assignment[assignment.id] = []
         result.append(
             {
                 "assignment": {
@@ -45,19 +54,58 @@ def get_all_assignments_and_students(db: Session, course_id: int):
                     "due_date": assignment.due_date,
                     "points": assignment.points,
                 },
-                "students": [
-                    {
-                        "id": student.id,
-                        "name": student.name,
-                        "postname": student.postname,
-                        "email": student.email,
-                        "total_grade": student.total_grade,
-                    }
-                    for student in student_data
-                ],
+                "students": students_by_assignment[assignment.id],
+            }
+        )
+    return result, students_by_assignment
+
+
+def _add_gradebook_students(students_by_assignment: dict, student_data):
+    for student in student_data:
+        students_by_assignment[student.assignment_id].append(
+            {
+                "id": student.id,
+                "name": student.name,
+                "postname": student.postname,
+                "email": student.email,
+                "total_grade": student.total_grade,
             }
         )
 
+
+def get_all_assignments_and_students(db: Session, course_id: int):
+    """
+    Returns the gradebook of a course: the total grade of every student who
+    answered each assignment.
+
+    Two queries in all: the assignments, then the totals read from the
+    assignment_student_score summary table, assembled in a single pass.
+    """
+    result, students_by_assignment = _gradebook_entries(
+        db.execute(_gradebook_assignments(course_id)).all()
+    )
+    if not result:
+        return result
+
+    _add_gradebook_students(
+        students_by_assignment,
+        db.execute(_gradebook_scores(course_id, list(students_by_assignment))).all(),
+    )
+    return result
+
+
+async def get_all_assignments_and_students_async(db: AsyncSession, course_id: int):
+    """Same as `get_all_assignments_and_students`, with an AsyncSession."""
+    result, students_by_assignment = _gradebook_entries(
+        (await db.execute(_gradebook_assignments(course_id))).all()
+    )
+    if not result:
+        return result
+
+    scores = await db.execute(
+        _gradebook_scores(course_id, list(students_by_assignment))
+    )
+    _add_gradebook_students(students_by_assignment, scores.all())
     return result
 
 
@@ -90,6 +138,10 @@ def update_student_grade_crud(
     # Update the 'grade' field with the most recent grade for convenience
     student_response.grade = new_grade
 
+    # Keep the gradebook summary of the copy in sync
+    db.flush()
+    refresh_assignment_student_score(db, assignment_id, student_id)
+
     # Save changes to the database
     db.commit()
     db.refresh(student_response)
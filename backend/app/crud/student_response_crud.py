@@ -1,26 +1,121 @@
+from typing import List
+from fastapi import HTTPException
+from sqlalchemy import case, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from db.upsert import upsert_insert
 from schemas.student_response import AssignmentResponsesCreate
 from models.operation_models import StudentResponse
+from crud.assignment_score_crud import refresh_assignment_student_score
+
+
+def _insert_responses(db: Session, rows: List[dict]) -> List[StudentResponse]:
+    # A concurrent submission of the same copy can insert the same questions
+    # first: on SQLite and PostgreSQL, its rows are then updated like existing
+    # responses (a response whose text changed loses its grade)
+    upsert = upsert_insert(db)
+    if upsert is None:
+        try:
+            return db.scalars(
+                insert(StudentResponse).returning(StudentResponse), rows
+            ).all()
+        except IntegrityError:
+            raise HTTPException(
+                status_code=409,
+                detail="This copy is being submitted by another request",
+            )
+
+    table = StudentResponse.__table__
+    stmt = upsert(StudentResponse)
+    unchanged = table.c.response_text == stmt.excluded.response_text
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.assignment_id, table.c.student_id, table.c.question_id],
+        set_={
+            "response_text": stmt.excluded.response_text,
+            "file": stmt.excluded.file,
+            "grade": case((unchanged, table.c.grade), else_=None),
+            "comment": case((unchanged, table.c.comment), else_=None),
+        },
+    )
+    return db.scalars(stmt.returning(StudentResponse), rows).all()
 
 
 def create_student_responses(
     db: Session, assignment_responses: AssignmentResponsesCreate
-):
-    # print(assignment_responses)
-    created_responses = []
-    for response in assignment_responses.responses:
-        db_response = StudentResponse(
-            assignment_id=assignment_responses.assignment_id,
-            student_id=assignment_responses.student_id,
-            question_id=response.question_id,
-            response_text=response.response_text,
-            file=response.file,
+) -> List[StudentResponse]:
+    """
+    Saves all the responses of a submission in a single transaction.
+
+    New responses are inserted with one multi-row INSERT ... RETURNING, which
+    updates the responses inserted meanwhile by a concurrent submission.
+    Resubmitting a response to the same question updates it instead of adding
+    a duplicate; a response whose text changed loses its previous grade.
+
+    Returns:
+        List[StudentResponse]: The saved responses, in submission order.
+    """
+    assignment_id = assignment_responses.assignment_id
+    student_id = assignment_responses.student_id
+    # The last response wins if a question is answered twice in the payload
+    responses = {r.question_id: r for r in assignment_responses.responses}
+
+    existing_responses = {
+        r.question_id: r
+        for r in db.query(StudentResponse).filter(
+            StudentResponse.assignment_id == assignment_id,
+            StudentResponse.student_id == student_id,
+            StudentResponse.question_id.in_(list(responses)),
         )
-        db.add(db_response)
-        db.commit()
-        db.refresh(db_response)
-        created_responses.append(db_response)
-    return created_responses
+    }
+
+    for question_id, existing in existing_responses.items():
+        response = responses[question_id]
+        if existing.response_text != response.response_text:
+            existing.response_text = response.response_text
+            existing.grade = None
+            existing.comment = None
+        existing.file = response.file
+
+    new_rows = [
+        {
+            "assignment_id": assignment_id,
+            "student_id": student_id,
+            "question_id": question_id,
+            "response_text": response.response_text,
+            "file": response.file,
+        }
+        for question_id, response in responses.items()
+        if question_id not in existing_responses
+    ]
+    created_responses = []
+    if new_rows:
+        created_responses = _insert_responses(db, new_rows)
+    db.flush()
+    refresh_assignment_student_score(db, assignment_id, student_id)
+
+    saved_responses = {r.question_id: r for r in created_responses}
+    saved_responses.update(existing_responses)
+    saved_responses = [saved_responses[question_id] for question_id in responses]
+
+    # Detach the rows before committing, so that they are not expired and
+    # reloaded one by one when the response is serialized
+    for response in saved_responses:
+        db.expunge(response)
+    db.commit()
+    return saved_responses
+
+
+async def create_student_responses_async(
+    db: AsyncSession, assignment_responses: AssignmentResponsesCreate
+) -> List[StudentResponse]:
+    """
+    Same as `create_student_responses`, with an AsyncSession.
+
+    The upsert and the gradebook refresh run as one unit of sync code, on the
+    async connection, without blocking the event loop.
+    """
+    return await db.run_sync(create_student_responses, assignment_responses)
 
 
 def get_student_responses_by_assignment_student_and_question(
@@ -35,3 +130,29 @@ def get_student_responses_by_assignment_student_and_question(
         )
         .all()
     )
+
+
+def has_student_responses(db: Session, assignment_id: int, student_id: int) -> bool:
+    return (
+        db.query(StudentResponse.id)
+        .filter(
+            StudentResponse.assignment_id == assignment_id,
+            StudentResponse.student_id == student_id,
+        )
+        .first()
+        is not None
+    )
+
+
+async def has_student_responses_async(
+    db: AsyncSession, assignment_id: int, student_id: int
+) -> bool:
+    stmt = (
+        select(StudentResponse.id)
+        .where(
+            StudentResponse.assignment_id == assignment_id,
+            StudentResponse.student_id == student_id,
+        )
+        .limit(1)
+    )
+    return (await db.execute(stmt)).first() is not None
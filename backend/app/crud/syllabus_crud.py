@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+from fastapi import HTTPException
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from models.operation_models import Course
+
+# Statuses of a syllabus being ingested by a worker
+INGESTION_STEPS = ("downloading", "extracting", "chapterizing")
+
+
+def check_syllabus_ready(course: Course):
+    """
+    Raises a 409 while the chapters of the course are being extracted from
+    its syllabus, or if their extraction failed.
+    """
+    if course.syllabus_status == "ready":
+        return
+    if course.syllabus_status == "failed":
+        detail = (
+            f"The syllabus of course {course.id} could not be ingested: "
+            f"{course.syllabus_error}"
+        )
+    else:
+        detail = (
+            f"The syllabus of course {course.id} is not ready yet "
+            f"({course.syllabus_status})."
+        )
+    raise HTTPException(status_code=409, detail=detail)
+
+
+def claim_next_syllabus(db: Session) -> Optional[Course]:
+    """
+    Atomically moves the oldest pending syllabus to "downloading".
+
+    As for grading jobs, the conditional UPDATE hands a course to a single
+    worker, even when several workers (or processes) poll the table.
+    """
+    while True:
+        course = (
+            db.query(Course)
+            .filter(Course.syllabus_status == "pending")
+            .order_by(Course.id)
+            .first()
+        )
+        if not course:
+            return None
+
+        claimed = (
+            db.query(Course)
+            .filter(Course.id == course.id, Course.syllabus_status == "pending")
+            .update(
+                {
+                    Course.syllabus_status: "downloading",
+                    Course.syllabus_started_at: datetime.utcnow(),
+                    Course.syllabus_attempts: Course.syllabus_attempts + 1,
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        if claimed:
+            db.refresh(course)
+            return course
+
+
+def set_syllabus_status(db: Session, course: Course, status: str):
+    course.syllabus_status = status
+    db.commit()
+
+
+def complete_syllabus(
+    db: Session,
+    course: Course,
+    syllabus_content: str,
+    page_offsets: List[int],
+    course_chapters: List[dict],
+):
+    course.syllabus_content = syllabus_content
+    course.syllabus_page_offsets = page_offsets
+    course.course_chapters = course_chapters
+    course.syllabus_status = "ready"
+    course.syllabus_error = None
+    db.commit()
+
+
+def fail_syllabus(
+    db: Session, course: Course, error: str, max_attempts: int, retry: bool = True
+):
+    # Put the syllabus back in the queue until it runs out of attempts
+    course.syllabus_error = error
+    if retry and course.syllabus_attempts < max_attempts:
+        course.syllabus_status = "pending"
+    else:
+        course.syllabus_status = "failed"
+    db.commit()
+
+
+def requeue_stale_syllabi(db: Session, lease_timeout: float) -> int:
+    """
+    Puts back in the queue the syllabi in progress for more than
+    `lease_timeout` seconds, left by a process that stopped.
+
+    As for grading jobs, younger ones may still be ingested by a live worker
+    of another process: they are left alone.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=lease_timeout)
+    requeued = (
+        db.query(Course)
+        .filter(
+            Course.syllabus_status.in_(INGESTION_STEPS),
+            # Claimed before syllabus_started_at existed
+            or_(
+                Course.syllabus_started_at.is_(None),
+                Course.syllabus_started_at < cutoff,
+            ),
+        )
+        .update({Course.syllabus_status: "pending"}, synchronize_session=False)
+    )
+    db.commit()
+    return requeued
@@ -5,7 +5,7 @@ from core.security import get_password_hash
 from fastapi import HTTPException
 
 
-async def register_teacher(teacher: TeacherCreate, db: Session):
+def register_teacher(teacher: TeacherCreate, db: Session):
     if teacher.new_institution:
         institution_obj = Institution(
             name=teacher.new_institution.name,
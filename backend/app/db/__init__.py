@@ -1 +1 @@
-from .session import SessionLocal, engine, Base
+from .session import SessionLocal, engine, Base, AsyncSessionLocal, async_engine
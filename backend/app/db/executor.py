@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+from core.config import settings
+
+T = TypeVar("T")
+
+
+class DatabaseExecutor:
+    """
+    Runs the blocking database calls of the async routes on a dedicated,
+    bounded pool of threads, so that a slow query does not stall the event
+    loop and every other request of the worker.
+
+    Calls wait in the queue of the pool while all its threads are busy. The
+    queue depth and the time spent waiting are reported by `stats`.
+
+    Example:
+        course = await db_executor.run(get_course, course_id, user, db)
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._max_queued = 0
+        self._completed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="db"
+                )
+            return self._executor
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Calls `func(*args, **kwargs)` on the pool and waits for its result."""
+        submitted = time.perf_counter()
+        with self._lock:
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+
+        def call():
+            started = time.perf_counter()
+            wait = started - submitted
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+                    self._run_total += time.perf_counter() - started
+
+        future = self._get_executor().submit(call)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # A call cancelled before a thread picked it up never runs
+            if future.cancel():
+                with self._lock:
+                    self._queued -= 1
+            raise
+
+    def stats(self) -> dict:
+        with self._lock:
+            completed = self._completed
+            return {
+                "workers": self.workers,
+                "running": self._running,
+                "queued": self._queued,
+                "max_queued": self._max_queued,
+                "completed": completed,
+                "avg_wait_ms": (
+                    self._wait_total / completed * 1000 if completed else 0.0
+                ),
+                "max_wait_ms": self._wait_max * 1000,
+                "avg_run_ms": self._run_total / completed * 1000 if completed else 0.0,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+db_executor = DatabaseExecutor(workers=settings.DB_THREADPOOL_SIZE)
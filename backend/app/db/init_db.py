@@ -1,4 +1,4 @@
-from .session import Base, engine, SessionLocal
+from .session import Base, engine, SessionLocal, AsyncSessionLocal
 
 from models.user_models import *
 from models.operation_models import *
@@ -14,3 +14,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
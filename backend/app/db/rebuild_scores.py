@@ -0,0 +1,34 @@
+"""
+Recomputes the assignment_student_score gradebook summary from the responses.
+
+The summary is maintained on every grade write, and filled at startup while
+it is empty; run this after importing data, editing grades by hand or
+restoring a backup.
+
+Usage (from backend/app):
+    python -m db.rebuild_scores [--course-id ID]
+"""
+
+import argparse
+from db.init_db import init_db
+from db.session import SessionLocal
+from crud.assignment_score_crud import rebuild_assignment_scores
+
+
+def main(course_id=None):
+    init_db()
+    db = SessionLocal()
+    try:
+        rows = rebuild_assignment_scores(db, course_id=course_id)
+    finally:
+        db.close()
+
+    scope = f"course {course_id}" if course_id is not None else "all courses"
+    print(f"Rebuilt {rows} gradebook row(s) for {scope}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--course-id", type=int, default=None)
+    args = parser.parse_args()
+    main(args.course_id)
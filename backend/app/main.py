@@ -1,4 +1,4 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api.routes import course_route as course
 from api.routes import teacher_route as teacher
@@ -13,6 +13,16 @@ from api.routes import enrollment_route as enrollment
 
 # from api.routes import
 from db.init_db import init_db
+from db.executor import db_executor
+from db.session import SessionLocal
+from crud.assignment_score_crud import backfill_assignment_scores
+from core.security import check_user_active
+from core.passwords import password_hasher
+from core.revocation import revocation_list
+from services.grading_worker import grading_pool
+from services.syllabus_ingestion import syllabus_pool
+from services.pdf_extraction import pdf_extractor
+from services.llm_registry import llm_registry
 
 app = FastAPI()
 
@@ -35,6 +45,11 @@ async def root():
     return {"message": "Bic Rouge !"}
 
 
+@app.get("/api/db_executor/stats")
+def get_db_executor_stats(user=Depends(check_user_active)):
+    return db_executor.stats()
+
+
 # Routers
 app.include_router(teacher.router, prefix="/api/teachers", tags=["teachers"])
 app.include_router(student.router, prefix="/api/students", tags=["students"])
@@ -53,6 +68,72 @@ def on_startup():
     init_db()
 
 
+@app.on_event("startup")
+def fill_gradebook():
+    # Summaries of the copies graded before the gradebook table existed
+    db = SessionLocal()
+    try:
+        backfill_assignment_scores(db)
+    finally:
+        db.close()
+
+
+@app.on_event("startup")
+async def start_llm_providers():
+    await llm_registry.startup()
+
+
+@app.on_event("startup")
+async def start_grading_workers():
+    grading_pool.start()
+
+
+@app.on_event("startup")
+async def start_syllabus_workers():
+    syllabus_pool.start()
+
+
+@app.on_event("startup")
+def start_password_hasher():
+    password_hasher.start()
+
+
+@app.on_event("startup")
+async def load_revoked_tokens():
+    revocation_list.start()
+
+
+@app.on_event("shutdown")
+async def stop_grading_workers():
+    await grading_pool.stop()
+
+
+@app.on_event("shutdown")
+async def stop_syllabus_workers():
+    await syllabus_pool.stop()
+    pdf_extractor.shutdown()
+
+
+@app.on_event("shutdown")
+async def close_llm_providers():
+    await llm_registry.close()
+
+
+@app.on_event("shutdown")
+async def stop_revocation_refresh():
+    await revocation_list.stop()
+
+
+@app.on_event("shutdown")
+def stop_db_executor():
+    db_executor.shutdown()
+
+
+@app.on_event("shutdown")
+def stop_password_hasher():
+    password_hasher.shutdown()
+
+
 if __name__ == "__main__":
     import uvicorn
 
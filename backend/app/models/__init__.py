@@ -1,4 +1,4 @@
-from .user_models import Institution, Teacher, Student
+from .user_models import Institution, Teacher, Student, RevokedToken, RevokedUserTokens
 from .operation_models import (
     Course,
     Assignment,
@@ -6,4 +6,8 @@ from .operation_models import (
     Enrollment,
     StudentResponse,
     Feedback,
+    GradingJob,
+    GradingBatch,
+    LLMCacheEntry,
+    AssignmentStudentScore,
 )
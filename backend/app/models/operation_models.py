@@ -10,6 +10,8 @@ from sqlalchemy import (
     Text,
     Float,
     JSON,
+    Index,
+    UniqueConstraint,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import ARRAY  # Add this import
@@ -24,7 +26,17 @@ class Course(Base):
     code = Column(String, nullable=False, unique=True)
     syllabus_url = Column(String, nullable=True)
     syllabus_content = Column(Text, nullable=True)
+    # Offset in syllabus_content of the first character of every page
+    syllabus_page_offsets = Column(JSON, nullable=True)
     course_chapters = Column(JSON, nullable=True)
+    llm_provider = Column(String, nullable=True)  # None uses the default provider
+    # Background ingestion of the syllabus (services/syllabus_ingestion.py)
+    syllabus_status = Column(
+        String, nullable=False, default="pending", index=True
+    )  # pending, downloading, extracting, chapterizing, ready, failed
+    syllabus_attempts = Column(Integer, nullable=False, default=0)
+    syllabus_started_at = Column(DateTime, nullable=True)  # Of the last attempt
+    syllabus_error = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     teacher_id = Column(Integer, ForeignKey("teacher.id"))
@@ -39,6 +51,10 @@ class Course(Base):
 
 class Enrollment(Base):
     __tablename__ = "enrollment"
+    __table_args__ = (
+        Index("ix_enrollment_student_course", "student_id", "course_id"),
+        Index("ix_enrollment_student_course_code", "student_id", "course_code"),
+    )
     id = Column(Integer, primary_key=True)
     date = Column(DateTime, default=datetime.utcnow)
     state = Column(
@@ -108,6 +124,16 @@ class Question(Base):
 
 class StudentResponse(Base):
     __tablename__ = "student_response"
+    __table_args__ = (
+        # One response per question of a copy, also used by every copy lookup
+        Index(
+            "ix_student_response_assignment_student_question",
+            "assignment_id",
+            "student_id",
+            "question_id",
+            unique=True,
+        ),
+    )
     id = Column(Integer, primary_key=True)
     response_text = Column(Text, nullable=False)
     grade = Column(Float, nullable=True)
@@ -130,6 +156,13 @@ class StudentResponse(Base):
 
 class Feedback(Base):
     __tablename__ = "feedback"
+    __table_args__ = (
+        Index(
+            "ix_feedback_assignment_student_response",
+            "assignment_id",
+            "student_response_id",
+        ),
+    )
     id = Column(Integer, primary_key=True)
     advice = Column(Text, nullable=False)
     date = Column(DateTime, default=datetime.utcnow)
@@ -140,4 +173,66 @@ class Feedback(Base):
     student_response_id = Column(
         Integer, ForeignKey("student_response.id"), unique=True
     )
-    student_response = relationship("StudentResponse", back_populates="feedback")
\ No newline at end of file
+    student_response = relationship("StudentResponse", back_populates="feedback")
+
+
+class GradingJob(Base):
+    __tablename__ = "grading_job"
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(
+        String, nullable=False, default="pending", index=True
+    )  # pending, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    # A failed job waits until then before being claimed again
+    next_attempt_at = Column(DateTime, nullable=True)
+    assignment_id = Column(Integer, ForeignKey("assignment.id"))
+    student_id = Column(Integer, ForeignKey("student.id"))
+    assignment = relationship("Assignment")
+    # Set when the job was created by a whole-assignment grading batch
+    batch_id = Column(
+        Integer, ForeignKey("grading_batch.id"), nullable=True, index=True
+    )
+    batch = relationship("GradingBatch", back_populates="jobs")
+
+
+class GradingBatch(Base):
+    __tablename__ = "grading_batch"
+    id = Column(Integer, primary_key=True, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    assignment_id = Column(Integer, ForeignKey("assignment.id"))
+    assignment = relationship("Assignment")
+    jobs = relationship("GradingJob", back_populates="batch")
+
+
+class LLMCacheEntry(Base):
+    __tablename__ = "llm_cache_entry"
+    # SHA-256 of the rendered prompt, provider, model and sampling parameters
+    key = Column(String(64), primary_key=True)
+    provider = Column(String, nullable=False)
+    model = Column(String, nullable=False)
+    response = Column(JSON, nullable=False)
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class AssignmentStudentScore(Base):
+    """
+    Gradebook summary of a student's copy, kept up to date on every write of
+    its grades (see crud/assignment_score_crud.py).
+    """
+
+    __tablename__ = "assignment_student_score"
+    __table_args__ = (UniqueConstraint("assignment_id", "student_id"),)
+    id = Column(Integer, primary_key=True, index=True)
+    assignment_id = Column(Integer, ForeignKey("assignment.id"), nullable=False)
+    student_id = Column(Integer, ForeignKey("student.id"), nullable=False)
+    total = Column(Float, nullable=True)  # None until a response is graded
+    graded_count = Column(Integer, nullable=False, default=0)
+    response_count = Column(Integer, nullable=False, default=0)
+    validated = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
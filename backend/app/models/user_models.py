@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Table, Boolean
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, ForeignKey, Table, Boolean, DateTime
 from sqlalchemy.orm import relationship
 from db.base import Base
 
@@ -45,3 +46,34 @@ class Student(Base):
     is_active = Column(Boolean, default=True)
     hashed_password = Column(String, nullable=False)
     enrollments = relationship("Enrollment", back_populates="student")
+
+
+class RevokedToken(Base):
+    """
+    Token revoked before its expiry, by the `jti` claim. Loaded in memory by
+    every worker (see core/revocation.py).
+    """
+
+    __tablename__ = "revoked_token"
+    # Increasing: the workers load the rows added since their last refresh
+    id = Column(Integer, primary_key=True)
+    jti = Column(String(32), unique=True, nullable=False)
+    # Expiry of the token: the row is useless, and deleted, after it
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, default=datetime.utcnow)
+
+
+class RevokedUserTokens(Base):
+    """
+    Revokes every token of a user issued up to `revoked_at`, e.g. when the
+    user is deactivated. Rows are only inserted, and loaded in memory with
+    the revoked tokens (see core/revocation.py).
+    """
+
+    __tablename__ = "revoked_user_tokens"
+    id = Column(Integer, primary_key=True)
+    role = Column(String, nullable=False)  # teacher or student
+    user_id = Column(Integer, nullable=False)
+    revoked_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # Expiry of the last token revoked: the row is useless, and deleted, after it
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -19,6 +19,7 @@ class CourseBase(BaseModel):
     subject: Optional[str]
     syllabus_url: Optional[str] = None
     course_chapters: Optional[List[Dict]] = None
+    llm_provider: Optional[str] = None
 
 
 class CourseCreate(CourseBase):
@@ -32,6 +33,9 @@ class CourseRead(CourseBase):
     id: int
     code: str
     teacher_name: Optional[str] = None
+    # pending, downloading, extracting, chapterizing, ready or failed
+    syllabus_status: Optional[str] = None
+    syllabus_error: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
@@ -1,7 +1,22 @@
 from pydantic import BaseModel
+from typing import Dict
 
 
 class AssessmentData(BaseModel):
     teacher_corrected_assessment: str
     grading_criteria: str
     student_responses: str
+
+
+class QuestionGrading(BaseModel):
+    note: float
+    commentaires: str = ""
+
+
+class GradingOutput(BaseModel):
+    advice: str = ""
+    grading: Dict[str, QuestionGrading]
+
+
+class GradingAdvice(BaseModel):
+    advice: str
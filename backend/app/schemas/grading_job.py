@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+
+class GradingJobRead(BaseModel):
+    id: int
+    assignment_id: int
+    student_id: int
+    status: str
+    attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class GradingBatchRead(BaseModel):
+    id: int
+    assignment_id: int
+    status: str
+    total: int
+    pending: int
+    running: int
+    done: int
+    failed: int
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    elapsed_seconds: float
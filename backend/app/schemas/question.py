@@ -16,6 +16,11 @@ class AssignmentQuestionsCreate(BaseModel):
     questions: List[QuestionCreate]
 
 
+class GeneratedQuestions(BaseModel):
+    assignment_id: Optional[int] = None
+    questions: List[QuestionCreate]
+
+
 class Question(QuestionBase):
     id: int
     assignment_id: int
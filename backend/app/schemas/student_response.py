@@ -44,3 +44,9 @@ class AssignmentResponsesCreate(BaseModel):
     assignment_id: int
     student_id: int
     responses: List[StudentResponseCreate]
+
+
+class StudentSubmissionRead(BaseModel):
+    job_id: int
+    status: str
+    responses: List[StudentResponse]
@@ -8,3 +8,10 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     email: str = None
+
+
+class Principal(BaseModel):
+    id: int
+    email: str
+    role: str
+    is_active: bool
@@ -1,6 +1,5 @@
 from typing import List
-import json
-from fastapi import HTTPException
+from schemas.course import ChaptersResponse
 from .query_LLM import call_llm
 
 
@@ -20,37 +19,30 @@ async def extract_chapters_from_syllabus(syllabus_content: str) -> List[dict]:
     
     Example:
     ```json
-        [
-            {{
-                "number": 1,
-                "title": "Introduction",
-                "content": "This is the first chapter content."
-            }},
-            {{
-                "number": 2,
-                "title": "Chapter Title",
-                "content": "This is the second chapter content."
-            }}
-        ]
+        {{
+            "chapters": [
+                {{
+                    "number": 1,
+                    "title": "Introduction",
+                    "content": "This is the first chapter content."
+                }},
+                {{
+                    "number": 2,
+                    "title": "Chapter Title",
+                    "content": "This is the second chapter content."
+                }}
+            ]
+        }}
     ```
 
     Now, extract the chapters from this syllabus content:
     {syllabus_content}
     """
 
-    response = await call_llm(prompt)
+    # The response is requested in JSON mode and validated against the schema
+    response = await call_llm(prompt, schema=ChaptersResponse)
 
     # Log the response for debugging
     print(f"LLM response: {response}")
 
-    # If the response is already a dictionary, return it directly
-    if isinstance(response, dict):
-        return response
-
-    # Parse the JSON response safely
-    try:
-        return response
-    except json.JSONDecodeError as e:
-        raise HTTPException(
-            status_code=500, detail=f"Error parsing LLM response: {str(e)}"
-        )
+    return response["chapters"]
@@ -1,7 +1,10 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from typing import Union, List, Optional
+from crud.syllabus_crud import check_syllabus_ready
+from db.executor import db_executor
 from models.operation_models import Assignment, Course
+from schemas.question import GeneratedQuestions
 from .query_LLM import call_llm
 import json
 
@@ -9,6 +12,12 @@ import json
 # Take Ass
 
 
+def _get_course_and_assignment(db: Session, course_id: int, assignment_id: int):
+    course = db.query(Course).filter(Course.id == course_id).first()
+    assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
+    return course, assignment
+
+
 async def compose_evaluation(
     db: Session,
     assignment_id: int,
@@ -29,17 +38,18 @@ async def compose_evaluation(
     Returns:
         dict: Generated questions in the specified format.
     """
-    # Step 1: Fetch the course by ID
-    course = db.query(Course).filter(Course.id == course_id).first()
-
-    # Step 2: Fetch the assignment by ID
-    assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
+    # Step 1 and 2: Fetch the course and the assignment by ID
+    course, assignment = await db_executor.run(
+        _get_course_and_assignment, db, course_id, assignment_id
+    )
 
     # Step 3: Fetch the course content based on chapterss
     if not course:
         raise HTTPException(
             status_code=404, detail=f"Course with ID {course_id} not found."
         )
+    # The chapters are extracted in the background after the course creation
+    check_syllabus_ready(course)
 
     # Step 2: Retrieve course content based on chapterss
     # if chapters:
@@ -92,18 +102,15 @@ async def compose_evaluation(
 
     # Step 4: Call the LLM to generate questions and answers
     try:
-        response = await call_llm(prompt)  # <-- Ensure call_llm is awaited properly
-        # # Parse the response into a dictionary
-        # parsed_response = json.loads(response)
-        print(f"LLM response: {response}")  # Debugging log
-        # Validate and append the assignment ID
-        if "questions" in response:
-            print(f"LLM response: {response}")
-            return response
-
-        else:
-            raise ValueError("Invalid response structure from LLM.")
-
+        # The response is requested in JSON mode and validated against the schema
+        questions = await call_llm(prompt, schema=GeneratedQuestions)
+        print(f"LLM response: {questions}")  # Debugging log
+        # Append the assignment ID
+        questions["assignment_id"] = assignment_id
+        return questions
+
+    except HTTPException:
+        raise
     except json.JSONDecodeError as e:
         raise HTTPException(
             status_code=500, detail=f"Error parsing LLM response: {str(e)}"
@@ -1,10 +1,13 @@
-from together import Together
-from core.config import settings
+from typing import Optional, Type
+from pydantic import BaseModel
+from services.llm_providers import LLMProvider
+from services.llm_registry import llm_registry
+from schemas.grading import GradingOutput
 import logging
-import json
-import re
 
-client = Together(api_key=settings.together_api_key)
+
+# Sampling parameters of the grading calls (provider defaults)
+sampling_params = {}
 
 
 async def get_grading_from_llm(
@@ -12,49 +15,45 @@ async def get_grading_from_llm(
     grading_elements: str,
     instruction_prompt: str,
     output_strucutre: str,
+    provider: Optional[LLMProvider] = None,
+    schema: Type[BaseModel] = GradingOutput,
 ):
+    provider = provider or llm_registry.get("together")
     try:
         # Send the prompt to the LLM and wait for the response
-        response = client.chat.completions.create(
-            model="meta-llama/Meta-Llama-3-70B-Instruct-Lite",
+        grading = await provider.chat_json(
             messages=[
                 {"role": "system", "content": role_prompt},
                 {"role": "user", "content": grading_elements},
                 {"role": "user", "content": output_strucutre},
                 {"role": "user", "content": instruction_prompt},
             ],
+            schema=schema,
+            **sampling_params,
         )
 
         # Parse the response for the grading
-        grading = response.choices[0].message.content
         print("Response from Together:", grading)
 
-        # Attempt to find valid JSON in the response
-        result_json_match = re.search(r"\{.*\}", grading, re.DOTALL)
-
-        # If JSON found, parse it
-        if result_json_match:
-            # Extract the JSON part
-            result_json = result_json_match.group(0)
-            # Parse JSON
-            grading_result = json.loads(result_json)
-            return grading_result
-        else:
-            # Return an error message if no valid JSON is found
-            print("No valid JSON found in the response.")
-            return {"error": "No valid JSON found in the response."}
+        return grading
+
+    except ValueError as e:
+        logging.error(f"Invalid JSON in the response: {e}")
+        return {"error": str(e)}
 
     except ConnectionError:
         logging.error("Network error occurred. Unable to connect to the API.")
-        return "An error occurred: Unable to connect to the server. Please try again later."
+        return {
+            "error": "Unable to connect to the server. Please try again later."
+        }
 
     except KeyError as e:
         logging.error(f"KeyError: Missing expected data in response - {e}")
-        return "An error occurred: Invalid response from the server."
+        return {"error": "Invalid response from the server."}
 
     except Exception as e:
         logging.error(f"Unexpected error: {e}")
-        return f"An unexpected error occurred: {e}"
+        return {"error": f"An unexpected error occurred: {e}"}
 
     finally:
         # Optional cleanup or logging
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from core.config import settings
+from db.executor import db_executor
+from db.session import SessionLocal
+from db.upsert import upsert_insert
+from models.operation_models import LLMCacheEntry
+
+logger = logging.getLogger(__name__)
+
+
+class GradingCache:
+    """
+    Content-addressed cache of the gradings returned by the LLM.
+
+    Entries are keyed by a hash of everything that determines the model
+    output (rendered prompt, provider, model and sampling parameters), so a
+    resubmission, a retry or an identical answer is served without calling
+    the provider again. Entries expire after `ttl` seconds and the least
+    recently used ones are evicted above `max_entries`.
+    """
+
+    def __init__(self, enabled: bool, ttl: int, max_entries: int):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(provider: str, model: str, prompt: List[str], params: dict) -> str:
+        payload = json.dumps(
+            {"provider": provider, "model": model, "prompt": prompt, "params": params},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[dict]:
+        """Returns the cached grading, or None (also when the lookup fails)."""
+        if not self.enabled:
+            return None
+        try:
+            return await db_executor.run(self._get, key)
+        except Exception as e:
+            logger.warning(f"Grading cache lookup failed: {e}")
+            return None
+
+    async def set(self, key: str, provider: str, model: str, response: dict):
+        """Stores a grading. A failed write is logged: the grading stands."""
+        if not self.enabled:
+            return
+        try:
+            await db_executor.run(self._set, key, provider, model, response)
+        except Exception as e:
+            logger.warning(f"Grading cache write failed: {e}")
+
+    def _get(self, key: str) -> Optional[dict]:
+        db = SessionLocal()
+        try:
+            entry = db.query(LLMCacheEntry).filter(LLMCacheEntry.key == key).first()
+            now = datetime.utcnow()
+            if entry is None or entry.created_at < now - timedelta(seconds=self.ttl):
+                self.misses += 1
+                return None
+
+            entry.hits += 1
+            entry.last_used_at = now
+            db.commit()
+            self.hits += 1
+            return entry.response
+        finally:
+            db.close()
+
+    def _set(self, key: str, provider: str, model: str, response: dict):
+        # Two processes can store the same grading at the same time: on SQLite
+        # and PostgreSQL, the last write wins in a single INSERT ... ON CONFLICT
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            insert = upsert_insert(db)
+            if insert is not None:
+                stmt = insert(LLMCacheEntry).values(
+                    key=key,
+                    provider=provider,
+                    model=model,
+                    response=response,
+                    hits=0,
+                    created_at=now,
+                    last_used_at=now,
+                )
+                db.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=[LLMCacheEntry.key],
+                        set_={
+                            "provider": stmt.excluded.provider,
+                            "model": stmt.excluded.model,
+                            "response": stmt.excluded.response,
+                            "created_at": stmt.excluded.created_at,
+                            "last_used_at": stmt.excluded.last_used_at,
+                        },
+                    )
+                )
+            else:
+                entry = (
+                    db.query(LLMCacheEntry).filter(LLMCacheEntry.key == key).first()
+                )
+                if entry is None:
+                    entry = LLMCacheEntry(key=key, provider=provider, model=model)
+                    db.add(entry)
+                entry.response = response
+                entry.created_at = now
+                entry.last_used_at = now
+            db.commit()
+            self._evict(db)
+        finally:
+            db.close()
+
+    def _evict(self, db: Session):
+        # Expired entries first, then the least recently used above the limit
+        expired = (
+            db.query(LLMCacheEntry)
+            .filter(
+                LLMCacheEntry.created_at
+                < datetime.utcnow() - timedelta(seconds=self.ttl)
+            )
+            .delete(synchronize_session=False)
+        )
+
+        excess = db.query(func.count(LLMCacheEntry.key)).scalar() - self.max_entries
+        lru = 0
+        if excess > 0:
+            oldest = (
+                db.query(LLMCacheEntry.key)
+                .order_by(LLMCacheEntry.last_used_at)
+                .limit(excess)
+                .subquery()
+            )
+            lru = (
+                db.query(LLMCacheEntry)
+                .filter(LLMCacheEntry.key.in_(oldest.select()))
+                .delete(synchronize_session=False)
+            )
+
+        db.commit()
+        self.evictions += expired + lru
+
+    def stats(self) -> dict:
+        db = SessionLocal()
+        try:
+            entries, stored_hits = db.query(
+                func.count(LLMCacheEntry.key), func.sum(LLMCacheEntry.hits)
+            ).one()
+        finally:
+            db.close()
+
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            # Hits recorded by every process since the entries were stored
+            "stored_hits": stored_hits or 0,
+        }
+
+
+grading_cache = GradingCache(
+    enabled=settings.GRADING_CACHE_ENABLED,
+    ttl=settings.GRADING_CACHE_TTL,
+    max_entries=settings.GRADING_CACHE_MAX_ENTRIES,
+)
@@ -1,4 +1,6 @@
+from typing import List
 from sqlalchemy.orm import Session
+from schemas.grading import AssessmentData
 from crud.grading_crud import get_questions_and_max_points, get_student_responses
 
 
@@ -32,3 +34,39 @@ async def assemble_grading_data(db: Session, assignment_id: int, student_id: int
         "grading_criteria": grading_criteria,
         "student_responses": student_responses_text,
     }
+
+
+async def assemble_question_grading_data(
+    db: Session, assignment_id: int, student_id: int
+) -> List[dict]:
+    """
+    Builds one grading input per question, to grade the questions separately.
+
+    Returns:
+        List[dict]: {"question_id", "max_points", "assessment"} for every
+        question answered by the student.
+    """
+    questions = await get_questions_and_max_points(db, assignment_id)
+    student_responses = await get_student_responses(db, assignment_id, student_id)
+    responses_by_question = {
+        r["question_id"]: r["response_text"] for r in student_responses
+    }
+
+    question_grading_data = []
+    for q in questions:
+        if q["question_id"] not in responses_by_question:
+            continue
+
+        question_grading_data.append(
+            {
+                "question_id": q["question_id"],
+                "max_points": q["max_points"],
+                "assessment": AssessmentData(
+                    teacher_corrected_assessment=f"Question 1 ({q['max_points']} points): {q['question_text']} \nRéponse : {q['correct_answer']}",
+                    grading_criteria=f"Cette évaluation compte 1 question et est cotée sur {q['max_points']} points.",
+                    student_responses=f"Question 1 Réponse: {responses_by_question[q['question_id']]}",
+                ),
+            }
+        )
+
+    return question_grading_data
@@ -1,17 +1,17 @@
-from openai import OpenAI
-import json
-import re
-from core.config import settings
-
-# Access the OpenAI API key
-# openai.api_key = settings.openai_api_key
-
-
-# Handle other potential issues by making sure JSON strings are properly quoted
-def ensure_proper_json_format(json_string):
-    # Replace any instances of improperly placed quotes due to sanitization
-    # This will handle cases where 'L'étudiant' shouldn't be converted to 'L"étudiant'
-    return re.sub(r'(\w)"(\w)', r"\1\'\2", json_string)
+from typing import Optional, Type
+from pydantic import BaseModel
+from services.llm_providers import LLMProvider
+from services.llm_registry import llm_registry
+from schemas.grading import GradingOutput
+
+# Sampling parameters of the grading calls
+sampling_params = {
+    "temperature": 0.2,
+    "max_tokens": 3500,
+    "top_p": 0.5,
+    "frequency_penalty": 0,
+    "presence_penalty": 0,
+}
 
 
 async def get_grading_from_llm(
@@ -19,56 +19,32 @@ async def get_grading_from_llm(
     grading_elements: str,
     instruction_prompt: str,
     output_strucutre: str,
+    provider: Optional[LLMProvider] = None,
+    schema: Type[BaseModel] = GradingOutput,
 ):
     print("Role prompt:", grading_elements)
+    provider = provider or llm_registry.get("openai")
     try:
-        client = OpenAI(api_key=settings.openai_api_key)
         # Call OpenAI API
-        response = client.chat.completions.create(
-            model="gpt-4o",
+        result = await provider.chat_json(
             messages=[
                 {"role": "system", "content": role_prompt},
                 {"role": "user", "content": grading_elements},
                 {"role": "user", "content": output_strucutre},
                 {"role": "user", "content": instruction_prompt},
             ],
-            temperature=0.2,
-            max_tokens=3500,
-            top_p=0.5,
-            frequency_penalty=0,
-            presence_penalty=0,
+            schema=schema,
+            **sampling_params,
         )
 
         # Get the response text
-        result = response.choices[0].message.content
         print("Response from OpenAI:", result)
 
-        # Escape problematic quotes inside the JSON string
-        sanitized_result = result.replace("“", '"').replace("”", '"')
-
-        # Handle potential issues with French apostrophes by replacing them correctly
-        sanitized_result = (
-            sanitized_result.replace("“", '"').replace(
-                "”", '"').replace("'", "'")
-        )
-
-        sanitized_result = ensure_proper_json_format(sanitized_result)
-
-        print("Sanitized response:", sanitized_result)
-
-        # Attempt to find valid JSON in the response
-        result_json_match = re.search(r"\{.*\}", sanitized_result, re.DOTALL)
+        return result
 
-        if result_json_match:
-            result_json = result_json_match.group(0)
-            grading_result = json.loads(result_json)
-            return grading_result
-        else:
-            return {"error": "No valid JSON found in the response."}
-
-    except json.JSONDecodeError as e:
+    except ValueError as e:
         print("Error decoding JSON response:", e)
-        return {"error": "Invalid JSON response"}
+        return {"error": str(e)}
 
     except Exception as e:
         print("An error occurred:", e)
@@ -0,0 +1,145 @@
+import json
+import logging
+from typing import AsyncIterator, Optional
+from sqlalchemy.orm import Session
+from core.config import settings
+from db.executor import db_executor
+from db.session import SessionLocal
+from models.operation_models import Assignment
+from crud.grading_crud import process_and_store_llm_output
+from crud.grading_job_crud import (
+    claim_grading_job,
+    complete_grading_job,
+    fail_grading_job,
+    is_grading_job_running,
+    release_grading_job,
+)
+from schemas.grading import AssessmentData, GradingOutput
+from services.grading_cache import grading_cache
+from services.grading_data import assemble_grading_data
+from services.grading_worker import grading_pool
+from services.json_extractor import StreamingJSONExtractor, validate_llm_json
+from services.llm_registry import llm_registry
+from api.routes.grading_route import (
+    build_grading_prompts,
+    grading_cache_key,
+    grading_messages,
+    grading_params,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def sse_event(event: str, data) -> str:
+    """Formats a Server-Sent Event carrying a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def course_llm_provider(db: Session, assignment_id: int) -> Optional[str]:
+    # Provider selected for the course of the assignment, if any
+    assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
+    return assignment.course.llm_provider if assignment else None
+
+
+async def stream_grading(assignment_id: int, student_id: int) -> AsyncIterator[str]:
+    """
+    Grades a submission and streams the generated text as Server-Sent Events.
+
+    Events:
+        start: {"job_id", "provider"}, sent before calling the LLM.
+        delta: {"text"}, a piece of the text generated by the LLM.
+        advice: {"advice"}, as soon as the global advice is complete.
+        question: {"question", "note", "commentaires"}, as soon as the
+            grading of a question is complete.
+        grading: The parsed grading, sent once it is stored in the database.
+        error: {"detail"}, sent if the grading failed.
+
+    The pending grading job of the submission, if any, is taken over so that
+    the workers do not grade the copy a second time. It is handed back to
+    them if the client disconnects before the end of the stream. If a worker
+    is already grading the copy, an "error" event is sent instead: the LLM is
+    not called twice for the same copy.
+    """
+    # The request session is closed before the end of a streamed response
+    db = SessionLocal()
+    job = None
+    try:
+        llm_provider = llm_registry.get(
+            await db_executor.run(course_llm_provider, db, assignment_id)
+        )
+
+        grading_data = await assemble_grading_data(
+            db, assignment_id=assignment_id, student_id=student_id
+        )
+        prompts = build_grading_prompts(AssessmentData(**grading_data))
+
+        job = await db_executor.run(claim_grading_job, db, assignment_id, student_id)
+        if job is None and await db_executor.run(
+            is_grading_job_running, db, assignment_id, student_id
+        ):
+            yield sse_event("error", {"detail": "This copy is already being graded"})
+            return
+        yield sse_event(
+            "start",
+            {"job_id": job.id if job else None, "provider": llm_provider.name},
+        )
+
+        grading = await grading_cache.get(grading_cache_key(llm_provider, prompts))
+        if grading is None:
+            extractor = StreamingJSONExtractor()
+            chunks, answered_by = await llm_provider.open_stream(
+                grading_messages(prompts), grading_params, schema=GradingOutput
+            )
+            try:
+                async for chunk in chunks:
+                    yield sse_event("delta", {"text": chunk})
+                    for path, value in extractor.feed(chunk):
+                        if path == ("advice",):
+                            yield sse_event("advice", {"advice": value})
+                        elif len(path) == 2 and isinstance(value, dict):
+                            yield sse_event("question", {"question": path[1], **value})
+            finally:
+                await chunks.aclose()
+
+            grading = validate_llm_json(extractor.result(), GradingOutput)
+            # After a failover, the grading is the fallback's: cached under its key
+            await grading_cache.set(
+                grading_cache_key(answered_by, prompts),
+                answered_by.name,
+                answered_by.model,
+                grading,
+            )
+
+        await db_executor.run(
+            process_and_store_llm_output,
+            db=db,
+            llm_output=grading,
+            assignment_id=assignment_id,
+            student_id=student_id,
+        )
+        if job:
+            await db_executor.run(complete_grading_job, db, job)
+        yield sse_event("grading", grading)
+
+    except Exception as e:
+        logger.error(f"Streamed grading of assignment {assignment_id} failed: {e}")
+        await db_executor.run(db.rollback)
+        if job:
+            # Retried by the workers once its delay has elapsed
+            await db_executor.run(
+                fail_grading_job,
+                db,
+                job,
+                str(e),
+                settings.GRADING_MAX_ATTEMPTS,
+                settings.GRADING_RETRY_DELAY,
+            )
+        yield sse_event("error", {"detail": str(e)})
+
+    finally:
+        if job is not None and job.status == "running":
+            # Not through db_executor: the stream may be cancelled, the job must
+            # not stay "running" until its lease expires
+            release_grading_job(db, job)
+            grading_pool.notify()
+        db.close()
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import time
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from core.config import settings
+from db.session import SessionLocal
+from models.operation_models import Assignment
+from crud.grading_crud import process_and_store_llm_output
+from crud.grading_job_crud import (
+    claim_next_grading_job,
+    complete_grading_job,
+    fail_grading_job,
+    requeue_stale_grading_jobs,
+)
+from schemas.grading import AssessmentData
+from services.grading_data import (
+    assemble_grading_data,
+    assemble_question_grading_data,
+)
+from services.question_grading import grade_questions_concurrently
+from api.routes.grading_route import get_grading_endpoint
+
+logger = logging.getLogger(__name__)
+
+
+async def grade_submission(db: Session, assignment_id: int, student_id: int):
+    """
+    Grades the responses of a student for an assignment and stores the result.
+
+    Args:
+        db (Session): Database session.
+        assignment_id (int): Assignment ID.
+        student_id (int): Student ID.
+
+    Raises:
+        ValueError: If the LLM did not return a usable grading.
+    """
+    # Grade with the provider selected for the course, if any
+    assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
+    provider = assignment.course.llm_provider if assignment else None
+
+    if settings.GRADING_PER_QUESTION:
+        questions = await assemble_question_grading_data(
+            db, assignment_id=assignment_id, student_id=student_id
+        )
+        grading = await grade_questions_concurrently(questions, provider=provider)
+    else:
+        grading_data = await assemble_grading_data(
+            db, assignment_id=assignment_id, student_id=student_id
+        )
+
+        assessment_data = AssessmentData(
+            teacher_corrected_assessment=grading_data["teacher_corrected_assessment"],
+            grading_criteria=grading_data["grading_criteria"],
+            student_responses=grading_data["student_responses"],
+        )
+        grading = await get_grading_endpoint(assessment_data, provider=provider)
+
+    if not isinstance(grading, dict) or "error" in grading:
+        raise ValueError(f"Invalid grading from the LLM: {grading}")
+
+    process_and_store_llm_output(
+        db=db,
+        llm_output=grading,
+        assignment_id=assignment_id,
+        student_id=student_id,
+    )
+
+
+class GradingWorkerPool:
+    """
+    Pool of background workers consuming the grading_job table.
+
+    Workers sleep until a new job is announced with `notify` or the poll
+    interval elapses, so jobs enqueued by another process are picked up too.
+
+    A claimed job is leased for `lease_timeout` seconds: jobs still "running"
+    after their lease, whose process stopped, are requeued at startup and
+    then by the idle workers, at most once per lease.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        poll_interval: float,
+        max_attempts: int,
+        retry_delay: float,
+        lease_timeout: float,
+    ):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.lease_timeout = lease_timeout
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._next_requeue = 0.0
+
+    def start(self):
+        if self._tasks:
+            return
+
+        db = SessionLocal()
+        try:
+            self._requeue_stale_jobs(db)
+        finally:
+            db.close()
+
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker(n)) for n in range(self.workers)
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _requeue_stale_jobs(self, db: Session):
+        now = time.monotonic()
+        if now < self._next_requeue:
+            return
+        self._next_requeue = now + self.lease_timeout
+        requeued = requeue_stale_grading_jobs(db, self.lease_timeout)
+        if requeued:
+            logger.info(f"Requeued {requeued} interrupted grading job(s)")
+
+    async def _wait_for_jobs(self):
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def _worker(self, worker_number: int):
+        while True:
+            db = SessionLocal()
+            try:
+                job = claim_next_grading_job(db)
+                if job is None:
+                    self._requeue_stale_jobs(db)
+                    db.close()
+                    await self._wait_for_jobs()
+                    continue
+
+                try:
+                    await grade_submission(db, job.assignment_id, job.student_id)
+                    complete_grading_job(db, job)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(
+                        f"Worker {worker_number} failed grading job {job.id}: {e}"
+                    )
+                    db.rollback()
+                    fail_grading_job(
+                        db, job, str(e), self.max_attempts, self.retry_delay
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Worker {worker_number} error: {e}")
+                await asyncio.sleep(self.poll_interval)
+            finally:
+                db.close()
+
+
+grading_pool = GradingWorkerPool(
+    workers=settings.GRADING_WORKERS,
+    poll_interval=settings.GRADING_POLL_INTERVAL,
+    max_attempts=settings.GRADING_MAX_ATTEMPTS,
+    retry_delay=settings.GRADING_RETRY_DELAY,
+    lease_timeout=settings.GRADING_LEASE_TIMEOUT,
+)
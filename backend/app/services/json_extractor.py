@@ -0,0 +1,296 @@
+import json
+import re
+from typing import Any, List, Optional, Tuple, Type
+from pydantic import BaseModel, ValidationError
+
+# Quotes that LLMs sometimes use instead of '"' around keys and strings
+OPENING_QUOTES = "“"
+CLOSING_QUOTES = "”"
+
+# Runs of string characters that can be copied without inspection
+_STRING_RUN = re.compile(r'[^"\\]+')
+_CURLY_STRING_RUN = re.compile(r'[^"”\\]+')
+
+
+class _Frame:
+    """An object or array being parsed."""
+
+    def __init__(self, kind: str, path: tuple, start: int):
+        self.kind = kind
+        self.path = path
+        self.start = start
+        self.key: Optional[str] = None
+        self.index = 0
+        self.expecting_key = kind == "object"
+        # Start of the current member value, and end of the last complete one
+        self.value_start: Optional[int] = None
+        self.last_boundary = start + 1
+
+    def child_path(self) -> tuple:
+        if self.kind == "object":
+            return self.path + (self.key,)
+        return self.path + (self.index,)
+
+
+class StreamingJSONExtractor:
+    """
+    Extracts the first JSON object or array of an LLM answer, chunk by chunk.
+
+    Text before the JSON (prose, code fences) and after it is ignored, curly
+    quotes used as JSON quotes are normalized, and a truncated answer is
+    repaired by closing its open strings, arrays and objects.
+
+    Every chunk is scanned once. `feed` returns the members completed by the
+    chunk, up to `max_depth` levels deep, as (path, value) pairs, e.g.
+    (("advice",), "...") or (("grading", "1"), {"note": 2, ...}), so that
+    they can be used before the end of the answer.
+
+    Example:
+        extractor = StreamingJSONExtractor()
+        async for chunk in provider.stream(messages):
+            for path, value in extractor.feed(chunk):
+                ...
+        result = extractor.result()
+    """
+
+    def __init__(self, max_depth: int = 2):
+        self.max_depth = max_depth
+        self._raw = ""
+        self._position = 0
+        self._buffer: List[str] = []
+        self._size = 0
+        self._stack: List[_Frame] = []
+        self._started = False
+        self._done = False
+        self._value: Any = None
+        self._in_string = False
+        self._string_quote = '"'
+        self._string_start = 0
+        self._escaped = False
+        self._final = False
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    def _write(self, text: str):
+        self._buffer.append(text)
+        self._size += len(text)
+
+    def _text(self, start: int = 0, end: Optional[int] = None) -> str:
+        # Join the pieces written so far once, then keep a single piece
+        if len(self._buffer) > 1:
+            self._buffer = ["".join(self._buffer)]
+        return self._buffer[0][start:end] if self._buffer else ""
+
+    def _loads(self, text: str) -> Any:
+        return json.loads(text, strict=False)
+
+    def feed(self, chunk: str) -> List[Tuple[tuple, Any]]:
+        """
+        Scans a new chunk of the answer.
+
+        Returns:
+            List[Tuple[tuple, Any]]: Members completed by this chunk.
+        """
+        self._raw += chunk
+        completed = []
+        raw = self._raw
+
+        while self._position < len(raw) and not self._done:
+            char = raw[self._position]
+
+            if not self._started:
+                if char in "{[":
+                    self._started = True
+                    self._open(char)
+                self._position += 1
+                continue
+
+            if self._in_string:
+                run = self._string_run(raw)
+                if run:
+                    self._write(run)
+                    self._position += len(run)
+                    continue
+                if not self._scan_string_char(raw, char):
+                    # A quote needs the next character to be interpreted
+                    break
+                self._position += 1
+                continue
+
+            frame = self._stack[-1]
+            if char in '"' + OPENING_QUOTES + CLOSING_QUOTES:
+                self._begin_value(frame)
+                self._in_string = True
+                self._string_quote = '"' if char == '"' else CLOSING_QUOTES
+                self._string_start = self._size
+                self._write('"')
+            elif char in "{[":
+                self._begin_value(frame)
+                self._open(char)
+            elif char in "}]":
+                self._end_member(frame, completed)
+                self._write(char)
+                self._close(completed)
+            elif char == ",":
+                self._end_member(frame, completed)
+                self._write(char)
+                frame.last_boundary = self._size
+                if frame.kind == "object":
+                    frame.expecting_key = True
+                else:
+                    frame.index += 1
+            elif char == ":":
+                self._write(char)
+            elif char.isspace():
+                self._write(char)
+            else:
+                # Number, true, false or null
+                self._begin_value(frame)
+                self._write(char)
+            self._position += 1
+
+        # Keep the part of the answer that has not been scanned yet, and the
+        # last scanned character
+        keep = max(self._position - 1, 0)
+        self._raw = raw[keep:]
+        self._position -= keep
+        return completed
+
+    def _string_run(self, raw: str) -> str:
+        if self._escaped:
+            return ""
+        pattern = _CURLY_STRING_RUN if self._string_quote != '"' else _STRING_RUN
+        match = pattern.match(raw, self._position)
+        return match.group(0) if match else ""
+
+    def _scan_string_char(self, raw: str, char: str) -> bool:
+        if self._escaped:
+            self._escaped = False
+            self._write(char)
+            return True
+        if char == "\\":
+            self._escaped = True
+            self._write(char)
+            return True
+
+        if self._string_quote == CLOSING_QUOTES:
+            # String opened with a curly quote: a straight quote is content
+            if char == CLOSING_QUOTES:
+                self._end_string()
+            else:
+                self._write('\\"' if char == '"' else char)
+            return True
+
+        if char != '"':
+            self._write(char)
+            return True
+
+        # A quote between two letters (L"étudiant) is an apostrophe
+        previous = raw[self._position - 1] if self._position else ""
+        if previous.isalnum():
+            if self._position + 1 >= len(raw):
+                if not self._final:
+                    return False
+            elif raw[self._position + 1].isalnum():
+                self._write("'")
+                return True
+        self._end_string()
+        return True
+
+    def _end_string(self):
+        self._write('"')
+        self._in_string = False
+        frame = self._stack[-1]
+        if frame.kind == "object" and frame.expecting_key:
+            frame.key = self._loads(self._text(self._string_start))
+            frame.expecting_key = False
+            frame.value_start = None
+
+    def _begin_value(self, frame: _Frame):
+        if frame.kind == "object" and frame.expecting_key:
+            return
+        if frame.value_start is None:
+            frame.value_start = self._size
+
+    def _end_member(self, frame: _Frame, completed: list):
+        if frame.value_start is None:
+            return
+        path = frame.child_path()
+        if len(path) <= self.max_depth:
+            completed.append((path, self._loads(self._text(frame.value_start))))
+        frame.value_start = None
+
+    def _open(self, char: str):
+        path = self._stack[-1].child_path() if self._stack else ()
+        self._stack.append(
+            _Frame("object" if char == "{" else "array", path, self._size)
+        )
+        self._write(char)
+
+    def _close(self, completed: list):
+        self._stack.pop()
+        if not self._stack:
+            self._value = self._loads(self._text())
+            self._done = True
+
+    def result(self) -> Any:
+        """
+        Returns the extracted JSON value, repairing a truncated answer.
+
+        Raises:
+            ValueError: If the answer does not contain any JSON.
+        """
+        if not self._done:
+            self._final = True
+            self.feed("")
+        if self._done:
+            return self._value
+        if not self._started:
+            raise ValueError("No valid JSON found in the response.")
+
+        text = self._text()
+        if self._in_string:
+            text += '"'
+        try:
+            return self._loads(text + self._closers(self._stack))
+        except json.JSONDecodeError:
+            pass
+
+        # Drop the last, incomplete member and close what remains
+        frame = self._stack[-1]
+        text = self._text(0, frame.last_boundary).rstrip().rstrip(",")
+        try:
+            return self._loads(text + self._closers(self._stack))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON response: {e}")
+
+    @staticmethod
+    def _closers(stack: List[_Frame]) -> str:
+        return "".join("}" if f.kind == "object" else "]" for f in reversed(stack))
+
+
+def extract_json(text: str) -> Any:
+    """
+    Extracts the JSON object or array contained in a complete LLM answer.
+
+    Raises:
+        ValueError: If the answer does not contain any JSON.
+    """
+    extractor = StreamingJSONExtractor(max_depth=0)
+    extractor.feed(text)
+    return extractor.result()
+
+
+def validate_llm_json(data: Any, schema: Type[BaseModel]) -> dict:
+    """
+    Checks the shape of a JSON value returned by an LLM.
+
+    Raises:
+        ValueError: If the value does not match the schema.
+    """
+    try:
+        return schema.model_validate(data).model_dump()
+    except ValidationError as e:
+        raise ValueError(f"Unexpected LLM response structure: {e}")
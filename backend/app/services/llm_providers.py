@@ -0,0 +1,206 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Type
+from pydantic import BaseModel
+from openai import AsyncOpenAI, AsyncAzureOpenAI
+from together import AsyncTogether
+from azure.ai.inference.aio import ChatCompletionsClient
+from azure.core.credentials import AzureKeyCredential
+from services.json_extractor import extract_json, validate_llm_json
+
+
+class LLMProvider:
+    """
+    Common interface of the chat completion backends.
+
+    Every provider wraps the native async client of its SDK, so awaiting
+    `chat` never blocks the event loop while the model is generating.
+    """
+
+    name: str = "base"
+
+    def __init__(self, model: str):
+        self.model = model
+
+    async def chat(self, messages: List[Dict[str, str]], **params) -> str:
+        """
+        Sends the messages to the model and returns the generated text.
+
+        Args:
+            messages (List[Dict[str, str]]): Chat messages ({"role", "content"}).
+            **params: Sampling parameters (temperature, max_tokens, top_p, ...).
+
+        Returns:
+            str: The content of the first choice.
+        """
+        raise NotImplementedError
+
+    def json_params(self, schema: Type[BaseModel]) -> dict:
+        """
+        Request parameters asking the model for a JSON answer matching `schema`.
+
+        Providers without JSON mode return no parameters, their answers are
+        only checked locally.
+        """
+        return {}
+
+    async def chat_json(
+        self, messages: List[Dict[str, str]], schema: Type[BaseModel], **params
+    ) -> dict:
+        """
+        Same as `chat`, but returns the JSON answer validated against `schema`.
+
+        Raises:
+            ValueError: If the answer is not valid JSON or does not match.
+        """
+        text = await self.chat(messages, **self.json_params(schema), **params)
+        return validate_llm_json(extract_json(text), schema)
+
+    async def stream(
+        self, messages: List[Dict[str, str]], **params
+    ) -> AsyncIterator[str]:
+        """
+        Same as `chat`, but yields the generated text piece by piece.
+
+        Providers without streaming support yield the whole text at once.
+        """
+        yield await self.chat(messages, **params)
+
+    async def close(self):
+        pass
+
+
+class OpenAIProvider(LLMProvider):
+    name = "openai"
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4o",
+        base_url: Optional[str] = None,
+        http_client: Optional[Any] = None,
+        max_retries: int = 2,
+    ):
+        super().__init__(model)
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=http_client,
+            max_retries=max_retries,
+        )
+
+    async def chat(self, messages: List[Dict[str, str]], **params) -> str:
+        response = await self.client.chat.completions.create(
+            model=self.model, messages=messages, **params
+        )
+        return response.choices[0].message.content
+
+    def json_params(self, schema: Type[BaseModel]) -> dict:
+        return {
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": schema.__name__,
+                    "schema": schema.model_json_schema(),
+                },
+            }
+        }
+
+    async def stream(
+        self, messages: List[Dict[str, str]], **params
+    ) -> AsyncIterator[str]:
+        response = await self.client.chat.completions.create(
+            model=self.model, messages=messages, stream=True, **params
+        )
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def close(self):
+        await self.client.close()
+
+
+class AzureOpenAIProvider(OpenAIProvider):
+    name = "azure_openai"
+
+    def __init__(
+        self,
+        api_key: str,
+        endpoint: str,
+        deployment_name: str,
+        api_version: str = "2024-05-01-preview",
+        http_client: Optional[Any] = None,
+        max_retries: int = 2,
+    ):
+        LLMProvider.__init__(self, deployment_name)
+        self.client = AsyncAzureOpenAI(
+            api_key=api_key,
+            azure_endpoint=endpoint,
+            api_version=api_version,
+            http_client=http_client,
+            max_retries=max_retries,
+        )
+
+    def json_params(self, schema: Type[BaseModel]) -> dict:
+        # Structured outputs need a newer API version than the one in use
+        return {"response_format": {"type": "json_object"}}
+
+
+class TogetherProvider(OpenAIProvider):
+    name = "together"
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "meta-llama/Meta-Llama-3-70B-Instruct-Lite",
+        http_client: Optional[Any] = None,
+        max_retries: int = 2,
+    ):
+        LLMProvider.__init__(self, model)
+        self.client = AsyncTogether(
+            api_key=api_key, http_client=http_client, max_retries=max_retries
+        )
+
+
+class GitHubModelsProvider(LLMProvider):
+    """
+    GitHub Models, through the Azure AI inference SDK.
+
+    JSON mode is not requested: most of the models served there (Llama
+    included) reject the `response_format` parameter.
+    """
+
+    name = "github"
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "Meta-Llama-3-8B-Instruct",
+        endpoint: str = "https://models.inference.ai.azure.com",
+        transport: Optional[Any] = None,
+        max_retries: int = 3,
+    ):
+        super().__init__(model)
+        self.client = ChatCompletionsClient(
+            endpoint=endpoint,
+            credential=AzureKeyCredential(api_key),
+            transport=transport,
+            retry_total=max_retries,
+        )
+
+    async def chat(self, messages: List[Dict[str, str]], **params) -> str:
+        response = await self.client.complete(
+            messages=messages, model=self.model, **params
+        )
+        return response["choices"][0]["message"]["content"]
+
+    async def stream(
+        self, messages: List[Dict[str, str]], **params
+    ) -> AsyncIterator[str]:
+        response = await self.client.complete(
+            messages=messages, model=self.model, stream=True, **params
+        )
+        async for update in response:
+            if update.choices and update.choices[0].delta.content:
+                yield update.choices[0].delta.content
+
+    async def close(self):
+        await self.client.close()
@@ -0,0 +1,161 @@
+import logging
+from typing import Dict, List, Optional
+import aiohttp
+import httpx
+import openai
+import together
+from azure.core.pipeline.transport import AioHttpTransport
+from core.config import Settings, settings
+from services.llm_providers import (
+    LLMProvider,
+    OpenAIProvider,
+    AzureOpenAIProvider,
+    TogetherProvider,
+    GitHubModelsProvider,
+)
+from services.llm_resilience import CircuitBreaker, ResilientProvider
+
+logger = logging.getLogger(__name__)
+
+
+class LLMRegistry:
+    """
+    Long-lived LLM providers, built once at application startup.
+
+    Each provider owns a keep-alive connection pool sized from the settings,
+    so grading calls reuse open TLS connections instead of opening a new
+    client for every request. Only providers with an API key are registered.
+
+    Providers are wrapped in a `ResilientProvider` (deadline, retries and
+    circuit breaker), failing over to LLM_FALLBACK_PROVIDER when configured.
+    The SDK retries are disabled so that retries are only made here.
+    """
+
+    def __init__(self, config: Settings):
+        self.config = config
+        self._providers: Dict[str, LLMProvider] = {}
+        self._sessions: List[aiohttp.ClientSession] = []
+
+    def _httpx_options(self) -> dict:
+        return {
+            "limits": httpx.Limits(
+                max_connections=self.config.LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=self.config.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=self.config.LLM_KEEPALIVE_EXPIRY,
+            ),
+            "timeout": httpx.Timeout(self.config.LLM_TIMEOUT),
+        }
+
+    def _aiohttp_transport(self) -> AioHttpTransport:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=self.config.LLM_MAX_CONNECTIONS,
+                keepalive_timeout=self.config.LLM_KEEPALIVE_EXPIRY,
+            ),
+            timeout=aiohttp.ClientTimeout(total=self.config.LLM_TIMEOUT),
+        )
+        self._sessions.append(session)
+        return AioHttpTransport(session=session, session_owner=False)
+
+    def register(self, provider: LLMProvider):
+        self._providers[provider.name] = ResilientProvider(
+            provider,
+            timeout=self.config.LLM_CALL_TIMEOUT,
+            max_retries=self.config.LLM_MAX_RETRIES,
+            backoff_base=self.config.LLM_BACKOFF_BASE,
+            backoff_max=self.config.LLM_BACKOFF_MAX,
+            breaker=CircuitBreaker(
+                failure_threshold=self.config.LLM_BREAKER_THRESHOLD,
+                reset_timeout=self.config.LLM_BREAKER_RESET,
+            ),
+            json_mode=self.config.LLM_JSON_MODE,
+        )
+        self._link_fallbacks()
+
+    def _link_fallbacks(self):
+        fallback = self._providers.get(self.config.LLM_FALLBACK_PROVIDER)
+        for provider in self._providers.values():
+            provider.fallback = fallback if provider is not fallback else None
+
+    async def startup(self):
+        config = self.config
+
+        if config.openai_api_key:
+            self.register(
+                OpenAIProvider(
+                    api_key=config.openai_api_key,
+                    model=config.OPENAI_MODEL,
+                    http_client=openai.DefaultAsyncHttpxClient(
+                        **self._httpx_options()
+                    ),
+                    max_retries=0,
+                )
+            )
+
+        if config.azure_openai_api_key and config.azure_openai_endpoint:
+            self.register(
+                AzureOpenAIProvider(
+                    api_key=config.azure_openai_api_key,
+                    endpoint=config.azure_openai_endpoint,
+                    deployment_name=config.azure_openai_deployment_name,
+                    http_client=openai.DefaultAsyncHttpxClient(
+                        **self._httpx_options()
+                    ),
+                    max_retries=0,
+                )
+            )
+
+        if config.together_api_key:
+            self.register(
+                TogetherProvider(
+                    api_key=config.together_api_key,
+                    model=config.TOGETHER_MODEL,
+                    http_client=together.DefaultAsyncHttpxClient(
+                        **self._httpx_options()
+                    ),
+                    max_retries=0,
+                )
+            )
+
+        if config.github_api_key:
+            self.register(
+                GitHubModelsProvider(
+                    api_key=config.github_api_key,
+                    model=config.GITHUB_MODEL,
+                    endpoint=config.GITHUB_MODELS_ENDPOINT,
+                    transport=self._aiohttp_transport(),
+                    max_retries=0,
+                )
+            )
+
+        logger.info(f"LLM providers available: {', '.join(self.names()) or 'none'}")
+
+    async def close(self):
+        for provider in self._providers.values():
+            await provider.close()
+        for session in self._sessions:
+            await session.close()
+        self._providers = {}
+        self._sessions = []
+
+    def names(self) -> List[str]:
+        return list(self._providers)
+
+    def get(self, name: Optional[str] = None) -> LLMProvider:
+        """
+        Returns the provider registered under `name` (default provider if None).
+
+        Raises:
+            ValueError: If the provider is unknown or has no API key configured.
+        """
+        name = name or self.config.LLM_DEFAULT_PROVIDER
+        provider = self._providers.get(name)
+        if provider is None:
+            raise ValueError(
+                f"LLM provider '{name}' is not configured. "
+                f"Available providers: {', '.join(self.names()) or 'none'}"
+            )
+        return provider
+
+
+llm_registry = LLMRegistry(settings)
@@ -0,0 +1,302 @@
+import asyncio
+import logging
+import random
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+)
+from pydantic import BaseModel
+from services.llm_providers import LLMProvider
+from services.json_extractor import extract_json, validate_llm_json
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised when a provider is skipped because its circuit breaker is open."""
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Tells whether a failed LLM call is worth retrying.
+
+    Timeouts, connection errors, rate limits (429) and server errors (5xx)
+    are transient; other errors (bad request, authentication) are not.
+    """
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    if status_code is not None:
+        return status_code == 429 or status_code >= 500
+
+    # SDK network errors carry no status code
+    return type(error).__name__ in (
+        "APIConnectionError",
+        "APITimeoutError",
+        "ServiceRequestError",
+        "ServiceResponseError",
+    )
+
+
+class CircuitBreaker:
+    """
+    Stops calling a provider after `failure_threshold` consecutive failures.
+
+    Once open, calls fail fast for `reset_timeout` seconds, then a single
+    trial call is let through (half-open): its success closes the circuit,
+    its failure opens it again. The other calls keep failing fast while the
+    trial is in flight, unless it reports nothing within `reset_timeout`
+    (cancelled, or failed with a non-retryable error).
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_started_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state != "half_open":
+            return state == "closed"
+
+        now = time.monotonic()
+        if (
+            self.trial_started_at is not None
+            and now - self.trial_started_at < self.reset_timeout
+        ):
+            return False
+        self.trial_started_at = now
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_started_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_started_at = None
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class ResilientProvider(LLMProvider):
+    """
+    Wraps a provider with a per-call deadline, retries and a circuit breaker.
+
+    Transient errors are retried with exponential backoff and full jitter.
+    When the retries are exhausted, or the circuit is open, the call fails
+    over to the `fallback` provider if one is configured. Streams are only
+    retried until their first chunk arrives.
+
+    `answer_json` and `open_stream` tell which provider answered, and take
+    the sampling parameters of each provider they call: the answer of the
+    fallback is then not mistaken for one of the selected provider.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        timeout: float,
+        max_retries: int,
+        backoff_base: float,
+        backoff_max: float,
+        breaker: CircuitBreaker,
+        fallback: Optional["ResilientProvider"] = None,
+        json_mode: bool = True,
+    ):
+        super().__init__(provider.model)
+        self.name = provider.name
+        self.provider = provider
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker
+        self.fallback = fallback
+        self.json_mode = json_mode
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    async def _with_retries(self, attempt_call: Callable[[], Awaitable]):
+        attempt = 0
+        while True:
+            if not self.breaker.allow_request():
+                raise CircuitOpenError(f"LLM provider '{self.name}' is unavailable")
+
+            try:
+                result = await attempt_call()
+            except Exception as e:
+                retryable = is_retryable(e)
+                if retryable:
+                    self.breaker.record_failure()
+                if not retryable or attempt >= self.max_retries:
+                    raise
+
+                delay = self._backoff(attempt)
+                attempt += 1
+                logger.warning(
+                    f"LLM provider '{self.name}' failed ({type(e).__name__}), "
+                    f"retry {attempt}/{self.max_retries} in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            return result
+
+    async def _call(self, messages: List[Dict[str, str]], **params) -> str:
+        return await self._with_retries(
+            lambda: asyncio.wait_for(
+                self.provider.chat(messages, **params), timeout=self.timeout
+            )
+        )
+
+    async def _open_stream(
+        self, messages: List[Dict[str, str]], **params
+    ) -> Tuple[AsyncIterator[str], Optional[str]]:
+        # The deadline and the retries only cover the wait for the first chunk:
+        # once text has been sent to the client, the stream cannot be replayed
+        async def first_chunk():
+            stream = self.provider.stream(messages, **params)
+            try:
+                return stream, await asyncio.wait_for(
+                    anext(stream), timeout=self.timeout
+                )
+            except StopAsyncIteration:
+                return stream, None
+            except BaseException:
+                await stream.aclose()
+                raise
+
+        return await self._with_retries(first_chunk)
+
+    async def _with_failover(
+        self, call: Callable[["ResilientProvider"], Awaitable]
+    ) -> Tuple[Any, "ResilientProvider"]:
+        # Returns the result and the provider that answered
+        try:
+            return await call(self), self
+        except Exception as e:
+            if not self._should_fail_over(e):
+                raise
+            logger.warning(
+                f"LLM provider '{self.name}' failed, falling back to "
+                f"'{self.fallback.name}'"
+            )
+            return await call(self.fallback), self.fallback
+
+    def json_params(self, schema: Type[BaseModel]) -> dict:
+        return self.provider.json_params(schema) if self.json_mode else {}
+
+    async def chat(self, messages: List[Dict[str, str]], **params) -> str:
+        text, _ = await self._with_failover(
+            lambda provider: provider._call(messages, **params)
+        )
+        return text
+
+    async def chat_json(
+        self, messages: List[Dict[str, str]], schema: Type[BaseModel], **params
+    ) -> dict:
+        answer, _ = await self.answer_json(messages, schema, lambda provider: params)
+        return answer
+
+    async def answer_json(
+        self,
+        messages: List[Dict[str, str]],
+        schema: Type[BaseModel],
+        params: Callable[[LLMProvider], dict],
+    ) -> Tuple[dict, "ResilientProvider"]:
+        """
+        Same as `chat_json`, with the sampling parameters `params(provider)` of
+        the provider called, which is returned with the answer: after a
+        failover, the answer comes from the fallback.
+        """
+        # The JSON mode parameters depend on the provider that answers
+        text, provider = await self._with_failover(
+            lambda provider: provider._call(
+                messages, **provider.json_params(schema), **params(provider)
+            )
+        )
+        return validate_llm_json(extract_json(text), schema), provider
+
+    async def open_stream(
+        self,
+        messages: List[Dict[str, str]],
+        params: Callable[[LLMProvider], dict],
+        schema: Optional[Type[BaseModel]] = None,
+    ) -> Tuple[AsyncIterator[str], "ResilientProvider"]:
+        """
+        Same as `stream`, with the sampling parameters `params(provider)` of the
+        provider called. Returns once the first chunk has arrived, with the
+        provider that sends the stream.
+        """
+        (stream, chunk), provider = await self._with_failover(
+            lambda provider: provider._open_stream(
+                messages,
+                **(provider.json_params(schema) if schema else {}),
+                **params(provider),
+            )
+        )
+        return provider._read_stream(stream, chunk), provider
+
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        schema: Optional[Type[BaseModel]] = None,
+        **params,
+    ) -> AsyncIterator[str]:
+        """
+        Streams the answer, in JSON mode when a `schema` is given.
+
+        The streamed text is not validated, see `StreamingJSONExtractor`.
+        """
+        chunks, _ = await self.open_stream(messages, lambda provider: params, schema)
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
+
+    async def _read_stream(
+        self, stream: AsyncIterator[str], chunk: Optional[str]
+    ) -> AsyncIterator[str]:
+        try:
+            while chunk is not None:
+                yield chunk
+                try:
+                    chunk = await asyncio.wait_for(anext(stream), timeout=self.timeout)
+                except StopAsyncIteration:
+                    chunk = None
+        finally:
+            await stream.aclose()
+
+    def _should_fail_over(self, error: Exception) -> bool:
+        return self.fallback is not None and (
+            isinstance(error, CircuitOpenError) or is_retryable(error)
+        )
+
+    async def close(self):
+        await self.provider.close()
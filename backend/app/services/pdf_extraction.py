@@ -0,0 +1,130 @@
+import asyncio
+import mmap
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+from PyPDF2 import PdfReader
+from core.config import settings
+
+
+class PdfExtractionError(Exception):
+    """A PDF whose text cannot be extracted."""
+
+
+# Run in the worker processes: module-level so that they can be pickled
+def _extract_pages(path: str, start: int, stop: Optional[int] = None) -> List[str]:
+    """Returns the text of the pages [start, stop) of the PDF at `path`."""
+    with open(path, "rb") as pdf_file:
+        # Mapped rather than read: every process shares the page cache
+        with mmap.mmap(pdf_file.fileno(), 0, access=mmap.ACCESS_READ) as pdf:
+            pages = PdfReader(pdf).pages
+            return [
+                pages[number].extract_text() or ""
+                for number in range(start, len(pages) if stop is None else stop)
+            ]
+
+
+def _count_pages(path: str) -> int:
+    with open(path, "rb") as pdf_file:
+        with mmap.mmap(pdf_file.fileno(), 0, access=mmap.ACCESS_READ) as pdf:
+            return len(PdfReader(pdf).pages)
+
+
+def join_pages(page_texts: List[str]) -> Tuple[str, List[int]]:
+    """
+    Joins the texts of the pages, one page per line break.
+
+    Returns:
+        Tuple[str, List[int]]: The text, and the offset in it of the first
+        character of every page.
+    """
+    offsets = []
+    offset = 0
+    for text in page_texts:
+        offsets.append(offset)
+        offset += len(text) + 1
+    return "\n".join(page_texts), offsets
+
+
+class PdfTextExtractor:
+    """
+    Extracts the text of PDFs, split by page ranges over a pool of worker
+    processes for the large ones.
+
+    Text extraction is CPU bound and holds the GIL: in a thread it only moves
+    the work off the event loop, while the processes of the pool use the
+    other cores. The PDF is read from a file, mapped in memory by each
+    process, so that it is neither copied between the processes nor loaded
+    at once. PDFs under `min_parallel_pages` pages are extracted in a thread,
+    where starting the processes would cost more than it saves.
+
+    Example:
+        text, page_offsets = await pdf_extractor.extract(path)
+    """
+
+    def __init__(self, workers: Optional[int] = None, min_parallel_pages: int = 50):
+        self.workers = workers or os.cpu_count() or 1
+        self.min_parallel_pages = min_parallel_pages
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Forking a process running threads is unsafe: start the
+                # workers from a fresh interpreter
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    async def extract(self, path: str) -> Tuple[str, List[int]]:
+        """
+        Extracts the text of the PDF at `path`.
+
+        Returns:
+            Tuple[str, List[int]]: The text, and the offset of every page in it.
+
+        Raises:
+            PdfExtractionError: If the file is not a readable PDF.
+        """
+        try:
+            pages = await asyncio.to_thread(_count_pages, path)
+            if self.workers == 1 or pages < self.min_parallel_pages:
+                page_texts = await asyncio.to_thread(_extract_pages, path, 0)
+            else:
+                page_texts = await self._extract_in_parallel(path, pages)
+        except Exception as e:
+            raise PdfExtractionError(f"Error extracting text from PDF: {str(e)}")
+        return join_pages(page_texts)
+
+    async def _extract_in_parallel(self, path: str, pages: int) -> List[str]:
+        # One contiguous range per process: each range parses the PDF again
+        size = -(-pages // self.workers)
+        executor = self.start()
+        ranges = await asyncio.gather(
+            *(
+                asyncio.wrap_future(
+                    executor.submit(
+                        _extract_pages, path, start, min(start + size, pages)
+                    )
+                )
+                for start in range(0, pages, size)
+            )
+        )
+        return [text for page_texts in ranges for text in page_texts]
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+pdf_extractor = PdfTextExtractor(
+    workers=settings.PDF_EXTRACTION_WORKERS,
+    min_parallel_pages=settings.PDF_PARALLEL_MIN_PAGES,
+)
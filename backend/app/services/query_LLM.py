@@ -1,51 +1,49 @@
-from typing import Any, Optional
+from typing import Any, Optional, Type
 from fastapi import HTTPException
+from pydantic import BaseModel
 from core.config import settings
-from openai import OpenAI
-import json
+from services.llm_registry import llm_registry
+from services.json_extractor import extract_json
 
 
-async def call_llm(prompt: str) -> str:
+async def call_llm(prompt: str, schema: Optional[Type[BaseModel]] = None) -> Any:
     """
-    Sends a prompt to the LLM and returns the response.
+    Sends a prompt to the LLM and returns the JSON response.
 
     Args:
         prompt (str): The input prompt for the LLM.
+        schema (Type[BaseModel], optional): Expected structure of the response.
+            The provider is asked for a JSON answer matching it (JSON mode),
+            and the answer is validated against it.
 
     Returns:
-        str: The LLM's response.
+        Any: The parsed response (validated dict when a schema is given).
 
     Raises:
         HTTPException: If there's an issue with the LLM call.
     """
     try:
-        client = OpenAI(api_key=settings.openai_api_key)
+        provider = llm_registry.get(settings.LLM_QUERY_PROVIDER)
 
-        # Make the API call with default parameters
-        response = client.chat.completions.create(
-            model="gpt-4o",  # Replace with your desired model
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,  # Default value for creative but focused output
-            max_tokens=1000,  # Adjust based on your typical response length
-            top_p=1,
-            frequency_penalty=0,
-            presence_penalty=0,
-        )
+        messages = [{"role": "user", "content": prompt}]
+        sampling_params = {
+            "temperature": 0.7,  # Default value for creative but focused output
+            "max_tokens": 1000,  # Adjust based on your typical response length
+            "top_p": 1,
+            "frequency_penalty": 0,
+            "presence_penalty": 0,
+        }
 
-        # Extract the content from the response
-        llm_content = response.choices[0].message.content
+        if schema is not None:
+            return await provider.chat_json(messages, schema, **sampling_params)
 
-        # Clean up the response (remove markdown formatting)
-        cleaned_content = llm_content.strip("```").strip()
-        if cleaned_content.startswith("json"):
-            cleaned_content = cleaned_content[len("json") :].strip()
-
-        # Parse the cleaned content as JSON
-        parsed_response = json.loads(cleaned_content)
+        # Make the API call with default parameters
+        llm_content = await provider.chat(messages, **sampling_params)
 
-        return parsed_response
+        # Extract the JSON from the response (prose, code fences)
+        return extract_json(llm_content)
 
-    except json.JSONDecodeError as e:
+    except ValueError as e:
         raise HTTPException(
             status_code=500, detail=f"Error parsing LLM response: {str(e)}"
         )
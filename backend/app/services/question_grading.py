@@ -0,0 +1,123 @@
+import asyncio
+from typing import List, Optional
+from core.config import settings
+from schemas.grading import GradingAdvice
+from services.llm_registry import llm_registry
+from api.routes.grading_route import (
+    get_grading_endpoint,
+    grading_messages,
+    grading_params,
+)
+
+
+async def grade_question(
+    question: dict, semaphore: asyncio.Semaphore, provider: Optional[str] = None
+) -> dict:
+    """
+    Grades a single question and returns its {"note", "commentaires"} entry.
+
+    Raises:
+        ValueError: If the LLM did not return a grading for the question.
+    """
+    async with semaphore:
+        result = await get_grading_endpoint(question["assessment"], provider=provider)
+
+    grading = result.get("grading") if isinstance(result, dict) else None
+    if not isinstance(grading, dict) or not grading:
+        raise ValueError(
+            f"Invalid grading from the LLM for question {question['question_id']}: {result}"
+        )
+
+    # The question is numbered 1 in its prompt, only one entry is expected
+    grade = next(iter(grading.values()))
+    return {
+        "note": grade.get("note"),
+        "commentaires": grade.get("commentaires"),
+        "advice": result.get("advice", ""),
+    }
+
+
+async def get_global_advice(gradings: dict, provider: Optional[str] = None) -> str:
+    """
+    Summarizes the per-question comments into the global advice of the copy.
+
+    Falls back on the concatenated per-question advice if the LLM call fails.
+    """
+    fallback_advice = " ".join(g["advice"] for g in gradings.values() if g["advice"])
+
+    llm_provider = llm_registry.get(provider)
+
+    comments = "\n".join(
+        f"Question {i + 1} ({g['note']} points): {g['commentaires']}"
+        for i, g in enumerate(gradings.values())
+    )
+    role_prompt = """
+        >>>>>>> ROLE_PROMPT >>>>>>>
+        Tu es un enseignant précis qui rédige l'appréciation globale d'une copie déjà corrigée.
+    """
+    grading_elements = f"""
+        >>>>>>> CORRECTION DE LA COPIE >>>>>>>
+        {comments}
+    """
+    instruction_prompt = """
+        >>>>>>> INSTRUCTION_PROMPT >>>>>>>
+        En t'adressant à l'étudiant, résume en quelques phrases ce qu'il doit améliorer et pourquoi.
+        Le retour doit être dans la langue des commentaires.
+        **Retourne uniquement un JSON strict, sans texte explicatif supplémentaire.**
+    """
+    output_structure = """
+        >>>>>>> OUTPUT STRUCTURE >>>>>>>
+        {"advice": "Commentaire global ici."}
+    """
+
+    try:
+        result, _ = await llm_provider.answer_json(
+            grading_messages(
+                [role_prompt, grading_elements, instruction_prompt, output_structure]
+            ),
+            GradingAdvice,
+            grading_params,
+        )
+    except Exception:
+        return fallback_advice
+
+    if not isinstance(result, dict) or not result.get("advice"):
+        return fallback_advice
+    return result["advice"]
+
+
+async def grade_questions_concurrently(
+    questions: List[dict],
+    provider: Optional[str] = None,
+    concurrency: int = settings.GRADING_QUESTION_CONCURRENCY,
+) -> dict:
+    """
+    Grades every question of a copy with its own LLM call, in parallel.
+
+    Args:
+        questions (List[dict]): Output of `assemble_question_grading_data`.
+        provider (str, optional): Provider name, default provider if None.
+        concurrency (int): Maximum number of LLM calls in flight.
+
+    Returns:
+        dict: {"advice", "grading"} keyed by question ID, as expected by
+        `process_and_store_llm_output`.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    results = await asyncio.gather(
+        *[grade_question(question, semaphore, provider) for question in questions]
+    )
+    gradings = {
+        str(question["question_id"]): result
+        for question, result in zip(questions, results)
+    }
+
+    advice = await get_global_advice(gradings, provider)
+
+    return {
+        "advice": advice,
+        "grading": {
+            question_id: {"note": g["note"], "commentaires": g["commentaires"]}
+            for question_id, g in gradings.items()
+        },
+    }
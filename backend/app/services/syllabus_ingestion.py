@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from typing import BinaryIO, List, Optional
+import aiohttp
+from sqlalchemy.orm import Session
+from core.config import settings
+from crud.syllabus_crud import (
+    claim_next_syllabus,
+    complete_syllabus,
+    fail_syllabus,
+    requeue_stale_syllabi,
+    set_syllabus_status,
+)
+from db.executor import db_executor
+from db.session import SessionLocal
+from models.operation_models import Course
+from services.course_chapters import extract_chapters_from_syllabus
+from services.pdf_extraction import PdfExtractionError, pdf_extractor
+
+logger = logging.getLogger(__name__)
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class SyllabusError(Exception):
+    """A syllabus that cannot be ingested, whatever the number of attempts."""
+
+
+async def download_pdf(
+    session: aiohttp.ClientSession,
+    syllabus_url: str,
+    pdf_file: BinaryIO,
+    max_bytes: int,
+):
+    """
+    Downloads a syllabus into `pdf_file`, chunk by chunk, within the timeouts
+    of the session.
+
+    Raises:
+        SyllabusError: If the server refuses the file or it exceeds `max_bytes`.
+        aiohttp.ClientError, asyncio.TimeoutError: On network errors.
+    """
+    async with session.get(syllabus_url) as response:
+        if 400 <= response.status < 500:
+            raise SyllabusError(f"Syllabus download refused ({response.status})")
+        response.raise_for_status()
+        if response.content_length and response.content_length > max_bytes:
+            raise SyllabusError(f"Syllabus larger than {max_bytes} bytes")
+
+        # The announced length may be missing or wrong: count what arrives
+        size = 0
+        async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_bytes:
+                raise SyllabusError(f"Syllabus larger than {max_bytes} bytes")
+            pdf_file.write(chunk)
+    pdf_file.flush()
+
+
+class SyllabusIngestionPool:
+    """
+    Pool of background workers ingesting the syllabi of new courses.
+
+    A course is created with its syllabus "pending". A worker claims it, then
+    downloads the PDF, extracts its text and has the LLM split it into
+    chapters, recording each step in `Course.syllabus_status`, until "ready"
+    or "failed". Course creation thus returns at once, whatever the size of
+    the PDF and the speed of the LLM.
+
+    As for grading jobs, a claimed syllabus is leased for `lease_timeout`
+    seconds, after which it is requeued if still in progress.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        poll_interval: float,
+        max_attempts: int,
+        lease_timeout: float,
+    ):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.lease_timeout = lease_timeout
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._next_requeue = 0.0
+
+    def start(self):
+        if self._tasks:
+            return
+
+        db = SessionLocal()
+        try:
+            self._requeue_stale_syllabi(db)
+        finally:
+            db.close()
+
+        self._session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(
+                total=settings.SYLLABUS_DOWNLOAD_TIMEOUT,
+                connect=settings.SYLLABUS_CONNECT_TIMEOUT,
+            )
+        )
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker(n)) for n in range(self.workers)
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _requeue_stale_syllabi(self, db: Session):
+        now = time.monotonic()
+        if now < self._next_requeue:
+            return
+        self._next_requeue = now + self.lease_timeout
+        requeued = requeue_stale_syllabi(db, self.lease_timeout)
+        if requeued:
+            logger.info(f"Requeued {requeued} interrupted syllabus ingestion(s)")
+
+    async def _wait_for_syllabi(self):
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def ingest(self, db: Session, course: Course):
+        # On disk rather than in memory: the extraction processes map the file
+        pdf_file = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+        try:
+            with pdf_file:
+                await download_pdf(
+                    self._session,
+                    course.syllabus_url,
+                    pdf_file,
+                    settings.SYLLABUS_MAX_BYTES,
+                )
+
+            await db_executor.run(set_syllabus_status, db, course, "extracting")
+            syllabus_content, page_offsets = await pdf_extractor.extract(
+                pdf_file.name
+            )
+        finally:
+            os.unlink(pdf_file.name)
+        if not syllabus_content.strip():
+            raise SyllabusError("No text found in the syllabus PDF")
+
+        await db_executor.run(set_syllabus_status, db, course, "chapterizing")
+        course_chapters = await extract_chapters_from_syllabus(syllabus_content)
+
+        await db_executor.run(
+            complete_syllabus,
+            db,
+            course,
+            syllabus_content,
+            page_offsets,
+            course_chapters,
+        )
+
+    async def _worker(self, worker_number: int):
+        while True:
+            db = SessionLocal()
+            try:
+                course = await db_executor.run(claim_next_syllabus, db)
+                if course is None:
+                    await db_executor.run(self._requeue_stale_syllabi, db)
+                    db.close()
+                    await self._wait_for_syllabi()
+                    continue
+
+                try:
+                    await self.ingest(db, course)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    error = str(e) or type(e).__name__
+                    logger.error(
+                        f"Worker {worker_number} failed ingesting the syllabus "
+                        f"of course {course.id}: {error}"
+                    )
+                    db.rollback()
+                    await db_executor.run(
+                        fail_syllabus,
+                        db,
+                        course,
+                        error,
+                        self.max_attempts,
+                        retry=not isinstance(e, (SyllabusError, PdfExtractionError)),
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Syllabus worker {worker_number} error: {e}")
+                await asyncio.sleep(self.poll_interval)
+            finally:
+                db.close()
+
+
+syllabus_pool = SyllabusIngestionPool(
+    workers=settings.SYLLABUS_WORKERS,
+    poll_interval=settings.SYLLABUS_POLL_INTERVAL,
+    max_attempts=settings.SYLLABUS_MAX_ATTEMPTS,
+    lease_timeout=settings.SYLLABUS_LEASE_TIMEOUT,
+)